@@ -0,0 +1,30 @@
+from notifier.notification_sender import NotificationSender
+from notifier.notification_dispatcher import NotificationDispatcher, TokenBucket, ChatRateLimiter
+from notifier.partition_lease import PartitionLease, ShardAlreadyRunningError
+from notifier.reminder_processor import ReminderSlotStats, SurveyReminderProcessor
+from notifier.reminder_outbox import ReminderOutboxDispatcher
+from notifier.reminder_slot_processor import ReminderSlotProcessor
+from notifier.schedule_rollover import RolloverStats, ScheduleRollover
+from notifier.schedule_listener import ScheduleChangeListener
+from notifier.survey_notifier import SurveyNotifier
+from notifier.deadline_notifier import DeadlineSurveyNotifier
+from notifier.slot_notifier import SlotSurveyNotifier
+
+__all__ = [
+    "NotificationSender",
+    "NotificationDispatcher",
+    "TokenBucket",
+    "ChatRateLimiter",
+    "PartitionLease",
+    "ShardAlreadyRunningError",
+    "ReminderSlotStats",
+    "SurveyReminderProcessor",
+    "ReminderOutboxDispatcher",
+    "ReminderSlotProcessor",
+    "RolloverStats",
+    "ScheduleRollover",
+    "ScheduleChangeListener",
+    "SurveyNotifier",
+    "DeadlineSurveyNotifier",
+    "SlotSurveyNotifier",
+]
@@ -0,0 +1,221 @@
+import asyncio
+import heapq
+import pytz
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from shared.sqlalchemy_db_.query_stats import query_scope
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+from notifier.partition_lease import PartitionLease
+from notifier.reminder_outbox import ReminderOutboxDispatcher
+from notifier.reminder_processor import SurveyReminderProcessor
+from notifier.schedule_rollover import ScheduleRollover
+
+
+class DeadlineSurveyNotifier:
+    """Планировщик уведомлений, управляемый дедлайнами.
+
+    Хранит min-heap ближайших моментов обработки для каждого активного
+    сегодня опроса, спит ровно до ближайшего из них и обрабатывает только
+    наступившие. Новые расписания подгружаются инкрементально по ID,
+    полная пересборка выполняется в полночь (UTC) и раз в resync_minutes.
+    """
+
+    def __init__(
+        self,
+        outbox: Optional[ReminderOutboxDispatcher] = None,
+        new_schedules_poll_seconds: float = 30,
+        resync_minutes: float = 30,
+        partition_lease: Optional[PartitionLease] = None,
+    ):
+        """Инициализация планировщика.
+
+        Args:
+            outbox: Диспетчер outbox, который нужно будить после создания напоминаний (опционально)
+            new_schedules_poll_seconds: Период проверки новых расписаний (в секундах)
+            resync_minutes: Период полной пересборки очереди (в минутах)
+            partition_lease: Аренда партиций для шардированного режима (опционально)
+        """
+        self.outbox = outbox
+        self.new_schedules_poll_interval = timedelta(seconds=new_schedules_poll_seconds)
+        self.resync_interval = timedelta(minutes=resync_minutes)
+        self.partition_lease = partition_lease
+        self.rollover = ScheduleRollover(partition_lease)
+
+        self._heap: List[Tuple[datetime, int]] = []
+        self._deadlines: Dict[int, datetime] = {}
+        self._last_seen_survey_id = 0
+        self._current_date: Optional[date] = None
+        self._next_poll_at: Optional[datetime] = None
+        self._next_resync_at: Optional[datetime] = None
+        self._changed_survey_ids: Set[int] = set()
+        self._wakeup = asyncio.Event()
+        self._is_running = False
+
+    def schedule_changed(self, scheduled_survey_id: Optional[int]) -> None:
+        """Учесть изменение расписания (вызывается подпиской LISTEN/NOTIFY).
+
+        Args:
+            scheduled_survey_id: ID опроса или None, если очередь нужно пересобрать целиком
+        """
+        if scheduled_survey_id is None:
+            self._next_resync_at = None
+        else:
+            self._changed_survey_ids.add(scheduled_survey_id)
+        self._wakeup.set()
+
+    def _set_deadline(self, survey_id: int, due_at: datetime) -> None:
+        """Установить (или перенести) момент обработки опроса."""
+        self._deadlines[survey_id] = due_at
+        heapq.heappush(self._heap, (due_at, survey_id))
+        self._last_seen_survey_id = max(self._last_seen_survey_id, survey_id)
+
+    def _discard_stale(self) -> None:
+        """Удалить с вершины heap устаревшие записи."""
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now: datetime) -> List[int]:
+        """Извлечь ID опросов, момент обработки которых наступил."""
+        due_ids = []
+        self._discard_stale()
+        while self._heap and self._heap[0][0] <= now:
+            _, survey_id = heapq.heappop(self._heap)
+            del self._deadlines[survey_id]
+            due_ids.append(survey_id)
+            self._discard_stale()
+        return due_ids
+
+    def _next_wakeup_at(self, now: datetime) -> datetime:
+        """Ближайший момент, когда планировщику нужно проснуться."""
+        tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=now.tzinfo)
+        candidates = [
+            moment for moment in (tomorrow, self._next_poll_at, self._next_resync_at)
+            if moment is not None
+        ]
+
+        self._discard_stale()
+        if self._heap:
+            candidates.append(self._heap[0][0])
+
+        return min(candidates)
+
+    async def resync(self, now: datetime) -> None:
+        """Полностью пересобрать очередь из БД."""
+        async with get_cached_sqlalchemy_db().new_async_session() as session:
+            deadlines = await SurveyReminderProcessor(session, self.partition_lease).load_deadlines(now)
+
+        self._heap.clear()
+        self._deadlines.clear()
+        for survey_id, due_at in deadlines.items():
+            self._set_deadline(survey_id, due_at)
+
+        self._current_date = now.date()
+        self._next_poll_at = now + self.new_schedules_poll_interval
+        self._next_resync_at = now + self.resync_interval
+
+    async def poll_new_schedules(self, now: datetime) -> None:
+        """Добавить в очередь расписания, созданные после последней загрузки."""
+        async with get_cached_sqlalchemy_db().new_async_session() as session:
+            deadlines = await SurveyReminderProcessor(session, self.partition_lease).load_deadlines(
+                now, min_survey_id=self._last_seen_survey_id
+            )
+
+        for survey_id, due_at in deadlines.items():
+            self._set_deadline(survey_id, due_at)
+
+        self._next_poll_at = now + self.new_schedules_poll_interval
+
+    async def refresh(self, survey_ids: List[int], now: datetime) -> None:
+        """Перечитать из БД моменты обработки указанных опросов."""
+        async with get_cached_sqlalchemy_db().new_async_session() as session:
+            deadlines = await SurveyReminderProcessor(session, self.partition_lease).load_deadlines(now, survey_ids=survey_ids)
+
+        for survey_id in survey_ids:
+            self._deadlines.pop(survey_id, None)
+        for survey_id, due_at in deadlines.items():
+            self._set_deadline(survey_id, due_at)
+
+    async def process_due_surveys(self, now: datetime) -> None:
+        """Обработать опросы, момент обработки которых наступил."""
+        due_ids = self._pop_due(now)
+        if not due_ids:
+            return
+
+        async with get_cached_sqlalchemy_db().new_async_session() as session:
+            try:
+                processor = SurveyReminderProcessor(session, self.partition_lease)
+                created = await processor.process(now=now, survey_ids=due_ids)
+
+                await session.commit()
+            except Exception as e:
+                print(f"Ошибка при обработке опросов: {str(e)}")
+                await session.rollback()
+                # Следующие дедлайны берем из БД, даже если обработка упала; ошибка
+                # обновления не должна заменить исходную ошибку обработки
+                try:
+                    await self.refresh(due_ids, datetime.now(tz=pytz.UTC))
+                except Exception as refresh_error:
+                    print(f"Ошибка при обновлении дедлайнов опросов: {str(refresh_error)}")
+                raise
+
+        await self.refresh(due_ids, datetime.now(tz=pytz.UTC))
+
+        if created and self.outbox:
+            self.outbox.wakeup()
+
+    async def run_once(self) -> None:
+        """Выполнить все работы, срок которых наступил."""
+        now = datetime.now(tz=pytz.UTC)
+
+        # Набор партиций изменился - очередь нужно пересобрать
+        if self.partition_lease is not None and await self.partition_lease.rebalance():
+            self._next_resync_at = None
+
+        # После перехода на новый день очередь собирается заново
+        if await self.rollover.run_if_due(now) is not None:
+            self._next_resync_at = None
+
+        if (
+            self._next_resync_at is None
+            or now >= self._next_resync_at
+            or now.date() != self._current_date
+        ):
+            await self.resync(now)
+        elif now >= self._next_poll_at:
+            await self.poll_new_schedules(now)
+
+        # Новые и пройденные пациентами опросы из LISTEN/NOTIFY
+        if self._changed_survey_ids:
+            changed_ids = list(self._changed_survey_ids)
+            self._changed_survey_ids.clear()
+            await self.refresh(changed_ids, now)
+
+        await self.process_due_surveys(now)
+
+    async def start(self) -> None:
+        """Запустить планировщик."""
+        self._is_running = True
+        while self._is_running:
+            # Сбрасываем до прохода, чтобы не потерять пробуждение во время него
+            self._wakeup.clear()
+            try:
+                with query_scope("notifier:deadline"):
+                    await self.run_once()
+                now = datetime.now(tz=pytz.UTC)
+                timeout = max((self._next_wakeup_at(now) - now).total_seconds(), 0)
+            except Exception as e:
+                print(f"Ошибка в цикле планировщика: {str(e)}")
+                # После ошибки пересобираем очередь, выдержав паузу
+                self._next_resync_at = None
+                timeout = self.new_schedules_poll_interval.total_seconds()
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self) -> None:
+        """Остановить планировщик."""
+        self._is_running = False
+        self._wakeup.set()
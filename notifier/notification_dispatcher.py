@@ -0,0 +1,212 @@
+import asyncio
+import time as time_module
+from dataclasses import dataclass, field
+from datetime import time
+from typing import Any, Dict, List, Optional
+from aiogram.exceptions import TelegramRetryAfter
+
+from shared.sqlalchemy_db_.sqlalchemy_model import ScheduledSurveyDBM
+from notifier.notification_sender import NotificationSender
+
+
+class TokenBucket:
+    """Глобальный ограничитель частоты запросов к Bot API."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """Инициализация ограничителя.
+
+        Args:
+            rate: Количество токенов в секунду
+            capacity: Максимальный запас токенов (по умолчанию равен rate)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time_module.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Дождаться и забрать один токен."""
+        async with self._lock:
+            while True:
+                now = time_module.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Приостановить выдачу токенов (например, по TelegramRetryAfter)."""
+        now = time_module.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0
+        self._updated_at = self._paused_until
+
+
+class ChatRateLimiter:
+    """Ограничитель частоты сообщений в один чат."""
+
+    _PRUNE_THRESHOLD = 10_000
+
+    def __init__(self, interval_seconds: float):
+        """Инициализация ограничителя.
+
+        Args:
+            interval_seconds: Минимальный интервал между сообщениями в один чат
+        """
+        self.interval_seconds = interval_seconds
+        self._next_allowed_at: Dict[int, float] = {}
+
+    def _prune(self, now: float) -> None:
+        self._next_allowed_at = {
+            chat_id: next_allowed_at
+            for chat_id, next_allowed_at in self._next_allowed_at.items()
+            if next_allowed_at > now
+        }
+
+    async def acquire(self, chat_id: int) -> None:
+        """Дождаться своей очереди на отправку в чат."""
+        now = time_module.monotonic()
+        if len(self._next_allowed_at) > self._PRUNE_THRESHOLD:
+            self._prune(now)
+
+        # Резервируем слот до ожидания, чтобы параллельные отправки встали в очередь
+        start_at = max(now, self._next_allowed_at.get(chat_id, now))
+        self._next_allowed_at[chat_id] = start_at + self.interval_seconds
+
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+
+@dataclass
+class _DispatchJob:
+    chat_id: int
+    kwargs: Dict[str, Any]
+    future: asyncio.Future
+    attempt: int = field(default=0)
+
+
+class NotificationDispatcher:
+    """Пул асинхронных воркеров для отправки уведомлений.
+
+    Уведомления ставятся в очередь и отправляются ограниченным числом
+    воркеров с учетом общего лимита Bot API (~30 сообщений в секунду)
+    и лимита на один чат. При TelegramRetryAfter отправка в целом
+    приостанавливается, а сообщение возвращается в очередь.
+    """
+
+    def __init__(
+        self,
+        notification_sender: NotificationSender,
+        workers: int = 16,
+        rate_per_second: float = 30,
+        per_chat_interval_seconds: float = 1.0,
+        max_retries: int = 3,
+    ):
+        """Инициализация пула.
+
+        Args:
+            notification_sender: Отправитель уведомлений
+            workers: Количество воркеров
+            rate_per_second: Общий лимит сообщений в секунду
+            per_chat_interval_seconds: Минимальный интервал между сообщениями в один чат
+            max_retries: Количество повторов после TelegramRetryAfter
+        """
+        self.notification_sender = notification_sender
+        self.workers = workers
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(rate=rate_per_second)
+        self.chat_limiter = ChatRateLimiter(interval_seconds=per_chat_interval_seconds)
+
+        self._queue: Optional[asyncio.Queue[_DispatchJob]] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Запустить воркеры (вызывается автоматически при первой отправке)."""
+        if self._worker_tasks:
+            return
+
+        self._queue = asyncio.Queue()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(), name=f"notification-dispatcher-{index}")
+            for index in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Остановить воркеры."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def send_notification(
+        self,
+        scheduled_survey: ScheduledSurveyDBM,
+        scheduled_time: time,
+        reminder_number: int,
+        notification_id: int,
+    ) -> bool:
+        """Поставить уведомление в очередь и дождаться результата отправки.
+
+        Args:
+            scheduled_survey: Запланированный опрос
+            scheduled_time: Время отправки
+            reminder_number: Номер напоминания
+            notification_id: ID напоминания
+
+        Returns:
+            bool: Результат отправки (True - успешно, False - ошибка)
+        """
+        self.start()
+
+        job = _DispatchJob(
+            chat_id=scheduled_survey.patient_id,
+            kwargs=dict(
+                scheduled_survey=scheduled_survey,
+                scheduled_time=scheduled_time,
+                reminder_number=reminder_number,
+                notification_id=notification_id,
+            ),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        await self._queue.put(job)
+
+        return await job.future
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self.chat_limiter.acquire(job.chat_id)
+                await self.bucket.acquire()
+
+                await self.notification_sender.send_notification(**job.kwargs)
+                job.future.set_result(True)
+            except TelegramRetryAfter as e:
+                self.bucket.pause(e.retry_after)
+                job.attempt += 1
+                if job.attempt > self.max_retries:
+                    print(f"Уведомление {job.kwargs['notification_id']} не отправлено: {str(e)}")
+                    job.future.set_result(False)
+                else:
+                    self._queue.put_nowait(job)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as e:
+                print(f"Ошибка при отправке уведомления {job.kwargs['notification_id']}: {str(e)}")
+                job.future.set_result(False)
+            finally:
+                self._queue.task_done()
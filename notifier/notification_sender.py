@@ -0,0 +1,53 @@
+from datetime import datetime, time, timedelta
+from aiogram import Bot
+from aiogram.enums import ParseMode
+from aiogram.client.default import DefaultBotProperties
+
+from shared.config import BotSettings
+from shared.sqlalchemy_db_.sqlalchemy_model import ScheduledSurveyDBM
+from tg_bot.blanks.patient import PatientBlank
+from tg_bot.handlers.common.message_service import MessageService
+from tg_bot.keyboards.patient.patient import PatientKeyboard
+
+
+class NotificationSender:
+    def __init__(self, settings: BotSettings):
+        self.bot = Bot(
+            token=settings.BOT_TOKEN,
+            default=DefaultBotProperties(parse_mode=ParseMode.HTML)
+        )
+
+    async def send_notification(
+        self, 
+        scheduled_survey: ScheduledSurveyDBM,
+        scheduled_time: time,
+        reminder_number: int,
+        notification_id: int,
+    ) -> bool:
+        """Отправить уведомление пользователю.
+        
+        Args:
+            scheduled_survey: Запланированный опрос
+            scheduled_time: Время отправки
+            reminder_number: Номер напоминания
+            notification_id: ID напоминания
+            
+        Returns:
+            bool: Результат отправки (True - успешно, False - ошибка)
+        """
+        adjusted_time = (datetime.combine(datetime.min, scheduled_time) + timedelta(hours=5)).time()
+
+        await MessageService.send_managed_message(
+            bot=self.bot,
+            user_id=scheduled_survey.patient_id,
+            text=PatientBlank.get_survey_notification_blank(
+                title=scheduled_survey.survey.title,
+                doctor_name=scheduled_survey.doctor.full_name,
+                scheduled_time=adjusted_time,
+                reminder_number=reminder_number,
+                max_reminders=scheduled_survey.max_reminders,
+            ),
+            reply_markup=PatientKeyboard.get_survey_notification_keyboard(notification_id=notification_id)
+        )
+
+        return True
@@ -0,0 +1,147 @@
+import sqlalchemy
+from typing import FrozenSet, Optional, Set
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+from shared.sqlalchemy_db_.sqlalchemy_model import ScheduledSurveyDBM
+
+
+class ShardAlreadyRunningError(Exception):
+    """Воркер с таким shard_id уже запущен."""
+
+
+class PartitionLease:
+    """Владение партициями scheduled_surveys для шардированных воркеров.
+
+    Опросы делятся на partition_count партиций по id % partition_count.
+    Партиция p предпочтительно принадлежит воркеру p % worker_count.
+    Владение подтверждается advisory-блокировкой PostgreSQL, которая
+    удерживается на отдельном соединении: если воркер падает, соединение
+    закрывается и блокировки освобождаются сами.
+
+    Каждый воркер также держит блокировку своего shard_id. Партиции
+    воркера, у которого такой блокировки нет, считаются осиротевшими и
+    забираются остальными до его возвращения.
+    """
+
+    # Пространства ключей для pg_try_advisory_lock(key1, key2)
+    _PARTITION_LOCK_NAMESPACE = 48151
+    _WORKER_LOCK_NAMESPACE = 48152
+
+    def __init__(self, worker_count: int = 1, shard_id: int = 0, partition_count: int = 64):
+        """Инициализация аренды.
+
+        Args:
+            worker_count: Количество воркеров
+            shard_id: Номер текущего воркера (от 0 до worker_count - 1)
+            partition_count: Количество партиций (не меньше worker_count)
+        """
+        if not 0 <= shard_id < worker_count:
+            raise ValueError("shard_id должен быть в диапазоне от 0 до worker_count - 1")
+        if partition_count < worker_count:
+            raise ValueError("partition_count не может быть меньше worker_count")
+
+        self.worker_count = worker_count
+        self.shard_id = shard_id
+        self.partition_count = partition_count
+
+        self._connection: Optional[AsyncConnection] = None
+        self._held: Set[int] = set()
+
+    @property
+    def partitions(self) -> FrozenSet[int]:
+        """Партиции, которыми сейчас владеет воркер."""
+        return frozenset(self._held)
+
+    def partition_filter(
+        self,
+        column: sqlalchemy.ColumnElement[int] = ScheduledSurveyDBM.id
+    ) -> sqlalchemy.ColumnElement[bool]:
+        """Условие отбора строк из партиций, которыми владеет воркер.
+
+        Args:
+            column: Колонка с ID запланированного опроса
+        """
+        return (column % self.partition_count).in_(sorted(self._held))
+
+    async def _try_lock(self, namespace: int, key: int) -> bool:
+        result = await self._connection.execute(
+            sqlalchemy.select(sqlalchemy.func.pg_try_advisory_lock(namespace, key))
+        )
+        return bool(result.scalar())
+
+    async def _unlock(self, namespace: int, key: int) -> None:
+        await self._connection.execute(
+            sqlalchemy.select(sqlalchemy.func.pg_advisory_unlock(namespace, key))
+        )
+
+    async def _alive_shards(self) -> Set[int]:
+        """ID воркеров, которые сейчас держат блокировку своего шарда."""
+        result = await self._connection.execute(
+            sqlalchemy.text(
+                "SELECT objid FROM pg_locks "
+                "WHERE locktype = 'advisory' AND granted AND objsubid = 2 AND classid = :namespace "
+                "AND database = (SELECT oid FROM pg_database WHERE datname = current_database())"
+            ),
+            {"namespace": self._WORKER_LOCK_NAMESPACE},
+        )
+        return {int(objid) for objid in result.scalars().all()}
+
+    async def acquire(self) -> None:
+        """Открыть соединение аренды и зарегистрировать воркер."""
+        if self._connection is not None:
+            return
+
+        self._connection = await get_cached_sqlalchemy_db().async_engine.connect()
+        # Блокировки сессионные, транзакция соединению не нужна
+        await self._connection.execution_options(isolation_level="AUTOCOMMIT")
+
+        if not await self._try_lock(self._WORKER_LOCK_NAMESPACE, self.shard_id):
+            await self.release()
+            raise ShardAlreadyRunningError(f"Воркер с shard_id={self.shard_id} уже запущен")
+
+    async def rebalance(self) -> bool:
+        """Захватить свои и осиротевшие партиции, вернуть чужие их владельцам.
+
+        Returns:
+            bool: Изменился ли набор партиций
+        """
+        try:
+            await self.acquire()
+            alive_shards = await self._alive_shards()
+
+            before = set(self._held)
+            for partition in range(self.partition_count):
+                owner = partition % self.worker_count
+                wanted = owner == self.shard_id or owner not in alive_shards
+
+                if wanted and partition not in self._held:
+                    if await self._try_lock(self._PARTITION_LOCK_NAMESPACE, partition):
+                        self._held.add(partition)
+                elif not wanted and partition in self._held:
+                    # Владелец вернулся - отдаем партицию
+                    await self._unlock(self._PARTITION_LOCK_NAMESPACE, partition)
+                    self._held.discard(partition)
+
+            return before != self._held
+        except ShardAlreadyRunningError:
+            raise
+        except Exception:
+            # Соединение могло быть потеряно - начинаем с чистого листа
+            await self.release()
+            raise
+
+    async def release(self) -> None:
+        """Освободить все партиции и закрыть соединение аренды."""
+        self._held.clear()
+        if self._connection is None:
+            return
+
+        connection, self._connection = self._connection, None
+        try:
+            # Соединение вернется в пул, поэтому сессионные блокировки снимаем явно
+            await connection.execute(sqlalchemy.select(sqlalchemy.func.pg_advisory_unlock_all()))
+            await connection.close()
+        except Exception as e:
+            print(f"Ошибка при закрытии соединения аренды партиций: {str(e)}")
+            await connection.invalidate()
@@ -0,0 +1,253 @@
+import asyncio
+import pytz
+import sqlalchemy
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.sqlalchemy_db_.daily_stats import update_reminders_status
+from shared.sqlalchemy_db_.query_stats import query_scope
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+from shared.sqlalchemy_db_.sqlalchemy_model import SurveyReminderDBM, ScheduledSurveyDBM
+from notifier.notification_sender import NotificationSender
+from notifier.notification_dispatcher import NotificationDispatcher
+
+
+class ReminderOutboxDispatcher:
+    """Отправка напоминаний из outbox.
+
+    Outbox - это строки survey_reminders со статусом PENDING, которые
+    планировщик создает в короткой транзакции. Диспетчер в короткой
+    транзакции забирает пачку (SELECT ... FOR UPDATE SKIP LOCKED) и
+    переводит ее в SENDING, отправляет без открытой транзакции и вторым
+    коротким UPDATE помечает как SENT или FAILED. Пока одни пачки
+    отправляются, диспетчер забирает следующие, поэтому пропускная
+    способность ограничена лимитами отправки, а не задержкой Telegram.
+    """
+
+    _EXPIRE_STALE_INTERVAL = timedelta(minutes=1)
+
+    def __init__(
+        self,
+        notification_sender: NotificationSender | NotificationDispatcher,
+        batch_size: int = 100,
+        poll_seconds: float = 5,
+        max_age_minutes: float = 60,
+        claim_timeout_minutes: float = 10,
+        max_in_flight_batches: int = 4,
+    ):
+        """Инициализация диспетчера.
+
+        Args:
+            notification_sender: Отправитель уведомлений или пул отправки
+            batch_size: Количество напоминаний, забираемых за одну транзакцию
+            poll_seconds: Период проверки outbox, если нет явного пробуждения
+            max_age_minutes: Возраст, после которого неотправленное напоминание считается FAILED
+            claim_timeout_minutes: Время, после которого напоминание в SENDING
+                (например, после падения воркера) возвращается в outbox
+            max_in_flight_batches: Количество пачек, отправляемых одновременно
+        """
+        self.notification_sender = notification_sender
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_age = timedelta(minutes=max_age_minutes)
+        self.claim_timeout = timedelta(minutes=claim_timeout_minutes)
+        self.max_in_flight_batches = max_in_flight_batches
+
+        self._next_expire_at: Optional[datetime] = None
+        self._wakeup = asyncio.Event()
+        self._in_flight: Set[asyncio.Task] = set()
+        self._is_running = False
+
+    def wakeup(self) -> None:
+        """Разбудить диспетчер (вызывается после фиксации новых напоминаний)."""
+        self._wakeup.set()
+
+    async def claim_batch(self, session: AsyncSession, now: datetime) -> List[SurveyReminderDBM]:
+        """Забрать очередную пачку неотправленных напоминаний и перевести ее в SENDING.
+
+        Args:
+            session: Асинхронная сессия SQLAlchemy (commit выполняет вызывающий)
+            now: Текущее время (UTC)
+
+        Returns:
+            List[SurveyReminderDBM]: Забранные напоминания с опросами
+        """
+        table = SurveyReminderDBM.__table__
+        claimable = (
+            sqlalchemy.select(table.c.id)
+            .where(table.c.status == SurveyReminderDBM.ReminderStatus.PENDING.value)
+            .where(table.c.creation_dt >= now - self.max_age)
+            .order_by(table.c.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("claimable_reminders")
+        )
+        # PENDING и SENDING не входят в агрегаты, поэтому обычный UPDATE
+        claimed_ids = (await session.execute(
+            sqlalchemy.update(table)
+            .where(table.c.id.in_(sqlalchemy.select(claimable.c.id)))
+            .values(status=SurveyReminderDBM.ReminderStatus.SENDING.value, claimed_at=now)
+            .returning(table.c.id)
+        )).scalars().all()
+
+        if not claimed_ids:
+            return []
+
+        result = await session.execute(
+            sqlalchemy.select(SurveyReminderDBM)
+            .options(
+                joinedload(SurveyReminderDBM.scheduled_survey).joinedload(ScheduledSurveyDBM.survey),
+                joinedload(SurveyReminderDBM.scheduled_survey).joinedload(ScheduledSurveyDBM.doctor),
+            )
+            .where(SurveyReminderDBM.id.in_(claimed_ids))
+            .order_by(SurveyReminderDBM.id)
+        )
+
+        return result.scalars().unique().all()
+
+    @staticmethod
+    async def mark_reminders(session: AsyncSession, sent_ids: List[int], failed_ids: List[int]) -> None:
+        """Одним UPDATE выставить статусы SENT и FAILED пачке напоминаний.
+
+        Один запрос вместо двух, чтобы строки агрегатов блокировались
+        в одном порядке и не возникало взаимоблокировок с другими воркерами.
+        Затрагиваются только напоминания в SENDING: завершенные за время
+        отправки или уже помеченные как FAILED не меняются.
+        """
+        if not sent_ids and not failed_ids:
+            return
+
+        await session.execute(update_reminders_status(
+            sqlalchemy.case(
+                (SurveyReminderDBM.id.in_(sent_ids), SurveyReminderDBM.ReminderStatus.SENT.value),
+                else_=SurveyReminderDBM.ReminderStatus.FAILED.value,
+            ),
+            SurveyReminderDBM.id.in_([*sent_ids, *failed_ids]),
+            SurveyReminderDBM.status == SurveyReminderDBM.ReminderStatus.SENDING.value,
+        ))
+
+    async def expire_stale(self, now: datetime) -> None:
+        """Вернуть в outbox зависшие отправки и пометить как FAILED не отправленные вовремя."""
+        async with get_cached_sqlalchemy_db().new_async_session() as session:
+            # Напоминания, забранные упавшим воркером, отправятся повторно
+            await session.execute(
+                sqlalchemy.update(SurveyReminderDBM.__table__)
+                .where(SurveyReminderDBM.status == SurveyReminderDBM.ReminderStatus.SENDING.value)
+                .where(SurveyReminderDBM.claimed_at < now - self.claim_timeout)
+                .values(status=SurveyReminderDBM.ReminderStatus.PENDING.value, claimed_at=None)
+            )
+            await session.execute(
+                update_reminders_status(
+                    SurveyReminderDBM.ReminderStatus.FAILED.value,
+                    SurveyReminderDBM.status == SurveyReminderDBM.ReminderStatus.PENDING.value,
+                    SurveyReminderDBM.creation_dt < now - self.max_age,
+                )
+            )
+            await session.commit()
+
+        self._next_expire_at = now + self._EXPIRE_STALE_INTERVAL
+
+    async def claim(self) -> List[SurveyReminderDBM]:
+        """Забрать пачку напоминаний в отдельной короткой транзакции.
+
+        Returns:
+            List[SurveyReminderDBM]: Напоминания в SENDING (пустой список, если outbox пуст)
+        """
+        now = datetime.now(tz=pytz.UTC)
+
+        # Объекты нужны после commit для отправки
+        async with get_cached_sqlalchemy_db().new_async_session(expire_on_commit=False) as session:
+            try:
+                reminders = await self.claim_batch(session, now)
+                await session.commit()
+                return reminders
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def send_batch(self, reminders: List[SurveyReminderDBM]) -> None:
+        """Отправить забранную пачку без открытой транзакции и сохранить результат."""
+        results = await asyncio.gather(
+            *(
+                self.notification_sender.send_notification(
+                    scheduled_survey=reminder.scheduled_survey,
+                    scheduled_time=reminder.scheduled_time,
+                    reminder_number=reminder.reminder_number,
+                    notification_id=reminder.id,
+                )
+                for reminder in reminders
+            ),
+            return_exceptions=True,
+        )
+
+        async with get_cached_sqlalchemy_db().new_async_session() as session:
+            try:
+                await self.mark_reminders(
+                    session,
+                    sent_ids=[reminder.id for reminder, result in zip(reminders, results) if result is True],
+                    failed_ids=[reminder.id for reminder, result in zip(reminders, results) if result is not True],
+                )
+                await session.commit()
+            except Exception as e:
+                # Напоминания останутся в SENDING и вернутся в outbox через claim_timeout
+                print(f"Ошибка при сохранении результатов отправки напоминаний: {str(e)}")
+                await session.rollback()
+
+    async def drain_once(self) -> int:
+        """Забрать и отправить одну пачку напоминаний из outbox.
+
+        Returns:
+            int: Количество обработанных напоминаний
+        """
+        reminders = await self.claim()
+        if reminders:
+            await self.send_batch(reminders)
+        return len(reminders)
+
+    async def _wait(self) -> None:
+        """Дождаться пробуждения, завершения отправки пачки или истечения poll_seconds."""
+        wakeup = asyncio.create_task(self._wakeup.wait())
+        try:
+            await asyncio.wait(
+                {wakeup, *self._in_flight},
+                timeout=self.poll_seconds,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            wakeup.cancel()
+
+    async def start(self) -> None:
+        """Запустить цикл отправки из outbox."""
+        self._is_running = True
+        while self._is_running:
+            # Сбрасываем до прохода, чтобы не потерять пробуждение во время него
+            self._wakeup.clear()
+            if len(self._in_flight) < self.max_in_flight_batches:
+                try:
+                    with query_scope("notifier:outbox"):
+                        now = datetime.now(tz=pytz.UTC)
+                        if self._next_expire_at is None or now >= self._next_expire_at:
+                            await self.expire_stale(now)
+
+                        reminders = await self.claim()
+                        if reminders:
+                            # Задача наследует query_scope
+                            task = asyncio.create_task(self.send_batch(reminders))
+                            self._in_flight.add(task)
+                            task.add_done_callback(self._in_flight.discard)
+                    if reminders:
+                        continue  # В outbox могли остаться напоминания
+                except Exception as e:
+                    print(f"Ошибка в цикле outbox: {str(e)}")
+
+            await self._wait()
+
+        # Дожидаемся уже забранных пачек, чтобы не оставить их в SENDING
+        await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def stop(self) -> None:
+        """Остановить цикл отправки."""
+        self._is_running = False
+        self._wakeup.set()
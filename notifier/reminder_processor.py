@@ -0,0 +1,355 @@
+import sqlalchemy
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Collection, Dict, List, Optional, Tuple
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.sqlalchemy_db_.sqlalchemy_model import SurveyReminderDBM, ScheduledSurveyDBM
+from notifier.partition_lease import PartitionLease
+
+
+@dataclass
+class ReminderSlotStats:
+    """Агрегированное состояние напоминаний временного слота за сегодня."""
+    reminders_count: int = 0
+    is_completed: bool = False
+
+
+class SurveyReminderProcessor:
+    """Обработчик напоминаний для опросов.
+
+    Состояние всех слотов за день загружается одним агрегирующим запросом,
+    решение об отправке принимается в памяти, а новые напоминания
+    записываются одним пакетным INSERT в статусе PENDING. Сама отправка
+    выполняется ReminderOutboxDispatcher после фиксации транзакции.
+    """
+    
+    def __init__(self, session: AsyncSession, partition_lease: Optional[PartitionLease] = None):
+        """Инициализация процессора.
+        
+        Args:
+            session: Асинхронная сессия SQLAlchemy
+            partition_lease: Аренда партиций для шардированного режима (опционально)
+        """
+        self.session = session
+        self.partition_lease = partition_lease
+
+    def _active_today_filter(
+        self,
+        today: date,
+        survey_ids: Optional[Collection[int]] = None,
+        min_survey_id: Optional[int] = None
+    ) -> list[sqlalchemy.ColumnElement[bool]]:
+        """Условия отбора опросов, которые нужно обработать сегодня.
+        
+        Args:
+            today: Текущая дата (UTC)
+            survey_ids: Ограничить выборку указанными опросами (опционально)
+            min_survey_id: Только опросы с ID больше указанного (опционально)
+        """
+        conditions = [
+            ScheduledSurveyDBM.is_active,
+            ScheduledSurveyDBM.start_date <= today,
+            ScheduledSurveyDBM.end_date >= today,
+            ScheduledSurveyDBM.next_scheduled_date == today,
+        ]
+        if survey_ids is not None:
+            conditions.append(ScheduledSurveyDBM.id.in_(survey_ids))
+        if min_survey_id is not None:
+            conditions.append(ScheduledSurveyDBM.id > min_survey_id)
+        if self.partition_lease is not None:
+            conditions.append(self.partition_lease.partition_filter())
+        return conditions
+    
+    async def fetch_active_scheduled_surveys(
+        self,
+        today: date,
+        survey_ids: Optional[Collection[int]] = None,
+        min_survey_id: Optional[int] = None
+    ) -> List[ScheduledSurveyDBM]:
+        """Получить активные опросы для обработки сегодня.
+        
+        Возвращает опросы, у которых:
+        - Текущая дата между start_date и end_date
+        - next_scheduled_date равен сегодняшней дате
+        - is_active=True
+        
+        Args:
+            today: Текущая дата (UTC)
+            survey_ids: Ограничить выборку указанными опросами (опционально)
+            min_survey_id: Только опросы с ID больше указанного (опционально)
+
+        Returns:
+            List[ScheduledSurveyDBM]: Список активных опросов
+        """
+        result = await self.session.execute(
+            sqlalchemy.select(ScheduledSurveyDBM)
+            .options(
+                joinedload(ScheduledSurveyDBM.survey),
+                joinedload(ScheduledSurveyDBM.patient),
+                joinedload(ScheduledSurveyDBM.doctor)
+            )
+            .where(*self._active_today_filter(today, survey_ids, min_survey_id))
+            .order_by(ScheduledSurveyDBM.id)
+        )
+        
+        return result.scalars().unique().all()
+    
+    async def fetch_todays_reminder_stats(
+        self,
+        today: date,
+        survey_ids: Optional[Collection[int]] = None,
+        min_survey_id: Optional[int] = None
+    ) -> Dict[Tuple[int, time], ReminderSlotStats]:
+        """Получить количество напоминаний и признак прохождения по всем слотам за сегодня.
+        
+        Один запрос с GROUP BY (scheduled_survey_id, scheduled_time) для всех
+        опросов, которые обрабатываются сегодня.
+
+        Args:
+            today: Текущая дата (UTC)
+            survey_ids: Ограничить выборку указанными опросами (опционально)
+            min_survey_id: Только опросы с ID больше указанного (опционально)
+            
+        Returns:
+            Dict[Tuple[int, time], ReminderSlotStats]: Состояние слотов по ключу (ID опроса, время)
+        """
+        result = await self.session.execute(
+            sqlalchemy.select(
+                SurveyReminderDBM.scheduled_survey_id,
+                SurveyReminderDBM.scheduled_time,
+                sqlalchemy.func.count(SurveyReminderDBM.id),
+                sqlalchemy.func.bool_or(
+                    SurveyReminderDBM.status == SurveyReminderDBM.ReminderStatus.COMPLETED.value
+                ),
+            )
+            .join(ScheduledSurveyDBM, ScheduledSurveyDBM.id == SurveyReminderDBM.scheduled_survey_id)
+            .where(*self._active_today_filter(today, survey_ids, min_survey_id))
+            .where(SurveyReminderDBM.created_on(today))
+            .group_by(SurveyReminderDBM.scheduled_survey_id, SurveyReminderDBM.scheduled_time)
+        )
+
+        return {
+            (scheduled_survey_id, scheduled_time): ReminderSlotStats(
+                reminders_count=reminders_count,
+                is_completed=bool(is_completed),
+            )
+            for scheduled_survey_id, scheduled_time, reminders_count, is_completed in result.all()
+        }
+    
+    @staticmethod
+    def calculate_next_reminder_time(
+        survey: ScheduledSurveyDBM,
+        scheduled_time: time,
+        slot_stats: ReminderSlotStats
+    ) -> time:
+        """Вычислить время следующего напоминания.
+        
+        Args:
+            survey: Объект опроса
+            scheduled_time: Базовое время отправки
+            slot_stats: Состояние слота за сегодня
+            
+        Returns:
+            time: Время следующего напоминания
+        """
+        # Вычисляем сколько часов нужно добавить к базовому времени
+        hours_to_add = slot_stats.reminders_count * survey.reminder_interval_hours
+        
+        # Создаем временную метку для вычислений
+        dummy_datetime = datetime.combine(date.today(), scheduled_time)
+        next_time = (dummy_datetime + timedelta(hours=hours_to_add)).time()
+        
+        return next_time
+    
+    @staticmethod
+    def should_skip_reminders_for_time(
+        survey: ScheduledSurveyDBM,
+        slot_stats: ReminderSlotStats
+    ) -> bool:
+        """Проверить, нужно ли пропускать напоминания для этого времени.
+        
+        Пропускаем если:
+        - Пользователь уже завершил опрос (есть напоминание со статусом COMPLETED)
+        - Достигнут лимит напоминаний (max_reminders)
+        
+        Args:
+            survey: Объект опроса
+            slot_stats: Состояние слота за сегодня
+            
+        Returns:
+            bool: Нужно ли пропускать
+        """
+        return slot_stats.is_completed or slot_stats.reminders_count >= survey.max_reminders
+
+    def plan_reminders(
+        self,
+        surveys: List[ScheduledSurveyDBM],
+        stats: Dict[Tuple[int, time], ReminderSlotStats],
+        now: datetime
+    ) -> List[Tuple[ScheduledSurveyDBM, time, int]]:
+        """Определить, какие напоминания нужно отправить сейчас.
+        
+        Состояние слотов в stats обновляется с учетом запланированных напоминаний.
+
+        Args:
+            surveys: Опросы, обрабатываемые сегодня
+            stats: Состояние слотов за сегодня
+            now: Текущее время (UTC)
+
+        Returns:
+            List[Tuple[ScheduledSurveyDBM, time, int]]: Список (опрос, время, номер напоминания)
+        """
+        planned = []
+
+        for survey in surveys:
+            if not survey.scheduled_times:
+                continue  # Нет временных слотов для отправки
+
+            for scheduled_time in survey.scheduled_times:
+                slot_stats = stats.setdefault((survey.id, scheduled_time), ReminderSlotStats())
+
+                # Пропускаем если уже обработано
+                if self.should_skip_reminders_for_time(survey, slot_stats):
+                    continue
+
+                # Проверяем наступило ли время отправки
+                if now.time() >= self.calculate_next_reminder_time(survey, scheduled_time, slot_stats):
+                    slot_stats.reminders_count += 1
+                    planned.append((survey, scheduled_time, slot_stats.reminders_count))
+
+        return planned
+
+    async def insert_reminders(
+        self,
+        planned: List[Tuple[ScheduledSurveyDBM, time, int]],
+        now: datetime
+    ) -> List[int]:
+        """Создать напоминания (outbox для отправки) одним пакетным INSERT.
+
+        Напоминания, уже созданные другим воркером (например, после потери
+        аренды партиции), пропускаются по uq_survey_reminders_slot_reminder_number.
+
+        Args:
+            planned: Список (опрос, время, номер напоминания)
+            now: Текущее время (UTC)
+
+        Returns:
+            List[int]: ID созданных напоминаний
+        """
+        if not planned:
+            return []
+
+        result = await self.session.execute(
+            postgresql.insert(SurveyReminderDBM)
+            .values([
+                {
+                    "scheduled_survey_id": survey.id,
+                    "reminder_number": reminder_number,
+                    "scheduled_time": scheduled_time,
+                    "status": SurveyReminderDBM.ReminderStatus.PENDING.value,
+                    "creation_dt": now,
+                }
+                for survey, scheduled_time, reminder_number in planned
+            ])
+            .on_conflict_do_nothing(index_elements=SurveyReminderDBM.SLOT_REMINDER_NUMBER_KEY)
+            .returning(SurveyReminderDBM.id)
+        )
+
+        return list(result.scalars().all())
+    
+    def calculate_deadlines(
+        self,
+        surveys: List[ScheduledSurveyDBM],
+        stats: Dict[Tuple[int, time], ReminderSlotStats],
+        now: datetime
+    ) -> Dict[int, datetime]:
+        """Вычислить ближайший момент, когда опрос потребует обработки.
+        
+        Для каждого опроса берется минимальное время следующего напоминания
+        по незавершенным слотам. Опросы, все слоты которых на сегодня
+        завершены, в результат не попадают: их расписание сдвинет
+        ScheduleRollover при переходе на следующий день.
+
+        Args:
+            surveys: Опросы, обрабатываемые сегодня
+            stats: Состояние слотов за сегодня
+            now: Текущее время (UTC)
+
+        Returns:
+            Dict[int, datetime]: Время обработки по ID опроса
+        """
+        deadlines = {}
+
+        for survey in surveys:
+            if not survey.scheduled_times:
+                continue  # Нет временных слотов для отправки
+
+            due_times = [
+                datetime.combine(
+                    now.date(),
+                    self.calculate_next_reminder_time(survey, scheduled_time, slot_stats),
+                    tzinfo=now.tzinfo,
+                )
+                for scheduled_time in survey.scheduled_times
+                for slot_stats in [stats.get((survey.id, scheduled_time), ReminderSlotStats())]
+                if not self.should_skip_reminders_for_time(survey, slot_stats)
+            ]
+
+            if due_times:
+                deadlines[survey.id] = min(due_times)
+
+        return deadlines
+
+    async def load_deadlines(
+        self,
+        now: datetime,
+        survey_ids: Optional[Collection[int]] = None,
+        min_survey_id: Optional[int] = None
+    ) -> Dict[int, datetime]:
+        """Загрузить моменты обработки для опросов, активных сегодня.
+        
+        Args:
+            now: Текущее время (UTC)
+            survey_ids: Ограничить выборку указанными опросами (опционально)
+            min_survey_id: Только опросы с ID больше указанного (опционально)
+
+        Returns:
+            Dict[int, datetime]: Время обработки по ID опроса
+        """
+        today = now.date()
+
+        surveys = await self.fetch_active_scheduled_surveys(today, survey_ids, min_survey_id)
+        if not surveys:
+            return {}
+
+        stats = await self.fetch_todays_reminder_stats(today, survey_ids, min_survey_id)
+
+        return self.calculate_deadlines(surveys, stats, now)
+
+    async def process(
+        self,
+        now: datetime,
+        survey_ids: Optional[Collection[int]] = None
+    ) -> int:
+        """Выполнить один проход обработки напоминаний.
+        
+        Args:
+            now: Текущее время (UTC)
+            survey_ids: Обработать только указанные опросы (опционально)
+
+        Returns:
+            int: Количество созданных напоминаний
+        """
+        today = now.date()
+
+        surveys = await self.fetch_active_scheduled_surveys(today, survey_ids)
+        if not surveys:
+            return 0  # Нет опросов для обработки
+
+        stats = await self.fetch_todays_reminder_stats(today, survey_ids)
+        planned = self.plan_reminders(surveys, stats, now)
+
+        return len(await self.insert_reminders(planned, now))
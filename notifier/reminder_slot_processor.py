@@ -0,0 +1,287 @@
+import pytz
+import sqlalchemy
+from datetime import date, datetime, time, timedelta
+from typing import Any, Collection, Dict, List, Optional, Set, Tuple
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.sqlalchemy_db_.sqlalchemy_model import ReminderSlotDBM, ScheduledSurveyDBM, SurveyReminderDBM
+from notifier.partition_lease import PartitionLease
+
+
+class ReminderSlotProcessor:
+    """Обработчик напоминаний на основе заранее развернутых слотов.
+
+    Раз в день (и при появлении новых расписаний) каждый активный опрос
+    разворачивается в строки reminder_slots: (опрос, время, попытка) с
+    абсолютным моментом отправки due_at. Горячий путь - выборка
+    pending-слотов с due_at <= now по индексу (status, due_at), поэтому
+    стоимость прохода пропорциональна количеству наступивших слотов.
+    """
+
+    def __init__(self, session: AsyncSession, partition_lease: Optional[PartitionLease] = None):
+        """Инициализация процессора.
+
+        Args:
+            session: Асинхронная сессия SQLAlchemy
+            partition_lease: Аренда партиций для шардированного режима (опционально)
+        """
+        self.session = session
+        self.partition_lease = partition_lease
+
+    def _partition_filter(self, column: sqlalchemy.ColumnElement[int]) -> list[sqlalchemy.ColumnElement[bool]]:
+        if self.partition_lease is None:
+            return []
+        return [self.partition_lease.partition_filter(column)]
+
+    @staticmethod
+    def build_slots(survey: ScheduledSurveyDBM, slot_date: date, now: datetime) -> List[Dict[str, Any]]:
+        """Развернуть расписание опроса в слоты на день.
+
+        Если расписание разворачивается в течение дня (например, опрос
+        только что создан), из уже прошедших попыток слота остается только
+        последняя, чтобы пациент не получил несколько напоминаний подряд.
+
+        Args:
+            survey: Объект опроса
+            slot_date: День, на который разворачиваются слоты
+            now: Текущее время (UTC)
+
+        Returns:
+            List[Dict[str, Any]]: Значения для вставки в reminder_slots
+        """
+        slots = []
+
+        for scheduled_time in survey.scheduled_times or []:
+            base_due_at = datetime.combine(slot_date, scheduled_time, tzinfo=pytz.UTC)
+            due_times = [
+                base_due_at + timedelta(hours=(attempt - 1) * survey.reminder_interval_hours)
+                for attempt in range(1, survey.max_reminders + 1)
+            ]
+            last_past_attempt = max(
+                (attempt for attempt, due_at in enumerate(due_times, start=1) if due_at <= now),
+                default=1,
+            )
+
+            for attempt, due_at in enumerate(due_times, start=1):
+                if attempt < last_past_attempt:
+                    continue
+                slots.append({
+                    "scheduled_survey_id": survey.id,
+                    "slot_date": slot_date,
+                    "scheduled_time": scheduled_time,
+                    "attempt": attempt,
+                    "due_at": due_at,
+                    "status": ReminderSlotDBM.SlotStatus.PENDING.value,
+                    "creation_dt": now,
+                })
+
+        return slots
+
+    async def fetch_surveys_to_expand(self, today: date) -> List[ScheduledSurveyDBM]:
+        """Получить активные сегодня опросы, для которых еще нет слотов на сегодня."""
+        already_expanded = (
+            sqlalchemy.select(ReminderSlotDBM.id)
+            .where(ReminderSlotDBM.scheduled_survey_id == ScheduledSurveyDBM.id)
+            .where(ReminderSlotDBM.slot_date == today)
+        )
+
+        result = await self.session.execute(
+            sqlalchemy.select(ScheduledSurveyDBM)
+            .where(ScheduledSurveyDBM.is_active)
+            .where(ScheduledSurveyDBM.start_date <= today)
+            .where(ScheduledSurveyDBM.end_date >= today)
+            .where(ScheduledSurveyDBM.next_scheduled_date == today)
+            .where(~already_expanded.exists())
+            .where(*self._partition_filter(ScheduledSurveyDBM.id))
+            .order_by(ScheduledSurveyDBM.id)
+        )
+
+        return result.scalars().all()
+
+    async def expand_day(self, now: datetime) -> int:
+        """Развернуть в слоты все опросы на сегодня, которые еще не развернуты.
+
+        Повторный запуск безопасен: конфликтующие слоты пропускаются.
+
+        Args:
+            now: Текущее время (UTC)
+
+        Returns:
+            int: Количество созданных слотов
+        """
+        today = now.date()
+
+        slots = [
+            slot
+            for survey in await self.fetch_surveys_to_expand(today)
+            for slot in self.build_slots(survey, today, now)
+        ]
+        if not slots:
+            return 0
+
+        result = await self.session.execute(
+            postgresql.insert(ReminderSlotDBM)
+            .on_conflict_do_nothing(constraint="uq_reminder_slots_survey_date_time_attempt")
+            .returning(ReminderSlotDBM.id),
+            slots
+        )
+
+        return len(result.scalars().all())
+
+    async def claim_due_slots(self, now: datetime, limit: int) -> List[ReminderSlotDBM]:
+        """Заблокировать и получить наступившие слоты.
+
+        Args:
+            now: Текущее время (UTC)
+            limit: Максимальное количество слотов
+
+        Returns:
+            List[ReminderSlotDBM]: Слоты со статусом PENDING и due_at <= now
+        """
+        result = await self.session.execute(
+            sqlalchemy.select(ReminderSlotDBM)
+            .where(ReminderSlotDBM.status == ReminderSlotDBM.SlotStatus.PENDING.value)
+            .where(ReminderSlotDBM.due_at <= now)
+            .where(*self._partition_filter(ReminderSlotDBM.scheduled_survey_id))
+            .order_by(ReminderSlotDBM.due_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        return result.scalars().all()
+
+    async def fetch_completed_slots(self, slots: List[ReminderSlotDBM]) -> Set[Tuple[int, date, time]]:
+        """Получить слоты, по которым пациент уже прошел опрос.
+
+        Returns:
+            Set[Tuple[int, date, time]]: Ключи (ID опроса, день, время)
+        """
+        completed_on = sqlalchemy.func.date(sqlalchemy.func.timezone("UTC", SurveyReminderDBM.creation_dt))
+        result = await self.session.execute(
+            sqlalchemy.select(
+                SurveyReminderDBM.scheduled_survey_id,
+                completed_on,
+                SurveyReminderDBM.scheduled_time,
+            )
+            .where(SurveyReminderDBM.scheduled_survey_id.in_({slot.scheduled_survey_id for slot in slots}))
+            .where(SurveyReminderDBM.status == SurveyReminderDBM.ReminderStatus.COMPLETED.value)
+            .where(SurveyReminderDBM.creation_dt >= datetime.combine(
+                min(slot.slot_date for slot in slots), datetime.min.time(), tzinfo=pytz.UTC
+            ))
+            .distinct()
+        )
+
+        return set(result.tuples().all())
+
+    async def mark_slots(self, slot_ids: List[int], status: str) -> None:
+        """Одним UPDATE выставить статус пачке слотов."""
+        if not slot_ids:
+            return
+
+        await self.session.execute(
+            sqlalchemy.update(ReminderSlotDBM)
+            .where(ReminderSlotDBM.id.in_(slot_ids))
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def process_due(self, now: datetime, limit: int) -> Tuple[int, int]:
+        """Обработать пачку наступивших слотов.
+
+        Для слотов активных и еще не пройденных опросов создаются
+        напоминания в outbox (survey_reminders со статусом PENDING),
+        остальные слоты пропускаются.
+
+        Args:
+            now: Текущее время (UTC)
+            limit: Максимальное количество слотов за проход
+
+        Returns:
+            Tuple[int, int]: (количество обработанных слотов, количество созданных напоминаний)
+        """
+        slots = await self.claim_due_slots(now, limit)
+        if not slots:
+            return 0, 0
+
+        completed = await self.fetch_completed_slots(slots)
+        active_ids = set((await self.session.execute(
+            sqlalchemy.select(ScheduledSurveyDBM.id)
+            .where(ScheduledSurveyDBM.id.in_({slot.scheduled_survey_id for slot in slots}))
+            .where(ScheduledSurveyDBM.is_active)
+        )).scalars().all())
+
+        due_slots = [
+            slot for slot in slots
+            if slot.scheduled_survey_id in active_ids
+            and (slot.scheduled_survey_id, slot.slot_date, slot.scheduled_time) not in completed
+        ]
+        due_slot_ids = {slot.id for slot in due_slots}
+
+        created = 0
+        if due_slots:
+            # Слот уже мог быть отработан другим воркером, потерявшим аренду партиции
+            created = len((await self.session.execute(
+                postgresql.insert(SurveyReminderDBM)
+                .values([
+                    {
+                        "scheduled_survey_id": slot.scheduled_survey_id,
+                        "reminder_number": slot.attempt,
+                        "scheduled_time": slot.scheduled_time,
+                        "status": SurveyReminderDBM.ReminderStatus.PENDING.value,
+                        "creation_dt": now,
+                    }
+                    for slot in due_slots
+                ])
+                .on_conflict_do_nothing(index_elements=SurveyReminderDBM.SLOT_REMINDER_NUMBER_KEY)
+                .returning(SurveyReminderDBM.id)
+            )).all())
+
+        await self.mark_slots(list(due_slot_ids), ReminderSlotDBM.SlotStatus.ENQUEUED.value)
+        await self.mark_slots(
+            [slot.id for slot in slots if slot.id not in due_slot_ids],
+            ReminderSlotDBM.SlotStatus.SKIPPED.value
+        )
+
+        return len(slots), created
+
+    async def skip_completed_slots(self, survey_ids: Collection[int]) -> int:
+        """Пропустить pending-слоты, которые пациент уже прошел.
+
+        Args:
+            survey_ids: ID опросов, по которым пришли ответы
+
+        Returns:
+            int: Количество пропущенных слотов
+        """
+        completed = (
+            sqlalchemy.select(SurveyReminderDBM.id)
+            .where(SurveyReminderDBM.scheduled_survey_id == ReminderSlotDBM.scheduled_survey_id)
+            .where(SurveyReminderDBM.scheduled_time == ReminderSlotDBM.scheduled_time)
+            .where(SurveyReminderDBM.status == SurveyReminderDBM.ReminderStatus.COMPLETED.value)
+            .where(
+                sqlalchemy.func.date(sqlalchemy.func.timezone("UTC", SurveyReminderDBM.creation_dt))
+                == ReminderSlotDBM.slot_date
+            )
+        )
+
+        result = await self.session.execute(
+            sqlalchemy.update(ReminderSlotDBM.__table__)
+            .where(ReminderSlotDBM.scheduled_survey_id.in_(survey_ids))
+            .where(ReminderSlotDBM.status == ReminderSlotDBM.SlotStatus.PENDING.value)
+            .where(*self._partition_filter(ReminderSlotDBM.scheduled_survey_id))
+            .where(completed.exists())
+            .values(status=ReminderSlotDBM.SlotStatus.SKIPPED.value)
+        )
+
+        return result.rowcount
+
+    async def fetch_next_due_at(self) -> Optional[datetime]:
+        """Момент ближайшего pending-слота (по индексу (status, due_at))."""
+        result = await self.session.execute(
+            sqlalchemy.select(sqlalchemy.func.min(ReminderSlotDBM.due_at))
+            .where(ReminderSlotDBM.status == ReminderSlotDBM.SlotStatus.PENDING.value)
+            .where(*self._partition_filter(ReminderSlotDBM.scheduled_survey_id))
+        )
+
+        return result.scalar()
@@ -0,0 +1,31 @@
+from typing import Callable, Optional
+
+from shared.sqlalchemy_db_.notify_channel import ChannelListener, SCHEDULED_SURVEY_CHANGED_CHANNEL
+
+
+class ScheduleChangeListener(ChannelListener):
+    """Подписка планировщика на изменения расписаний через LISTEN/NOTIFY.
+
+    Передает ID измененных опросов в on_change, а после переподключения
+    вызывает on_change(None), чтобы планировщик перечитал состояние.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[Optional[int]], None],
+        health_check_seconds: float = 30,
+        reconnect_seconds: float = 5,
+    ):
+        """Инициализация подписки.
+
+        Args:
+            on_change: Обработчик изменения (ID опроса или None при переподключении)
+            health_check_seconds: Период проверки соединения
+            reconnect_seconds: Пауза перед повторным подключением
+        """
+        super().__init__(
+            SCHEDULED_SURVEY_CHANGED_CHANNEL,
+            on_change,
+            health_check_seconds=health_check_seconds,
+            reconnect_seconds=reconnect_seconds,
+        )
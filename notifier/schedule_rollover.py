@@ -0,0 +1,170 @@
+import pytz
+import sqlalchemy
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import FrozenSet, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.sqlalchemy_db_.daily_stats import update_reminders_status
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+from shared.sqlalchemy_db_.sqlalchemy_model import ReminderSlotDBM, ScheduledSurveyDBM, SurveyReminderDBM
+from notifier.partition_lease import PartitionLease
+
+
+@dataclass
+class RolloverStats:
+    """Итоги перехода расписаний на новый день."""
+    advanced: int = 0
+    deactivated: int = 0
+    failed_reminders: int = 0
+    skipped_slots: int = 0
+
+
+class ScheduleRollover:
+    """Переход расписаний на новый день.
+
+    Раз в сутки (UTC) одним UPDATE переносит next_scheduled_date всех
+    расписаний, день которых закончился, и деактивирует вышедшие за
+    end_date. Напоминания прошлых дней, на которые пациент так и не
+    ответил, помечаются как FAILED, а неотработанные слоты - как SKIPPED.
+    Повторный запуск в тот же день ничего не меняет.
+    """
+
+    def __init__(self, partition_lease: Optional[PartitionLease] = None):
+        """Инициализация.
+
+        Args:
+            partition_lease: Аренда партиций для шардированного режима (опционально)
+        """
+        self.partition_lease = partition_lease
+        self._last_run_key: Optional[Tuple[date, FrozenSet[int]]] = None
+
+    def _run_key(self, today: date) -> Tuple[date, FrozenSet[int]]:
+        # При смене набора партиций переход нужно выполнить и для новых партиций
+        partitions = self.partition_lease.partitions if self.partition_lease is not None else frozenset()
+        return today, partitions
+
+    def _partition_filter(self, column: sqlalchemy.ColumnElement[int]) -> list[sqlalchemy.ColumnElement[bool]]:
+        if self.partition_lease is None:
+            return []
+        return [self.partition_lease.partition_filter(column)]
+
+    async def advance_schedules(self, session: AsyncSession, today: date) -> tuple[int, int]:
+        """Перенести расписания, день которых закончился.
+
+        Новая дата - первая дата по периодичности опроса, не раньше today,
+        поэтому пропущенные дни (например, при простое планировщика)
+        догоняются за один проход.
+
+        Returns:
+            tuple[int, int]: (перенесено, деактивировано)
+        """
+        table = ScheduledSurveyDBM.__table__
+        step = sqlalchemy.case(
+            (
+                table.c.frequency_type == ScheduledSurveyDBM.FrequencyType.EVERY_FEW_DAYS.value,
+                sqlalchemy.func.greatest(sqlalchemy.func.coalesce(table.c.interval_days, 1), 1),
+            ),
+            else_=1,
+        )
+        days_behind = sqlalchemy.literal(today, sqlalchemy.DATE) - table.c.next_scheduled_date
+        next_date = table.c.next_scheduled_date + (days_behind + step - 1) // step * step
+        stays_active = sqlalchemy.and_(
+            table.c.next_scheduled_date.is_not(None),
+            sqlalchemy.or_(table.c.end_date.is_(None), next_date <= table.c.end_date),
+        )
+
+        rolled_over = (
+            sqlalchemy.update(table)
+            .where(table.c.is_active)
+            .where(sqlalchemy.or_(
+                table.c.next_scheduled_date < today,
+                table.c.next_scheduled_date.is_(None),
+            ))
+            .where(*self._partition_filter(table.c.id))
+            .values(
+                next_scheduled_date=sqlalchemy.case((stays_active, next_date), else_=None),
+                is_active=stays_active,
+            )
+            .returning(table.c.is_active)
+            .cte("rolled_over")
+        )
+
+        advanced, deactivated = (await session.execute(
+            sqlalchemy.select(
+                sqlalchemy.func.count().filter(rolled_over.c.is_active),
+                sqlalchemy.func.count().filter(sqlalchemy.not_(rolled_over.c.is_active)),
+            )
+        )).one()
+
+        return advanced, deactivated
+
+    async def fail_unanswered_reminders(self, session: AsyncSession, today: date) -> int:
+        """Пометить как FAILED отправленные до сегодняшнего дня напоминания без ответа."""
+        today_start = datetime.combine(today, datetime.min.time(), tzinfo=pytz.UTC)
+
+        result = await session.execute(
+            update_reminders_status(
+                SurveyReminderDBM.ReminderStatus.FAILED.value,
+                SurveyReminderDBM.status == SurveyReminderDBM.ReminderStatus.SENT.value,
+                SurveyReminderDBM.creation_dt < today_start,
+                *self._partition_filter(SurveyReminderDBM.scheduled_survey_id),
+            )
+        )
+
+        return result.scalar_one()
+
+    async def skip_past_slots(self, session: AsyncSession, today: date) -> int:
+        """Пометить как SKIPPED неотработанные слоты прошлых дней."""
+        result = await session.execute(
+            sqlalchemy.update(ReminderSlotDBM.__table__)
+            .where(ReminderSlotDBM.status == ReminderSlotDBM.SlotStatus.PENDING.value)
+            .where(ReminderSlotDBM.slot_date < today)
+            .where(*self._partition_filter(ReminderSlotDBM.scheduled_survey_id))
+            .values(status=ReminderSlotDBM.SlotStatus.SKIPPED.value)
+        )
+
+        return result.rowcount
+
+    async def run(self, today: date) -> RolloverStats:
+        """Выполнить переход на указанный день в одной транзакции.
+
+        Args:
+            today: Наступивший день (UTC)
+
+        Returns:
+            RolloverStats: Количество затронутых строк
+        """
+        async with get_cached_sqlalchemy_db().new_async_session() as session:
+            try:
+                advanced, deactivated = await self.advance_schedules(session, today)
+                stats = RolloverStats(
+                    advanced=advanced,
+                    deactivated=deactivated,
+                    failed_reminders=await self.fail_unanswered_reminders(session, today),
+                    skipped_slots=await self.skip_past_slots(session, today),
+                )
+
+                await session.commit()
+            except Exception as e:
+                print(f"Ошибка при переходе расписаний на {today}: {str(e)}")
+                await session.rollback()
+                raise
+
+        self._last_run_key = self._run_key(today)
+        print(
+            f"Переход расписаний на {today}: перенесено {stats.advanced}, "
+            f"деактивировано {stats.deactivated}, напоминаний без ответа {stats.failed_reminders}, "
+            f"пропущено слотов {stats.skipped_slots}"
+        )
+        return stats
+
+    async def run_if_due(self, now: datetime) -> Optional[RolloverStats]:
+        """Выполнить переход, если он еще не выполнялся сегодня.
+
+        Returns:
+            Optional[RolloverStats]: Итоги перехода или None, если он уже выполнен
+        """
+        if self._last_run_key == self._run_key(now.date()):
+            return None
+        return await self.run(now.date())
@@ -0,0 +1,159 @@
+import asyncio
+import pytz
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+from shared.sqlalchemy_db_.query_stats import query_scope
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+from notifier.partition_lease import PartitionLease
+from notifier.reminder_outbox import ReminderOutboxDispatcher
+from notifier.reminder_slot_processor import ReminderSlotProcessor
+from notifier.schedule_rollover import ScheduleRollover
+
+
+class SlotSurveyNotifier:
+    """Планировщик уведомлений на основе таблицы reminder_slots.
+
+    Раз в сутки переводит расписания на новый день, периодически
+    разворачивает расписания на сегодня в слоты, а между этими проходами
+    спит до due_at ближайшего pending-слота.
+    """
+
+    def __init__(
+        self,
+        outbox: Optional[ReminderOutboxDispatcher] = None,
+        expand_poll_seconds: float = 30,
+        batch_size: int = 500,
+        partition_lease: Optional[PartitionLease] = None,
+    ):
+        """Инициализация планировщика.
+
+        Args:
+            outbox: Диспетчер outbox, который нужно будить после создания напоминаний (опционально)
+            expand_poll_seconds: Период разворачивания новых расписаний в слоты (в секундах)
+            batch_size: Количество слотов, обрабатываемых за одну транзакцию
+            partition_lease: Аренда партиций для шардированного режима (опционально)
+        """
+        self.outbox = outbox
+        self.expand_poll_interval = timedelta(seconds=expand_poll_seconds)
+        self.batch_size = batch_size
+        self.partition_lease = partition_lease
+        self.rollover = ScheduleRollover(partition_lease)
+
+        self._next_expand_at: Optional[datetime] = None
+        self._next_due_at: Optional[datetime] = None
+        self._changed_survey_ids: Set[int] = set()
+        self._wakeup = asyncio.Event()
+        self._is_running = False
+
+    def schedule_changed(self, scheduled_survey_id: Optional[int]) -> None:
+        """Учесть изменение расписания (вызывается подпиской LISTEN/NOTIFY).
+
+        Args:
+            scheduled_survey_id: ID опроса или None, если изменения неизвестны
+        """
+        if scheduled_survey_id is not None:
+            self._changed_survey_ids.add(scheduled_survey_id)
+        # Новое расписание разворачиваем в слоты сразу
+        self._next_expand_at = None
+        self._wakeup.set()
+
+    async def skip_completed_slots(self) -> None:
+        """Снять оставшиеся попытки по слотам, пройденным пациентами."""
+        changed_ids = list(self._changed_survey_ids)
+        self._changed_survey_ids.clear()
+
+        async with get_cached_sqlalchemy_db().new_async_session() as session:
+            try:
+                await ReminderSlotProcessor(session, self.partition_lease).skip_completed_slots(changed_ids)
+
+                await session.commit()
+            except Exception as e:
+                print(f"Ошибка при снятии пройденных слотов: {str(e)}")
+                await session.rollback()
+                raise
+
+    async def expand(self, now: datetime) -> None:
+        """Развернуть новые расписания в слоты (после перехода на новый день)."""
+        await self.rollover.run_if_due(now)
+
+        async with get_cached_sqlalchemy_db().new_async_session() as session:
+            try:
+                processor = ReminderSlotProcessor(session, self.partition_lease)
+                await processor.expand_day(now)
+
+                await session.commit()
+            except Exception as e:
+                print(f"Ошибка при разворачивании слотов: {str(e)}")
+                await session.rollback()
+                raise
+
+        self._next_expand_at = now + self.expand_poll_interval
+
+    async def process_due_slots(self, now: datetime) -> None:
+        """Обработать все наступившие слоты пачками по batch_size."""
+        while True:
+            async with get_cached_sqlalchemy_db().new_async_session() as session:
+                try:
+                    processor = ReminderSlotProcessor(session, self.partition_lease)
+                    processed, created = await processor.process_due(now, self.batch_size)
+
+                    await session.commit()
+                except Exception as e:
+                    print(f"Ошибка при обработке слотов: {str(e)}")
+                    await session.rollback()
+                    raise
+
+            if created and self.outbox:
+                self.outbox.wakeup()
+            if processed < self.batch_size:
+                break
+
+        async with get_cached_sqlalchemy_db().new_async_session() as session:
+            self._next_due_at = await ReminderSlotProcessor(session, self.partition_lease).fetch_next_due_at()
+
+    async def run_once(self) -> None:
+        """Выполнить все работы, срок которых наступил."""
+        now = datetime.now(tz=pytz.UTC)
+
+        # Набор партиций изменился - сразу разворачиваем новые опросы
+        if self.partition_lease is not None and await self.partition_lease.rebalance():
+            self._next_expand_at = None
+
+        if self._next_expand_at is None or now >= self._next_expand_at:
+            await self.expand(now)
+
+        if self._changed_survey_ids:
+            await self.skip_completed_slots()
+
+        await self.process_due_slots(now)
+
+    async def start(self) -> None:
+        """Запустить планировщик."""
+        self._is_running = True
+        while self._is_running:
+            # Сбрасываем до прохода, чтобы не потерять пробуждение во время него
+            self._wakeup.clear()
+            try:
+                with query_scope("notifier:slots"):
+                    await self.run_once()
+                now = datetime.now(tz=pytz.UTC)
+                next_wakeup_at = min(
+                    moment for moment in (self._next_expand_at, self._next_due_at)
+                    if moment is not None
+                )
+                timeout = max((next_wakeup_at - now).total_seconds(), 0)
+            except Exception as e:
+                print(f"Ошибка в цикле планировщика: {str(e)}")
+                self._next_expand_at = None
+                timeout = self.expand_poll_interval.total_seconds()
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self) -> None:
+        """Остановить планировщик."""
+        self._is_running = False
+        self._wakeup.set()
@@ -0,0 +1,82 @@
+import asyncio
+import pytz
+from datetime import datetime
+from typing import Optional
+
+from shared.sqlalchemy_db_.query_stats import query_scope
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+from notifier.partition_lease import PartitionLease
+from notifier.reminder_outbox import ReminderOutboxDispatcher
+from notifier.reminder_processor import SurveyReminderProcessor
+from notifier.schedule_rollover import ScheduleRollover
+
+
+class SurveyNotifier:
+    """Основной класс для планирования и обработки уведомлений об опросах."""
+    
+    def __init__(
+        self,
+        interval_minutes: int = 15,
+        outbox: Optional[ReminderOutboxDispatcher] = None,
+        partition_lease: Optional[PartitionLease] = None,
+    ):
+        """Инициализация планировщика.
+        
+        Args:
+            interval_minutes: Интервал проверки в минутах (по умолчанию 15)
+            outbox: Диспетчер outbox, который нужно будить после создания напоминаний (опционально)
+            partition_lease: Аренда партиций для шардированного режима (опционально)
+        """
+        self.interval_minutes = interval_minutes
+        self.outbox = outbox
+        self.partition_lease = partition_lease
+        self.rollover = ScheduleRollover(partition_lease)
+        self._wakeup = asyncio.Event()
+        self._is_running = False
+
+    def schedule_changed(self, scheduled_survey_id: Optional[int]) -> None:
+        """Запустить внеочередную проверку (вызывается подпиской LISTEN/NOTIFY)."""
+        self._wakeup.set()
+    
+    async def process_scheduled_surveys(self) -> None:
+        """Обработать запланированные опросы и поставить напоминания в outbox."""
+        if self.partition_lease is not None:
+            await self.partition_lease.rebalance()
+
+        now = datetime.now(tz=pytz.UTC)
+        await self.rollover.run_if_due(now)
+
+        async with get_cached_sqlalchemy_db().new_async_session() as session:
+            try:
+                processor = SurveyReminderProcessor(session, self.partition_lease)
+                created = await processor.process(now=now)
+
+                await session.commit()
+            except Exception as e:
+                print(f"Ошибка при обработке опросов: {str(e)}")
+                await session.rollback()
+                raise
+
+        if created and self.outbox:
+            self.outbox.wakeup()
+    
+    async def start(self) -> None:
+        """Запустить планировщик с указанным интервалом."""
+        self._is_running = True
+        while self._is_running:
+            self._wakeup.clear()
+            try:
+                with query_scope("notifier:polling"):
+                    await self.process_scheduled_surveys()
+            except Exception as e:
+                print(f"Ошибка в цикле планировщика: {str(e)}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval_minutes * 60)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def stop(self) -> None:
+        """Остановить планировщик."""
+        self._is_running = False
+        self._wakeup.set()
@@ -0,0 +1,35 @@
+import argparse
+import os
+
+from shared.config import get_cached_settings
+from shared.sqlalchemy_db_.query_stats import load_query_stats
+
+
+def main(dump_dir: str, top: int, order_by: str) -> None:
+    """Вывести сводку статистики запросов всех процессов."""
+    query_stats = load_query_stats(dump_dir)
+    if not query_stats.fingerprints:
+        print(f"Нет статистики запросов в {dump_dir}")
+        return
+
+    print("\n".join(query_stats.report(top=top, order_by=order_by)))
+
+
+if __name__ == "__main__":
+    settings = get_cached_settings()
+    parser = argparse.ArgumentParser(description="Сводка статистики запросов (самые нагруженные отпечатки и области)")
+    parser.add_argument(
+        "--dir",
+        dest="dump_dir",
+        default=os.path.join(settings.BASE_DIRPATH, settings.database.DB_QUERY_STATS_DIR),
+        help="Каталог дампов статистики, по умолчанию - DB_QUERY_STATS_DIR",
+    )
+    parser.add_argument("--top", type=int, default=20, help="Количество строк в таблицах")
+    parser.add_argument(
+        "--order-by",
+        choices=["total", "count", "max"],
+        default="total",
+        help="Сортировка отпечатков: суммарное время, количество или максимальное время",
+    )
+    args = parser.parse_args()
+    main(args.dump_dir, args.top, args.order_by)
@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+from datetime import date
+from typing import Optional
+
+from shared.sqlalchemy_db_.daily_stats import rebuild_daily_stats
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+
+
+async def main(date_from: Optional[date]) -> None:
+    """Пересчитать survey_daily_stats и survey_adherence_stats по исходным таблицам."""
+    async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+        daily_stats, adherence_stats = await rebuild_daily_stats(async_session, date_from)
+        await async_session.commit()
+
+    print(f"survey_daily_stats: {daily_stats} строк, survey_adherence_stats: {adherence_stats} строк")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пересчет агрегатов статистики опросов")
+    parser.add_argument(
+        "--from",
+        dest="date_from",
+        type=date.fromisoformat,
+        default=None,
+        help="Первый пересчитываемый день (UTC) в формате YYYY-MM-DD, по умолчанию - вся история",
+    )
+    asyncio.run(main(parser.parse_args().date_from))
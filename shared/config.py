@@ -2,13 +2,25 @@ import os
 import pathlib
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import List
-from pydantic import Field, PostgresDsn, computed_field
+from typing import Any, Dict, List, Literal
+from pydantic import BaseModel, Field, PostgresDsn, computed_field
 
 
 BASE_DIRPATH = str(pathlib.Path(__file__).parent.parent)
 
 
+class DatabasePoolSettings(BaseModel):
+    """Настройки пулов соединений одного профиля процесса."""
+
+    DB_POOL_SIZE: int
+    DB_MAX_OVERFLOW: int
+    DB_POOL_TIMEOUT_SECONDS: float
+    DB_POOL_RECYCLE_SECONDS: int
+    DB_POOL_PRE_PING: bool
+    DB_STATEMENT_CACHE_SIZE: int
+    DB_WARMUP_CONNECTIONS: int
+
+
 class DatabaseSettings(BaseSettings):
     """Настройки базы данных."""
     
@@ -18,6 +30,41 @@ class DatabaseSettings(BaseSettings):
     POSTGRES_PORT: int = Field(default=5432)
     POSTGRES_DB: str
 
+    # Пулы соединений по умолчанию; DB_POOL_RECYCLE_SECONDS=-1 - без пересоздания
+    DB_POOL_SIZE: int = Field(default=10)
+    DB_MAX_OVERFLOW: int = Field(default=10)
+    DB_POOL_TIMEOUT_SECONDS: float = Field(default=30)
+    DB_POOL_RECYCLE_SECONDS: int = Field(default=-1)
+    DB_POOL_PRE_PING: bool = Field(default=False)
+    DB_STATEMENT_CACHE_SIZE: int = Field(default=100)
+    DB_WARMUP_CONNECTIONS: int = Field(default=0)
+    # Переопределения для профилей процессов: bot, notifier, admin, export
+    DB_POOL_PROFILES: Dict[str, Dict[str, Any]] = Field(default_factory=lambda: {
+        "admin": {"DB_POOL_SIZE": 2, "DB_MAX_OVERFLOW": 3},
+        "export": {"DB_POOL_SIZE": 1, "DB_MAX_OVERFLOW": 0},
+    })
+
+    # Статистика запросов: медленные запросы, повторы в одной области (N+1), дампы для query_report.py.
+    # По умолчанию выключена, включается в окружении процесса (см. database_settings.env.example)
+    DB_QUERY_STATS: bool = Field(default=False)
+    DB_SLOW_QUERY_MS: float = Field(default=200)
+    DB_N_PLUS_ONE_THRESHOLD: int = Field(default=10)
+    DB_QUERY_STATS_DIR: str = Field(default=os.path.join(BASE_DIRPATH, "query_stats"))
+    DB_QUERY_STATS_FLUSH_SECONDS: float = Field(default=60)
+
+    # Реплики для чтения (выгрузки, списки админки): "host" или "host:port",
+    # пользователь, пароль и БД - как у основного сервера
+    POSTGRES_REPLICAS: List[str] = Field(default_factory=list)
+    DB_REPLICA_MAX_LAG_SECONDS: float = Field(default=30)
+    DB_REPLICA_CHECK_SECONDS: float = Field(default=10)
+    DB_REPLICA_CONNECT_TIMEOUT_SECONDS: float = Field(default=5)
+
+    def get_pool_settings(self, profile: str) -> DatabasePoolSettings:
+        """Настройки пулов для профиля процесса с учетом DB_POOL_PROFILES."""
+        values = {name: getattr(self, name) for name in DatabasePoolSettings.model_fields}
+        values.update(self.DB_POOL_PROFILES.get(profile, {}))
+        return DatabasePoolSettings.model_validate(values)
+
     @computed_field
     @property
     def DATABASE_URL(self) -> PostgresDsn:
@@ -44,6 +91,32 @@ class DatabaseSettings(BaseSettings):
             path=self.POSTGRES_DB
         ))
 
+    def _replica_urls(self, scheme: str) -> List[str]:
+        urls = []
+        for replica in self.POSTGRES_REPLICAS:
+            host, _, port = replica.partition(":")
+            urls.append(str(PostgresDsn.build(
+                scheme=scheme,
+                username=self.POSTGRES_USER,
+                password=self.POSTGRES_PASSWORD,
+                host=host,
+                port=int(port) if port else self.POSTGRES_PORT,
+                path=self.POSTGRES_DB
+            )))
+        return urls
+
+    @computed_field
+    @property
+    def REPLICA_DATABASE_URLS(self) -> List[str]:
+        """URL реплик для синхронных подключений."""
+        return self._replica_urls("postgresql+psycopg2")
+
+    @computed_field
+    @property
+    def ASYNC_REPLICA_DATABASE_URLS(self) -> List[str]:
+        """URL реплик для асинхронных подключений."""
+        return self._replica_urls("postgresql+asyncpg")
+
     class Config:
         env_file = os.path.join(BASE_DIRPATH, "database_settings.env")
         env_file_encoding = "utf-8"
@@ -68,6 +141,15 @@ class BotSettings(BaseSettings):
     
     BOT_TOKEN: str
     ADMIN_IDS: List[int]
+    BOT_USER_CACHE_SIZE: int = Field(default=10000)
+    BOT_USER_CACHE_TTL_SECONDS: float = Field(default=300)
+    BOT_SURVEY_CACHE_SIZE: int = Field(default=1000)
+    BOT_FSM_STORAGE: Literal["memory", "postgres"] = Field(default="postgres")
+    BOT_FSM_STATE_TTL_HOURS: float = Field(default=72)
+    BOT_FSM_FLUSH_INTERVAL_SECONDS: float = Field(default=0.2)
+    BOT_EXPORT_FORMAT: Literal["xlsx", "csv"] = Field(default="xlsx")
+    BOT_EXPORT_WORKERS: int = Field(default=2)
+    BOT_EXPORT_CACHE_SIZE: int = Field(default=32)
 
     class Config:
         env_file = os.path.join(BASE_DIRPATH, "bot_settings.env")
@@ -75,12 +157,40 @@ class BotSettings(BaseSettings):
         case_sensitive = True
 
 
+class NotifierSettings(BaseSettings):
+    """Настройки планировщика уведомлений."""
+    
+    NOTIFIER_MODE: Literal["deadline", "polling", "slots"] = Field(default="deadline")
+    NOTIFIER_INTERVAL_MINUTES: int = Field(default=1)
+    NOTIFIER_NEW_SCHEDULES_POLL_SECONDS: float = Field(default=300)
+    NOTIFIER_RESYNC_MINUTES: float = Field(default=30)
+    NOTIFIER_DISPATCH_WORKERS: int = Field(default=16)
+    NOTIFIER_RATE_LIMIT_PER_SECOND: float = Field(default=30)
+    NOTIFIER_PER_CHAT_INTERVAL_SECONDS: float = Field(default=1.0)
+    NOTIFIER_DISPATCH_MAX_RETRIES: int = Field(default=3)
+    NOTIFIER_OUTBOX_BATCH_SIZE: int = Field(default=100)
+    NOTIFIER_OUTBOX_POLL_SECONDS: float = Field(default=5)
+    NOTIFIER_OUTBOX_MAX_AGE_MINUTES: float = Field(default=60)
+    NOTIFIER_OUTBOX_CLAIM_TIMEOUT_MINUTES: float = Field(default=10)
+    NOTIFIER_OUTBOX_MAX_IN_FLIGHT_BATCHES: int = Field(default=4)
+    NOTIFIER_WORKER_COUNT: int = Field(default=1)
+    NOTIFIER_SHARD_ID: int = Field(default=0)
+    NOTIFIER_PARTITION_COUNT: int = Field(default=64)
+    NOTIFIER_SLOT_BATCH_SIZE: int = Field(default=500)
+
+    class Config:
+        env_file = os.path.join(BASE_DIRPATH, "notifier_settings.env")
+        env_file_encoding = "utf-8"
+        case_sensitive = True
+
+
 class Settings(BaseSettings):
     """Основные настройки приложения."""
     
     database: DatabaseSettings = DatabaseSettings()
     admin: AdminSettings = AdminSettings()
     bot: BotSettings = BotSettings()
+    notifier: NotifierSettings = NotifierSettings()
     BASE_DIRPATH: str = BASE_DIRPATH
 
 
@@ -0,0 +1,54 @@
+"""query indexes
+
+Revision ID: 3f6c1d8e2b7a
+Revises: 9a3d5c7e1f48
+Create Date: 2026-10-18 12:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6c1d8e2b7a'
+down_revision: Union[str, None] = '9a3d5c7e1f48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индексы под диапазоны по creation_dt в запросах планировщика и статистики
+    op.create_index(
+        'ix_survey_reminders_survey_time_creation_dt', 'survey_reminders',
+        ['scheduled_survey_id', 'scheduled_time', 'creation_dt'],
+        unique=False, if_not_exists=True
+    )
+    op.create_index(
+        'ix_survey_reminders_pending_creation_dt', 'survey_reminders', ['creation_dt'],
+        unique=False, postgresql_where=sa.text("status = 'pending'"), if_not_exists=True
+    )
+    op.create_index(
+        'ix_survey_responses_survey_creation_dt_time', 'survey_responses',
+        ['scheduled_survey_id', 'creation_dt', 'scheduled_time'],
+        unique=False, if_not_exists=True
+    )
+    op.create_index(
+        'ix_survey_responses_patient_creation_dt', 'survey_responses', ['patient_id', 'creation_dt'],
+        unique=False, if_not_exists=True
+    )
+    op.create_index(
+        'ix_scheduled_surveys_active_next_scheduled_date', 'scheduled_surveys', ['next_scheduled_date'],
+        unique=False, postgresql_where=sa.text('is_active'), if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_scheduled_surveys_active_next_scheduled_date', table_name='scheduled_surveys', if_exists=True)
+    op.drop_index('ix_survey_responses_patient_creation_dt', table_name='survey_responses', if_exists=True)
+    op.drop_index('ix_survey_responses_survey_creation_dt_time', table_name='survey_responses', if_exists=True)
+    op.drop_index('ix_survey_reminders_pending_creation_dt', table_name='survey_reminders', if_exists=True)
+    op.drop_index('ix_survey_reminders_survey_time_creation_dt', table_name='survey_reminders', if_exists=True)
@@ -0,0 +1,44 @@
+"""fsm states
+
+Revision ID: 5b9e7f1a3c24
+Revises: 8d2e4a7c9f13
+Create Date: 2026-10-18 15:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9e7f1a3c24'
+down_revision: Union[str, None] = '8d2e4a7c9f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'fsm_states',
+        sa.Column('id', sa.BIGINT(), autoincrement=True, nullable=False),
+        sa.Column('creation_dt', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('storage_key', sa.TEXT(), nullable=False, comment='Ключ FSM (бот, чат, пользователь)'),
+        sa.Column('state', sa.TEXT(), nullable=True, comment='Текущее состояние FSM'),
+        sa.Column('data', sa.LargeBinary(), nullable=True, comment='Сериализованные данные FSM'),
+        sa.Column(
+            'expires_at', sa.TIMESTAMP(timezone=True), nullable=False,
+            comment='Момент, после которого брошенное состояние удаляется'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('storage_key'),
+        if_not_exists=True,
+    )
+    op.create_index('ix_fsm_states_expires_at', 'fsm_states', ['expires_at'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_fsm_states_expires_at', table_name='fsm_states', if_exists=True)
+    op.drop_table('fsm_states', if_exists=True)
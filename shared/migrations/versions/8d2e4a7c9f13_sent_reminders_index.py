@@ -0,0 +1,31 @@
+"""sent reminders index
+
+Revision ID: 8d2e4a7c9f13
+Revises: 3f6c1d8e2b7a
+Create Date: 2026-10-18 14:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4a7c9f13'
+down_revision: Union[str, None] = '3f6c1d8e2b7a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_survey_reminders_sent_creation_dt', 'survey_reminders', ['creation_dt'],
+        unique=False, postgresql_where=sa.text("status = 'sent'"), if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_survey_reminders_sent_creation_dt', table_name='survey_reminders', if_exists=True)
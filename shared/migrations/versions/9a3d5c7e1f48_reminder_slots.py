@@ -0,0 +1,51 @@
+"""reminder slots
+
+Revision ID: 9a3d5c7e1f48
+Revises: d3a9c5e7f2b4
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3d5c7e1f48'
+down_revision: Union[str, None] = 'd3a9c5e7f2b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Развернутые на день слоты напоминаний для режима NOTIFIER_MODE=slots
+    op.create_table(
+        'reminder_slots',
+        sa.Column('id', sa.BIGINT(), autoincrement=True, nullable=False),
+        sa.Column('creation_dt', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('scheduled_survey_id', sa.BIGINT(), nullable=False, comment='ID запланированного опроса'),
+        sa.Column('slot_date', sa.DATE(), nullable=False, comment='День, на который развернут слот (UTC)'),
+        sa.Column('scheduled_time', sa.TIME(), nullable=False, comment='Время слота из расписания'),
+        sa.Column('attempt', sa.INTEGER(), nullable=False, comment='Номер напоминания в слоте (1, 2, 3...)'),
+        sa.Column('due_at', sa.TIMESTAMP(timezone=True), nullable=False, comment='Момент отправки напоминания (UTC)'),
+        sa.Column('status', sa.String(length=20), nullable=False, comment='Статус слота: pending, enqueued, skipped'),
+        sa.ForeignKeyConstraint(['scheduled_survey_id'], ['scheduled_surveys.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'scheduled_survey_id', 'slot_date', 'scheduled_time', 'attempt',
+            name='uq_reminder_slots_survey_date_time_attempt'
+        ),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_reminder_slots_status_due_at', 'reminder_slots', ['status', 'due_at'],
+        unique=False, if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reminder_slots_status_due_at', table_name='reminder_slots', if_exists=True)
+    op.drop_table('reminder_slots', if_exists=True)
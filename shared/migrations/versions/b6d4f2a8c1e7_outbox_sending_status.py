@@ -0,0 +1,40 @@
+"""outbox sending status
+
+Revision ID: b6d4f2a8c1e7
+Revises: a2489b06d216
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d4f2a8c1e7'
+down_revision: Union[str, None] = 'a2489b06d216'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Alembic 1.15 не поддерживает if_not_exists в add_column
+    op.execute("ALTER TABLE survey_reminders ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP WITH TIME ZONE")
+    op.execute(
+        "COMMENT ON COLUMN survey_reminders.claimed_at "
+        "IS 'Время, когда воркер outbox забрал напоминание на отправку'"
+    )
+    op.create_index(
+        'ix_survey_reminders_sending_claimed_at', 'survey_reminders', ['claimed_at'],
+        unique=False, postgresql_where=sa.text("status = 'sending'"), if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Отправки в процессе возвращаются в outbox
+    op.execute("UPDATE survey_reminders SET status = 'pending' WHERE status = 'sending'")
+    op.drop_index('ix_survey_reminders_sending_claimed_at', table_name='survey_reminders', if_exists=True)
+    op.execute("ALTER TABLE survey_reminders DROP COLUMN IF EXISTS claimed_at")
@@ -0,0 +1,70 @@
+"""survey submission constraints
+
+Revision ID: c7a1e5d3b9f2
+Revises: 5b9e7f1a3c24
+Create Date: 2026-10-18 18:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a1e5d3b9f2'
+down_revision: Union[str, None] = '5b9e7f1a3c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Ответ ссылается на напоминание, повторная отправка того же прохождения отсекается ключом
+    op.execute("ALTER TABLE survey_responses ADD COLUMN IF NOT EXISTS survey_reminder_id BIGINT")
+    op.execute(
+        "COMMENT ON COLUMN survey_responses.survey_reminder_id IS 'ID напоминания, по которому пройден опрос'"
+    )
+    op.execute(
+        "ALTER TABLE survey_responses DROP CONSTRAINT IF EXISTS survey_responses_survey_reminder_id_fkey"
+    )
+    op.create_foreign_key(
+        'survey_responses_survey_reminder_id_fkey', 'survey_responses', 'survey_reminders',
+        ['survey_reminder_id'], ['id'], ondelete='SET NULL'
+    )
+    op.execute(
+        "ALTER TABLE survey_responses DROP CONSTRAINT IF EXISTS uq_survey_responses_reminder_question"
+    )
+    op.create_unique_constraint(
+        'uq_survey_responses_reminder_question', 'survey_responses', ['survey_reminder_id', 'question_id']
+    )
+
+    # До ограничения гонка двойного нажатия могла завершить слот дважды: оставляем первое прохождение
+    op.execute("""
+        UPDATE survey_reminders AS duplicate
+        SET status = 'failed'
+        FROM survey_reminders AS kept
+        WHERE duplicate.status = 'completed'
+          AND kept.status = 'completed'
+          AND kept.scheduled_survey_id = duplicate.scheduled_survey_id
+          AND kept.scheduled_time = duplicate.scheduled_time
+          AND date(timezone('UTC', kept.creation_dt)) = date(timezone('UTC', duplicate.creation_dt))
+          AND kept.id < duplicate.id
+    """)
+    op.create_index(
+        'uq_survey_reminders_completed_slot', 'survey_reminders',
+        ['scheduled_survey_id', 'scheduled_time', sa.text("date(timezone('UTC', creation_dt))")],
+        unique=True, postgresql_where=sa.text("status = 'completed'"), if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_survey_reminders_completed_slot', table_name='survey_reminders', if_exists=True)
+    op.execute(
+        "ALTER TABLE survey_responses DROP CONSTRAINT IF EXISTS uq_survey_responses_reminder_question"
+    )
+    op.execute(
+        "ALTER TABLE survey_responses DROP CONSTRAINT IF EXISTS survey_responses_survey_reminder_id_fkey"
+    )
+    op.execute("ALTER TABLE survey_responses DROP COLUMN IF EXISTS survey_reminder_id")
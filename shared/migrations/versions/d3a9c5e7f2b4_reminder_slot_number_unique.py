@@ -0,0 +1,62 @@
+"""reminder slot number unique
+
+Revision ID: d3a9c5e7f2b4
+Revises: b6d4f2a8c1e7
+Create Date: 2026-10-19 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a9c5e7f2b4'
+down_revision: Union[str, None] = 'b6d4f2a8c1e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Прежний notifier считал номер как len(reminders) + 1 без блокировки и по дате в поясе сессии,
+    # поэтому в одном UTC-дне слота номера могли совпадать: перенумеровываем такие слоты по порядку id
+    op.execute("""
+        WITH duplicated_slots AS (
+            SELECT DISTINCT scheduled_survey_id, scheduled_time, date(timezone('UTC', creation_dt)) AS slot_date
+            FROM survey_reminders
+            GROUP BY scheduled_survey_id, scheduled_time, date(timezone('UTC', creation_dt)), reminder_number
+            HAVING count(*) > 1
+        ),
+        renumbered AS (
+            SELECT
+                reminder.id,
+                row_number() OVER (
+                    PARTITION BY reminder.scheduled_survey_id, reminder.scheduled_time,
+                                 date(timezone('UTC', reminder.creation_dt))
+                    ORDER BY reminder.id
+                ) AS reminder_number
+            FROM survey_reminders AS reminder
+            JOIN duplicated_slots AS slot
+              ON slot.scheduled_survey_id = reminder.scheduled_survey_id
+             AND slot.scheduled_time = reminder.scheduled_time
+             AND slot.slot_date = date(timezone('UTC', reminder.creation_dt))
+        )
+        UPDATE survey_reminders AS reminder
+        SET reminder_number = renumbered.reminder_number
+        FROM renumbered
+        WHERE reminder.id = renumbered.id
+          AND reminder.reminder_number <> renumbered.reminder_number
+    """)
+    # Повторное напоминание с тем же номером в слоте отсекается уникальным индексом
+    op.create_index(
+        'uq_survey_reminders_slot_reminder_number', 'survey_reminders',
+        ['scheduled_survey_id', 'scheduled_time', 'reminder_number', sa.text("date(timezone('UTC', creation_dt))")],
+        unique=True, if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_survey_reminders_slot_reminder_number', table_name='survey_reminders', if_exists=True)
@@ -0,0 +1,89 @@
+"""survey daily stats
+
+Revision ID: e4b8d2f6a1c9
+Revises: c7a1e5d3b9f2
+Create Date: 2026-10-18 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b8d2f6a1c9'
+down_revision: Union[str, None] = 'c7a1e5d3b9f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Дневные агрегаты ответов и соблюдения расписания
+    op.create_table(
+        'survey_daily_stats',
+        sa.Column('id', sa.BIGINT(), autoincrement=True, nullable=False),
+        sa.Column('creation_dt', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('scheduled_survey_id', sa.BIGINT(), nullable=False, comment='ID запланированного опроса'),
+        sa.Column('stat_date', sa.DATE(), nullable=False, comment='День ответа (UTC)'),
+        sa.Column('scheduled_time', sa.TIME(), nullable=False, comment='Запланированное время прохождения'),
+        sa.Column('question_id', sa.BIGINT(), nullable=False, comment='ID вопроса'),
+        sa.Column('answer', sa.TEXT(), nullable=True, comment='Вариант ответа'),
+        sa.Column('answers_count', sa.INTEGER(), nullable=False, comment='Количество таких ответов'),
+        sa.ForeignKeyConstraint(['scheduled_survey_id'], ['scheduled_surveys.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['question_id'], ['question.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'scheduled_survey_id', 'stat_date', 'scheduled_time', 'question_id', 'answer',
+            name='uq_survey_daily_stats_key', postgresql_nulls_not_distinct=True
+        ),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'survey_adherence_stats',
+        sa.Column('id', sa.BIGINT(), autoincrement=True, nullable=False),
+        sa.Column('creation_dt', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column(
+            'scheduled_survey_id', sa.BIGINT(), nullable=False,
+            comment='ID запланированного опроса (опрос конкретного пациента)'
+        ),
+        sa.Column('stat_date', sa.DATE(), nullable=False, comment='День напоминаний (UTC)'),
+        sa.Column('sent_count', sa.INTEGER(), nullable=False, comment='Напоминаний в статусе sent'),
+        sa.Column('completed_count', sa.INTEGER(), nullable=False, comment='Напоминаний в статусе completed'),
+        sa.Column('failed_count', sa.INTEGER(), nullable=False, comment='Напоминаний в статусе failed'),
+        sa.ForeignKeyConstraint(['scheduled_survey_id'], ['scheduled_surveys.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('scheduled_survey_id', 'stat_date', name='uq_survey_adherence_stats_key'),
+        if_not_exists=True,
+    )
+
+    # Первичное заполнение; позже пересчитывается скриптом rebuild_daily_stats.py
+    op.execute("DELETE FROM survey_daily_stats")
+    op.execute("""
+        INSERT INTO survey_daily_stats
+            (creation_dt, scheduled_survey_id, stat_date, scheduled_time, question_id, answer, answers_count)
+        SELECT now(), scheduled_survey_id, date(timezone('UTC', creation_dt)), scheduled_time,
+               question_id, answer, count(*)
+        FROM survey_responses
+        WHERE scheduled_survey_id IS NOT NULL
+        GROUP BY scheduled_survey_id, date(timezone('UTC', creation_dt)), scheduled_time, question_id, answer
+    """)
+    op.execute("DELETE FROM survey_adherence_stats")
+    op.execute("""
+        INSERT INTO survey_adherence_stats
+            (creation_dt, scheduled_survey_id, stat_date, sent_count, completed_count, failed_count)
+        SELECT now(), scheduled_survey_id, date(timezone('UTC', creation_dt)),
+               count(*) FILTER (WHERE status = 'sent'),
+               count(*) FILTER (WHERE status = 'completed'),
+               count(*) FILTER (WHERE status = 'failed')
+        FROM survey_reminders
+        WHERE status IN ('sent', 'completed', 'failed')
+        GROUP BY scheduled_survey_id, date(timezone('UTC', creation_dt))
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('survey_adherence_stats', if_exists=True)
+    op.drop_table('survey_daily_stats', if_exists=True)
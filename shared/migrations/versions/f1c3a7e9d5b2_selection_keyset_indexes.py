@@ -0,0 +1,36 @@
+"""selection keyset indexes
+
+Revision ID: f1c3a7e9d5b2
+Revises: e4b8d2f6a1c9
+Create Date: 2026-10-18 23:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c3a7e9d5b2'
+down_revision: Union[str, None] = 'e4b8d2f6a1c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_surveys_active_created_by_id', 'surveys', ['created_by', 'id'],
+        unique=False, postgresql_where=sa.text('is_active'), if_not_exists=True
+    )
+    op.create_index(
+        'ix_user_active_role_id', 'user', ['role', 'id'],
+        unique=False, postgresql_where=sa.text('is_active'), if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_active_role_id', table_name='user', if_exists=True)
+    op.drop_index('ix_surveys_active_created_by_id', table_name='surveys', if_exists=True)
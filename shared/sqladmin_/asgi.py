@@ -1,3 +1,5 @@
 from shared.sqladmin_.create_sqladmin_app import create_sqladmin_app
+from shared.sqlalchemy_db_.sqlalchemy_db import set_sqlalchemy_db_profile
 
+set_sqlalchemy_db_profile("admin")
 app = create_sqladmin_app()
\ No newline at end of file
@@ -3,9 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqladmin import Admin
 from sqladmin.authentication import AuthenticationBackend  # Измененный импорт
+from sqlalchemy.orm import sessionmaker
 
 from shared.config import get_cached_settings
 from shared.sqladmin_.model_view import SimpleMV
+from shared.sqladmin_.model_view.common import notify_changes_on_flush
 from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
 
 
@@ -59,9 +61,14 @@ def create_sqladmin_app():
 
     # Используем правильный класс аутентификации
     authentication_backend = AdminAuth(secret_key=get_cached_settings().admin.SECRET_KEY)
+    get_cached_sqlalchemy_db().warm_up()
+    # Правки идут через синхронный движок, о них бот узнает из NOTIFY в той же транзакции
+    session_maker = sessionmaker(bind=get_cached_sqlalchemy_db().engine)
+    notify_changes_on_flush(session_maker)
     admin = Admin(
         app=sqladmin_app,
         engine=get_cached_sqlalchemy_db().engine,
+        session_maker=session_maker,
         authentication_backend=authentication_backend
     )
 
@@ -6,4 +6,7 @@ from shared.sqladmin_.model_view.survey_question import SurveyQuestionMV
 from shared.sqladmin_.model_view.doctor_patient import DoctorPatientMV
 from shared.sqladmin_.model_view.survey_responses import SurveyResponseMV
 from shared.sqladmin_.model_view.scheduled_survey import ScheduledSurveyMV
-from shared.sqladmin_.model_view.survey_reminders import SurveyReminderMV
\ No newline at end of file
+from shared.sqladmin_.model_view.survey_reminders import SurveyReminderMV
+from shared.sqladmin_.model_view.reminder_slots import ReminderSlotMV
+from shared.sqladmin_.model_view.survey_daily_stats import SurveyDailyStatsMV
+from shared.sqladmin_.model_view.survey_adherence_stats import SurveyAdherenceStatsMV
@@ -1,4 +1,19 @@
+from contextvars import ContextVar
+from typing import Any, ClassVar, Iterable, List, Optional, Union
+
+import sqlalchemy
 from sqladmin import ModelView
+from sqladmin.pagination import Pagination
+from sqlalchemy import ClauseElement, Connection
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.requests import Request
+
+from shared.sqlalchemy_db_.notify_channel import notify_query
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+
+
+# Запросы текущего обращения к админке читаются с реплики
+_read_from_replica: ContextVar[bool] = ContextVar("read_from_replica", default=False)
 
 
 class SimpleMV(ModelView):
@@ -13,6 +28,93 @@ class SimpleMV(ModelView):
     save_as_continue = True
     export_types = ["xlsx", "csv", "json"]
 
+    # Канал LISTEN/NOTIFY, через который бот узнает о правках (None - не сообщать)
+    notify_channel: ClassVar[Optional[str]] = None
+
+    @classmethod
+    def get_changed_ids(cls, connection: Connection, model: Any, is_created: bool) -> Iterable[Optional[int]]:
+        """ID для уведомления в notify_channel о правке model.
+
+        Вызывается перед flush правки, связанные строки еще не изменены.
+
+        Args:
+            connection: Соединение транзакции правки
+            model: Созданный, измененный или удаляемый объект
+            is_created: Объект создается
+        """
+        return ()
+
+    # Списки (со счетчиком строк) и экспорт - самые тяжелые запросы админки,
+    # они читаются с реплики. Формы редактирования и удаление
+    # работают с основным сервером, чтобы не сохранить устаревшие значения
+    async def list(self, request: Request) -> Pagination:
+        token = _read_from_replica.set(True)
+        try:
+            return await super().list(request)
+        finally:
+            _read_from_replica.reset(token)
+
+    async def get_model_objects(self, request: Request, limit: Union[int, None] = 0) -> List[Any]:
+        token = _read_from_replica.set(True)
+        try:
+            return await super().get_model_objects(request, limit)
+        finally:
+            _read_from_replica.reset(token)
+
+    def _run_query_sync(self, stmt: ClauseElement) -> Any:
+        # Выполняется в потоке anyio, контекст (и _read_from_replica) копируется в него
+        if not _read_from_replica.get():
+            return super()._run_query_sync(stmt)
+
+        with get_cached_sqlalchemy_db().new_session(readonly=True, expire_on_commit=False) as session:
+            return session.execute(stmt).scalars().unique().all()
+
+
+def attribute_values(connection: Connection, model: Any, key: str) -> list[Any]:
+    """Новое и сохраненное в БД значения атрибута объекта до flush.
+
+    Сохраненное значение читается из таблицы: после commit атрибуты
+    сброшены, и прежнего значения в истории атрибута нет.
+    """
+    values = [getattr(model, key)]
+    if sqlalchemy.inspect(model).persistent:
+        model_class = type(model)
+        values.extend(connection.execute(
+            sqlalchemy.select(getattr(model_class, key)).where(model_class.id == model.id)
+        ).scalars())
+    return values
+
+
+def notify_changes_on_flush(session_maker: sessionmaker) -> None:
+    """Сообщать боту о правках в админке в транзакции самой правки.
+
+    NOTIFY выполняется перед flush на соединении сессии, поэтому
+    доставляется только после commit правки и отменяется вместе с ней.
+
+    Args:
+        session_maker: Синхронный sessionmaker админки
+    """
+    views = {
+        view.model: view
+        for view in get_simple_mv_class().__subclasses__()
+        if view.notify_channel is not None
+    }
+
+    def before_flush(session: Session, flush_context: Any, instances: Any) -> None:
+        connection = session.connection()
+        notifications = set()
+        for model in (*session.new, *session.dirty, *session.deleted):
+            view = views.get(type(model))
+            if view is None:
+                continue
+            ids = view.get_changed_ids(connection, model, model in session.new)
+            notifications.update((view.notify_channel, id_) for id_ in ids if id_ is not None)
+
+        for channel, id_ in sorted(notifications):
+            connection.execute(notify_query(channel, id_))
+
+    sqlalchemy.event.listen(session_maker, "before_flush", before_flush)
+
 
 def get_simple_mv_class() -> type[SimpleMV]:
     from shared.sqladmin_.model_view import SimpleMV
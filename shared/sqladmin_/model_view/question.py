@@ -1,5 +1,11 @@
+from typing import Any, Iterable, Optional
+
+import sqlalchemy
+from sqlalchemy import Connection
+
 from shared.sqladmin_.model_view.common import SimpleMV
-from shared.sqlalchemy_db_.sqlalchemy_model import QuestionDBM, UserDBM
+from shared.sqlalchemy_db_.notify_channel import SURVEY_CHANGED_CHANNEL
+from shared.sqlalchemy_db_.sqlalchemy_model import QuestionDBM, SurveyQuestionDBM, UserDBM
 
 from sqlalchemy.orm import Session
 
@@ -48,4 +54,17 @@ class QuestionMV(SimpleMV, model=QuestionDBM):
         QuestionDBM.is_public,
         QuestionDBM.question_type,
         QuestionDBM.question_type,
-    ]
\ No newline at end of file
+    ]
+
+    # Правка или удаление вопроса меняет описания всех опросов, в которые он входит
+    notify_channel = SURVEY_CHANGED_CHANNEL
+
+    @classmethod
+    def get_changed_ids(cls, connection: Connection, model: Any, is_created: bool) -> Iterable[Optional[int]]:
+        if is_created:
+            return ()
+        return connection.execute(
+            sqlalchemy.select(SurveyQuestionDBM.survey_id)
+            .where(SurveyQuestionDBM.question_id == model.id)
+            .distinct()
+        ).scalars().all()
@@ -0,0 +1,54 @@
+from shared.sqladmin_.model_view.common import SimpleMV
+from shared.sqlalchemy_db_.sqlalchemy_model import ReminderSlotDBM
+
+class ReminderSlotMV(SimpleMV, model=ReminderSlotDBM):
+    name = "ReminderSlot"
+    name_plural = "ReminderSlots"
+    icon = "fa-solid fa-clock"
+    
+    column_list = [
+        ReminderSlotDBM.id,
+        ReminderSlotDBM.scheduled_survey,
+        ReminderSlotDBM.slot_date,
+        ReminderSlotDBM.scheduled_time,
+        ReminderSlotDBM.attempt,
+        ReminderSlotDBM.due_at,
+        ReminderSlotDBM.status,
+    ]
+    
+    form_columns = [
+        ReminderSlotDBM.scheduled_survey_id,
+        ReminderSlotDBM.slot_date,
+        ReminderSlotDBM.scheduled_time,
+        ReminderSlotDBM.attempt,
+        ReminderSlotDBM.due_at,
+        ReminderSlotDBM.status,
+    ]
+    
+    column_details_list = [
+        ReminderSlotDBM.id,
+        ReminderSlotDBM.creation_dt,
+        ReminderSlotDBM.scheduled_survey_id,
+        ReminderSlotDBM.slot_date,
+        ReminderSlotDBM.scheduled_time,
+        ReminderSlotDBM.attempt,
+        ReminderSlotDBM.due_at,
+        ReminderSlotDBM.status,
+    ]
+    
+    column_sortable_list = [
+        ReminderSlotDBM.id,
+        ReminderSlotDBM.due_at,
+        ReminderSlotDBM.scheduled_survey_id,
+    ]
+    
+    column_default_sort = [(ReminderSlotDBM.due_at, False)]
+    
+    column_searchable_list = [
+        ReminderSlotDBM.scheduled_survey_id,
+    ]
+    
+    column_filters = [
+        ReminderSlotDBM.status,
+        ReminderSlotDBM.slot_date,
+    ]
@@ -1,4 +1,9 @@
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import Connection
+
 from shared.sqladmin_.model_view.common import SimpleMV
+from shared.sqlalchemy_db_.notify_channel import SURVEY_CHANGED_CHANNEL
 from shared.sqlalchemy_db_.sqlalchemy_model import SurveyDBM, UserDBM
 import sqlalchemy
 
@@ -56,4 +61,11 @@ class SurveyMV(SimpleMV, model=SurveyDBM):
     column_filters = [
         SurveyDBM.is_active,
         "author"
-    ]
\ No newline at end of file
+    ]
+
+    notify_channel = SURVEY_CHANGED_CHANNEL
+
+    @classmethod
+    def get_changed_ids(cls, connection: Connection, model: Any, is_created: bool) -> Iterable[Optional[int]]:
+        # Нового опроса еще нет в кэше описаний
+        return () if is_created else (model.id,)
@@ -0,0 +1,47 @@
+from shared.sqladmin_.model_view.common import SimpleMV
+from shared.sqlalchemy_db_.sqlalchemy_model import SurveyAdherenceStatsDBM
+
+class SurveyAdherenceStatsMV(SimpleMV, model=SurveyAdherenceStatsDBM):
+    name = "Survey Adherence Stats"
+    name_plural = "Survey Adherence Stats"
+    icon = "fa-solid fa-chart-line"
+
+    # Агрегаты ведутся автоматически (см. shared/sqlalchemy_db_/daily_stats.py)
+    can_create = False
+    can_edit = False
+    can_delete = False
+    
+    column_list = [
+        SurveyAdherenceStatsDBM.id,
+        SurveyAdherenceStatsDBM.scheduled_survey,
+        SurveyAdherenceStatsDBM.stat_date,
+        SurveyAdherenceStatsDBM.sent_count,
+        SurveyAdherenceStatsDBM.completed_count,
+        SurveyAdherenceStatsDBM.failed_count,
+    ]
+    
+    column_details_list = [
+        SurveyAdherenceStatsDBM.id,
+        SurveyAdherenceStatsDBM.creation_dt,
+        SurveyAdherenceStatsDBM.scheduled_survey_id,
+        SurveyAdherenceStatsDBM.stat_date,
+        SurveyAdherenceStatsDBM.sent_count,
+        SurveyAdherenceStatsDBM.completed_count,
+        SurveyAdherenceStatsDBM.failed_count,
+    ]
+    
+    column_sortable_list = [
+        SurveyAdherenceStatsDBM.id,
+        SurveyAdherenceStatsDBM.stat_date,
+        SurveyAdherenceStatsDBM.scheduled_survey_id,
+    ]
+    
+    column_default_sort = [(SurveyAdherenceStatsDBM.stat_date, True)]
+    
+    column_searchable_list = [
+        SurveyAdherenceStatsDBM.scheduled_survey_id,
+    ]
+    
+    column_filters = [
+        SurveyAdherenceStatsDBM.stat_date,
+    ]
@@ -0,0 +1,52 @@
+from shared.sqladmin_.model_view.common import SimpleMV
+from shared.sqlalchemy_db_.sqlalchemy_model import SurveyDailyStatsDBM
+
+class SurveyDailyStatsMV(SimpleMV, model=SurveyDailyStatsDBM):
+    name = "Survey Daily Stats"
+    name_plural = "Survey Daily Stats"
+    icon = "fa-solid fa-chart-column"
+
+    # Агрегаты ведутся автоматически (см. shared/sqlalchemy_db_/daily_stats.py)
+    can_create = False
+    can_edit = False
+    can_delete = False
+    
+    column_list = [
+        SurveyDailyStatsDBM.id,
+        SurveyDailyStatsDBM.scheduled_survey,
+        SurveyDailyStatsDBM.stat_date,
+        SurveyDailyStatsDBM.scheduled_time,
+        SurveyDailyStatsDBM.question,
+        SurveyDailyStatsDBM.answer,
+        SurveyDailyStatsDBM.answers_count,
+    ]
+    
+    column_details_list = [
+        SurveyDailyStatsDBM.id,
+        SurveyDailyStatsDBM.creation_dt,
+        SurveyDailyStatsDBM.scheduled_survey_id,
+        SurveyDailyStatsDBM.stat_date,
+        SurveyDailyStatsDBM.scheduled_time,
+        SurveyDailyStatsDBM.question_id,
+        SurveyDailyStatsDBM.answer,
+        SurveyDailyStatsDBM.answers_count,
+    ]
+    
+    column_sortable_list = [
+        SurveyDailyStatsDBM.id,
+        SurveyDailyStatsDBM.stat_date,
+        SurveyDailyStatsDBM.scheduled_survey_id,
+        SurveyDailyStatsDBM.answers_count,
+    ]
+    
+    column_default_sort = [(SurveyDailyStatsDBM.stat_date, True)]
+    
+    column_searchable_list = [
+        SurveyDailyStatsDBM.scheduled_survey_id,
+        SurveyDailyStatsDBM.answer,
+    ]
+    
+    column_filters = [
+        SurveyDailyStatsDBM.stat_date,
+        SurveyDailyStatsDBM.question_id,
+    ]
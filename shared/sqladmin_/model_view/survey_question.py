@@ -1,4 +1,9 @@
-from shared.sqladmin_.model_view.common import SimpleMV
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import Connection
+
+from shared.sqladmin_.model_view.common import SimpleMV, attribute_values
+from shared.sqlalchemy_db_.notify_channel import SURVEY_CHANGED_CHANNEL
 from shared.sqlalchemy_db_.sqlalchemy_model import SurveyQuestionDBM, SurveyDBM, QuestionDBM
 
 class SurveyQuestionMV(SimpleMV, model=SurveyQuestionDBM):
@@ -52,4 +57,11 @@ class SurveyQuestionMV(SimpleMV, model=SurveyQuestionDBM):
             "fields": [QuestionDBM.id, QuestionDBM.question_text],
             "page_size": 10
         }
-    }
\ No newline at end of file
+    }
+
+    notify_channel = SURVEY_CHANGED_CHANNEL
+
+    @classmethod
+    def get_changed_ids(cls, connection: Connection, model: Any, is_created: bool) -> Iterable[Optional[int]]:
+        # Вопрос можно перенести в другой опрос: сбрасываем оба
+        return attribute_values(connection, model, "survey_id")
@@ -1,7 +1,11 @@
+from typing import Any, Iterable, Optional
+
 import sqlalchemy
+from sqlalchemy import Connection
 from wtforms import SelectField
 
-from shared.sqladmin_.model_view.common import SimpleMV
+from shared.sqladmin_.model_view.common import SimpleMV, attribute_values
+from shared.sqlalchemy_db_.notify_channel import USER_CHANGED_CHANNEL
 from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM
 
 
@@ -45,3 +49,10 @@ class UserMV(SimpleMV, model=UserDBM):
         UserDBM.full_name,
         UserDBM.role,
     ]
+
+    notify_channel = USER_CHANGED_CHANNEL
+
+    @classmethod
+    def get_changed_ids(cls, connection: Connection, model: Any, is_created: bool) -> Iterable[Optional[int]]:
+        # tg_id может измениться: сбрасываем и прежний, и новый
+        return attribute_values(connection, model, "tg_id")
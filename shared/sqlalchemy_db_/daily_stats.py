@@ -0,0 +1,255 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import pytz
+import sqlalchemy
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.sqlalchemy_db_.sqlalchemy_model import (
+    SurveyAdherenceStatsDBM,
+    SurveyDailyStatsDBM,
+    SurveyReminderDBM,
+    SurveyResponseDBM,
+)
+
+
+# Статусы напоминаний, которые учитываются в survey_adherence_stats
+ADHERENCE_STATUSES = {
+    SurveyReminderDBM.ReminderStatus.SENT.value: "sent_count",
+    SurveyReminderDBM.ReminderStatus.COMPLETED.value: "completed_count",
+    SurveyReminderDBM.ReminderStatus.FAILED.value: "failed_count",
+}
+
+
+def stat_date(creation_dt: sqlalchemy.ColumnElement) -> sqlalchemy.ColumnElement:
+    """День (UTC), к которому относится запись в агрегатах."""
+    return sqlalchemy.func.date(sqlalchemy.func.timezone("UTC", creation_dt))
+
+
+def _add_on_conflict(insert: postgresql.Insert, constraint: str, columns: Sequence[str]) -> postgresql.Insert:
+    # Счетчики складываются, поэтому параллельные изменения не теряются.
+    # Строки агрегатов блокируются после всех строк исходной таблицы
+    # (группировка дочитывает CTE целиком) и в порядке ключа, поэтому
+    # запросы с пересекающимися агрегатами не блокируют друг друга крест-накрест
+    table = insert.table
+    return insert.on_conflict_do_update(
+        constraint=constraint,
+        set_={column: table.c[column] + insert.excluded[column] for column in columns},
+    )
+
+
+def _response_stats_insert(responses: sqlalchemy.FromClause) -> postgresql.Insert:
+    response_date = stat_date(responses.c.creation_dt)
+    insert = postgresql.insert(SurveyDailyStatsDBM.__table__).from_select(
+        ["creation_dt", "scheduled_survey_id", "stat_date", "scheduled_time", "question_id", "answer", "answers_count"],
+        sqlalchemy.select(
+            sqlalchemy.func.now(),
+            responses.c.scheduled_survey_id,
+            response_date,
+            responses.c.scheduled_time,
+            responses.c.question_id,
+            responses.c.answer,
+            sqlalchemy.func.count(),
+        )
+        .where(responses.c.scheduled_survey_id.is_not(None))
+        .group_by(
+            responses.c.scheduled_survey_id,
+            response_date,
+            responses.c.scheduled_time,
+            responses.c.question_id,
+            responses.c.answer,
+        )
+        .order_by(
+            responses.c.scheduled_survey_id,
+            response_date,
+            responses.c.scheduled_time,
+            responses.c.question_id,
+            responses.c.answer,
+        ),
+    )
+
+    return _add_on_conflict(insert, "uq_survey_daily_stats_key", ["answers_count"])
+
+
+def add_response_stats(responses: sqlalchemy.CTE) -> sqlalchemy.CTE:
+    """Прибавить вставленные ответы к survey_daily_stats.
+
+    Args:
+        responses: CTE вставленных ответов (RETURNING scheduled_survey_id,
+            creation_dt, scheduled_time, question_id, answer)
+
+    Returns:
+        sqlalchemy.CTE: Изменяющий CTE, который нужно добавить в запрос через add_cte()
+    """
+    return _response_stats_insert(responses).cte("response_stats")
+
+
+def _adherence_stats_insert(reminders: sqlalchemy.FromClause) -> postgresql.Insert:
+    reminder_date = stat_date(reminders.c.creation_dt)
+    insert = postgresql.insert(SurveyAdherenceStatsDBM.__table__).from_select(
+        ["creation_dt", "scheduled_survey_id", "stat_date", *ADHERENCE_STATUSES.values()],
+        sqlalchemy.select(
+            sqlalchemy.func.now(),
+            reminders.c.scheduled_survey_id,
+            reminder_date,
+            *(
+                sqlalchemy.func.count().filter(reminders.c.status == status)
+                - sqlalchemy.func.count().filter(reminders.c.old_status == status)
+                for status in ADHERENCE_STATUSES
+            ),
+        )
+        .group_by(reminders.c.scheduled_survey_id, reminder_date)
+        .order_by(reminders.c.scheduled_survey_id, reminder_date),
+    )
+
+    return _add_on_conflict(insert, "uq_survey_adherence_stats_key", ADHERENCE_STATUSES.values())
+
+
+def add_adherence_stats(reminders: sqlalchemy.CTE) -> sqlalchemy.CTE:
+    """Перенести изменения статусов напоминаний в survey_adherence_stats.
+
+    Args:
+        reminders: CTE измененных напоминаний (scheduled_survey_id,
+            creation_dt, новый status и прежний old_status)
+
+    Returns:
+        sqlalchemy.CTE: Изменяющий CTE, который нужно добавить в запрос через add_cte()
+    """
+    return _adherence_stats_insert(reminders).cte("adherence_stats")
+
+
+def insert_survey_responses(values: List[Dict[str, Any]]) -> sqlalchemy.Select:
+    """Запрос вставки ответов с обновлением survey_daily_stats.
+
+    Уже сохраненные ответы того же прохождения пропускаются
+    (uq_survey_responses_reminder_question) и в агрегаты не попадают.
+
+    Args:
+        values: Строки survey_responses
+
+    Returns:
+        sqlalchemy.Select: Запрос, возвращающий ID вставленных ответов
+    """
+    table = SurveyResponseDBM.__table__
+    inserted = (
+        postgresql.insert(table)
+        .values(values)
+        .on_conflict_do_nothing(constraint="uq_survey_responses_reminder_question")
+        .returning(
+            table.c.id,
+            table.c.scheduled_survey_id,
+            table.c.creation_dt,
+            table.c.scheduled_time,
+            table.c.question_id,
+            table.c.answer,
+        )
+        .cte("inserted_responses")
+    )
+
+    return sqlalchemy.select(inserted.c.id).add_cte(add_response_stats(inserted))
+
+
+def update_reminders_status(
+    status: Union[str, sqlalchemy.ColumnElement[str]],
+    *whereclause: sqlalchemy.ColumnElement[bool],
+    returning: Sequence[sqlalchemy.Column] = (),
+    **values: Any,
+) -> sqlalchemy.Select:
+    """Запрос смены статуса напоминаний с обновлением survey_adherence_stats.
+
+    Прежний статус берется из заблокированных строк того же запроса,
+    поэтому счетчики остаются верными при параллельных изменениях.
+    Напоминания, уже находящиеся в статусе status, не затрагиваются.
+
+    Args:
+        status: Новый статус (или выражение, например CASE по ID)
+        *whereclause: Условия выборки напоминаний
+        returning: Колонки survey_reminders, возвращаемые запросом
+        **values: Дополнительные значения колонок (например, completed_at)
+
+    Returns:
+        sqlalchemy.Select: Запрос, возвращающий колонки returning измененных
+            напоминаний, а без них - количество измененных напоминаний
+    """
+    table = SurveyReminderDBM.__table__
+    locked = (
+        sqlalchemy.select(table.c.id, table.c.status.label("old_status"))
+        .where(*whereclause)
+        .where(table.c.status != status)
+        .with_for_update()
+        .cte("locked_reminders")
+    )
+
+    returned = [table.c.id, table.c.scheduled_survey_id, table.c.creation_dt, table.c.status]
+    returned += [table.c[column.key] for column in returning if column.key not in {c.key for c in returned}]
+    updated = (
+        sqlalchemy.update(table)
+        .where(table.c.id == locked.c.id)
+        .values(status=status, **values)
+        .returning(*returned, locked.c.old_status)
+        .cte("updated_reminders")
+    )
+
+    if returning:
+        query = sqlalchemy.select(*(updated.c[column.key] for column in returning))
+    else:
+        query = sqlalchemy.select(sqlalchemy.func.count()).select_from(updated)
+
+    return query.add_cte(add_adherence_stats(updated))
+
+
+async def rebuild_daily_stats(async_session: AsyncSession, date_from: Optional[date] = None) -> Tuple[int, int]:
+    """Пересчитать агрегаты по исходным таблицам.
+
+    Нужен для первичного заполнения и после правок ответов или
+    напоминаний в обход update_reminders_status/insert_survey_responses
+    (например, через админ-панель). Таблицы агрегатов блокируются
+    до конца транзакции, параллельные изменения дождутся пересчета
+    и применятся поверх него.
+
+    Args:
+        async_session: Асинхронная сессия SQLAlchemy (commit выполняет вызывающий)
+        date_from: Первый пересчитываемый день (UTC); None - вся история
+
+    Returns:
+        Tuple[int, int]: Количество строк survey_daily_stats и survey_adherence_stats
+    """
+    await async_session.execute(sqlalchemy.text(
+        "LOCK TABLE survey_daily_stats, survey_adherence_stats IN EXCLUSIVE MODE"
+    ))
+
+    responses_query = sqlalchemy.select(
+        SurveyResponseDBM.scheduled_survey_id,
+        SurveyResponseDBM.creation_dt,
+        SurveyResponseDBM.scheduled_time,
+        SurveyResponseDBM.question_id,
+        SurveyResponseDBM.answer,
+    )
+    reminders_query = (
+        sqlalchemy.select(
+            SurveyReminderDBM.scheduled_survey_id,
+            SurveyReminderDBM.creation_dt,
+            SurveyReminderDBM.status,
+            sqlalchemy.null().label("old_status"),
+        )
+        .where(SurveyReminderDBM.status.in_(ADHERENCE_STATUSES))
+    )
+    daily_stats_delete = sqlalchemy.delete(SurveyDailyStatsDBM)
+    adherence_stats_delete = sqlalchemy.delete(SurveyAdherenceStatsDBM)
+
+    if date_from is not None:
+        # Диапазон по creation_dt, а не по дате, чтобы использовались индексы
+        day_start = datetime.combine(date_from, datetime.min.time(), tzinfo=pytz.UTC)
+        responses_query = responses_query.where(SurveyResponseDBM.creation_dt >= day_start)
+        reminders_query = reminders_query.where(SurveyReminderDBM.creation_dt >= day_start)
+        daily_stats_delete = daily_stats_delete.where(SurveyDailyStatsDBM.stat_date >= date_from)
+        adherence_stats_delete = adherence_stats_delete.where(SurveyAdherenceStatsDBM.stat_date >= date_from)
+
+    await async_session.execute(daily_stats_delete)
+    await async_session.execute(adherence_stats_delete)
+
+    daily_stats = await async_session.execute(_response_stats_insert(responses_query.subquery("responses")))
+    adherence_stats = await async_session.execute(_adherence_stats_insert(reminders_query.subquery("reminders")))
+
+    return daily_stats.rowcount, adherence_stats.rowcount
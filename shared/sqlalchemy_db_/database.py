@@ -1,12 +1,20 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import cache, cached_property
 import logging
-from typing import Any, Collection
+from operator import attrgetter
+from typing import Any, AsyncIterator, Callable, Collection, Iterable
 import pytz
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
-from sqlalchemy import create_engine, QueuePool, inspect, AsyncAdaptedQueuePool
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import create_engine, Engine, QueuePool, inspect, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncConnection, AsyncEngine, AsyncSession
 from sqlalchemy.orm.session import Session
 
+from shared.sqlalchemy_db_.query_stats import QueryStats
+from shared.sqlalchemy_db_.replicas import ReadonlySession, ReplicaRouter
+
 
 class BaseDBM(DeclarativeBase):
     __abstract__ = True
@@ -32,31 +40,116 @@ class BaseDBM(DeclarativeBase):
             include_columns_and_sd_properties: Collection[str] | None = None,
             kwargs: dict[str, Any] | None = None
     ) -> dict[str, Any]:
+        fields = _get_simple_dict_plan(type(self)).fields(
+            need_include_columns=need_include_columns,
+            need_include_sd_properties=need_include_sd_properties,
+            include_columns=include_columns,
+            exclude_columns=exclude_columns,
+            include_sd_properties=include_sd_properties,
+            exclude_sd_properties=exclude_sd_properties,
+            include_columns_and_sd_properties=include_columns_and_sd_properties,
+        )
+
+        res = {key: getattr(self, attr_name) for key, attr_name in fields}
+
+        if kwargs is not None:
+            res.update(kwargs)
+
+        return res
+
+    @staticmethod
+    def simple_dicts(
+            rows: Iterable["BaseDBM"],
+            *,
+            need_include_columns: bool = True,
+            need_include_sd_properties: bool = True,
+            include_columns: Collection[str] | None = None,
+            exclude_columns: Collection[str] | None = None,
+            include_sd_properties: Collection[str] | None = None,
+            exclude_sd_properties: Collection[str] | None = None,
+            include_columns_and_sd_properties: Collection[str] | None = None,
+            kwargs: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
+        """simple_dict для набора строк (например, результата запроса).
+
+        Набор полей вычисляется один раз на класс строк, а не для каждой строки.
+        Параметры те же, что у simple_dict.
+        """
+        getters: dict[type, tuple[tuple[str, ...], Callable[[Any], tuple]]] = {}
+        res = []
+
+        for row in rows:
+            getter = getters.get(type(row))
+            if getter is None:
+                fields = _get_simple_dict_plan(type(row)).fields(
+                    need_include_columns=need_include_columns,
+                    need_include_sd_properties=need_include_sd_properties,
+                    include_columns=include_columns,
+                    exclude_columns=exclude_columns,
+                    include_sd_properties=include_sd_properties,
+                    exclude_sd_properties=exclude_sd_properties,
+                    include_columns_and_sd_properties=include_columns_and_sd_properties,
+                )
+                getter = getters[type(row)] = (
+                    tuple(key for key, _ in fields),
+                    _values_getter(tuple(attr_name for _, attr_name in fields)),
+                )
+
+            keys, get_values = getter
+            item = dict(zip(keys, get_values(row)))
+            if kwargs is not None:
+                item.update(kwargs)
+            res.append(item)
+
+        return res
+
+
+@dataclass(frozen=True, slots=True)
+class _SimpleDictPlan:
+    """Поля simple_dict класса: колонки маппера и sdp_-свойства"""
+    columns: tuple[str, ...]
+    sd_properties: tuple[tuple[str, str], ...]  # (ключ в словаре, имя свойства)
+    all_fields: tuple[tuple[str, str], ...]  # поля без фильтров - самый частый вызов
+
+    def fields(
+            self,
+            *,
+            need_include_columns: bool,
+            need_include_sd_properties: bool,
+            include_columns: Collection[str] | None,
+            exclude_columns: Collection[str] | None,
+            include_sd_properties: Collection[str] | None,
+            exclude_sd_properties: Collection[str] | None,
+            include_columns_and_sd_properties: Collection[str] | None,
+    ) -> tuple[tuple[str, str], ...]:
+        """Отобранные поля в порядке simple_dict: (ключ в словаре, имя атрибута)"""
+        if (
+                need_include_columns and need_include_sd_properties
+                and include_columns is None and exclude_columns is None
+                and include_sd_properties is None and exclude_sd_properties is None
+                and include_columns_and_sd_properties is None
+        ):
+            return self.all_fields
+
         if exclude_columns is None:
             exclude_columns = set()
         if exclude_sd_properties is None:
             exclude_sd_properties = set()
 
-        res = {}
+        res = []
 
         if need_include_columns:
-            for c in inspect(self).mapper.column_attrs:
-                if include_columns_and_sd_properties is not None and c.key not in include_columns_and_sd_properties:
+            for key in self.columns:
+                if include_columns_and_sd_properties is not None and key not in include_columns_and_sd_properties:
                     continue
-                if include_columns is not None and c.key not in include_columns:
+                if include_columns is not None and key not in include_columns:
                     continue
-                if c.key in exclude_columns:
+                if key in exclude_columns:
                     continue
-                value = getattr(self, c.key)
-                res[c.key] = value
+                res.append((key, key))
 
         if need_include_sd_properties:
-            for attr_name in dir(self):
-                if not attr_name.startswith("sdp_") or not isinstance(getattr(type(self), attr_name, None), property):
-                    continue
-
-                sd_property_name = attr_name.removeprefix("sdp_")
-
+            for sd_property_name, attr_name in self.sd_properties:
                 if (
                         include_columns_and_sd_properties is not None
                         and sd_property_name not in include_columns_and_sd_properties
@@ -66,13 +159,36 @@ class BaseDBM(DeclarativeBase):
                     continue
                 if sd_property_name in exclude_sd_properties:
                     continue
+                res.append((sd_property_name, attr_name))
 
-                res[sd_property_name] = getattr(self, attr_name)
+        return tuple(res)
 
-        if kwargs is not None:
-            res.update(kwargs)
 
-        return res
+def _values_getter(attr_names: tuple[str, ...]) -> Callable[[Any], tuple]:
+    """Функция, возвращающая кортеж значений атрибутов объекта"""
+    if len(attr_names) > 1:
+        return attrgetter(*attr_names)
+    if len(attr_names) == 1:
+        # attrgetter с одним именем возвращает значение, а не кортеж
+        get_value = attrgetter(attr_names[0])
+        return lambda obj: (get_value(obj),)
+    return lambda obj: ()
+
+
+@cache
+def _get_simple_dict_plan(dbm_class: type[BaseDBM]) -> _SimpleDictPlan:
+    # Вычисляется при первой сериализации, когда мапперы уже сконфигурированы
+    columns = tuple(c.key for c in inspect(dbm_class).column_attrs)
+    sd_properties = tuple(
+        (attr_name.removeprefix("sdp_"), attr_name)
+        for attr_name in dir(dbm_class)
+        if attr_name.startswith("sdp_") and isinstance(getattr(dbm_class, attr_name, None), property)
+    )
+    return _SimpleDictPlan(
+        columns=columns,
+        sd_properties=sd_properties,
+        all_fields=tuple((key, key) for key in columns) + sd_properties,
+    )
 
 
 class SQLAlchemyDb:
@@ -84,37 +200,201 @@ class SQLAlchemyDb:
             db_echo: bool = False,
             base_dbm: type[BaseDBM] | None = None,
             db_models: list[Any] | None = None,
+            pool_size: int = 10,
+            max_overflow: int = 10,
+            pool_timeout: timedelta = timedelta(seconds=30),
+            pool_recycle: timedelta | None = None,
+            pool_pre_ping: bool = False,
+            statement_cache_size: int = 100,
+            warmup_connections: int = 0,
+            query_stats: QueryStats | None = None,
+            replica_db_urls: Collection[str] = (),
+            async_replica_db_urls: Collection[str] = (),
+            replica_max_lag: timedelta = timedelta(seconds=30),
+            replica_check_interval: timedelta = timedelta(seconds=10),
+            replica_connect_timeout: timedelta = timedelta(seconds=5),
     ):
         self._logger = logging.getLogger(self.__class__.__name__)
 
+        # Движки создаются при первом обращении: боту и планировщику нужен
+        # только асинхронный, админке и выгрузкам - только синхронный
         self.db_url = sync_db_url
-        if self.db_url is not None:
-            self.engine = create_engine(
-                url=sync_db_url,
-                echo=db_echo,
-                pool_size=10,
-                max_overflow=10,
+        self.async_db_url = async_db_url
+        self.db_echo = db_echo
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self.statement_cache_size = statement_cache_size
+        self.warmup_connections = warmup_connections
+        self.query_stats = query_stats
+        # Реплики для сессий только для чтения (new_session/new_async_session(readonly=True))
+        self.replica_db_urls = list(replica_db_urls)
+        self.async_replica_db_urls = list(async_replica_db_urls)
+        self.replica_max_lag = replica_max_lag
+        self.replica_check_interval = replica_check_interval
+        self.replica_connect_timeout = replica_connect_timeout
+        self.func_new_session_counter = 0
+        self.func_new_async_session_counter = 0
+
+        self.base_dbm = base_dbm
+        self.db_models = db_models
+
+    def _pool_kwargs(self) -> dict[str, Any]:
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout.total_seconds(),
+            "pool_recycle": -1 if self.pool_recycle is None else int(self.pool_recycle.total_seconds()),
+            "pool_pre_ping": self.pool_pre_ping,
+        }
+
+    @cached_property
+    def engine(self) -> Engine:
+        if self.db_url is None:
+            raise ValueError("sync_db_url не задан")
+
+        self._logger.info(f"creating sync engine, pool_size={self.pool_size}, max_overflow={self.max_overflow}")
+        engine = create_engine(
+            url=self.db_url,
+            echo=self.db_echo,
+            poolclass=QueuePool,
+            **self._pool_kwargs(),
+        )
+        if self.query_stats is not None:
+            self.query_stats.instrument(engine)
+        return engine
+
+    @cached_property
+    def sessionmaker(self):
+        return sessionmaker(bind=self.engine)
+
+    @cached_property
+    def replica_router(self) -> ReplicaRouter:
+        replicas = []
+        for url in self.replica_db_urls:
+            replica = create_engine(
+                url=url,
+                echo=self.db_echo,
                 poolclass=QueuePool,
-                pool_timeout=timedelta(seconds=30).total_seconds(),
+                connect_args={"connect_timeout": max(int(self.replica_connect_timeout.total_seconds()), 1)},
+                **self._pool_kwargs(),
             )
-        self.sessionmaker = sessionmaker(bind=self.engine)
-        self.func_new_session_counter = 0
+            if self.query_stats is not None:
+                self.query_stats.instrument(replica)
+            replicas.append(replica)
 
-        self.async_db_url = async_db_url
-        if self.async_db_url is not None:
-            self.async_engine = create_async_engine(
-                url=async_db_url,
-                echo=db_echo,
-                pool_size=10,
-                max_overflow=10,
+        return ReplicaRouter(
+            primary=self.engine,
+            replicas=replicas,
+            max_lag=self.replica_max_lag,
+            check_interval=self.replica_check_interval,
+        )
+
+    @cached_property
+    def readonly_sessionmaker(self):
+        return sessionmaker(class_=ReadonlySession, info={"replica_router": self.replica_router})
+
+    @cached_property
+    def async_engine(self) -> AsyncEngine:
+        if self.async_db_url is None:
+            raise ValueError("async_db_url не задан")
+
+        self._logger.info(f"creating async engine, pool_size={self.pool_size}, max_overflow={self.max_overflow}")
+        async_engine = create_async_engine(
+            url=self.async_db_url,
+            echo=self.db_echo,
+            poolclass=AsyncAdaptedQueuePool,
+            # Кэш подготовленных выражений asyncpg на соединение; 0 - без кэша (pgbouncer)
+            connect_args={"prepared_statement_cache_size": self.statement_cache_size},
+            **self._pool_kwargs(),
+        )
+        if self.query_stats is not None:
+            self.query_stats.instrument(async_engine.sync_engine)
+        return async_engine
+
+    @cached_property
+    def async_sessionmaker(self):
+        return async_sessionmaker(bind=self.async_engine)
+
+    @cached_property
+    def async_replica_router(self) -> ReplicaRouter:
+        replicas = []
+        for url in self.async_replica_db_urls:
+            replica = create_async_engine(
+                url=url,
+                echo=self.db_echo,
                 poolclass=AsyncAdaptedQueuePool,
-                pool_timeout=timedelta(seconds=30).total_seconds()
+                connect_args={
+                    "prepared_statement_cache_size": self.statement_cache_size,
+                    "timeout": self.replica_connect_timeout.total_seconds(),
+                },
+                **self._pool_kwargs(),
             )
-        self.async_sessionmaker = async_sessionmaker(bind=self.async_engine)
-        self.func_new_async_session_counter = 0
+            if self.query_stats is not None:
+                self.query_stats.instrument(replica.sync_engine)
+            replicas.append(replica.sync_engine)
 
-        self.base_dbm = base_dbm
-        self.db_models = db_models
+        # AsyncSession выбирает движок через синхронную сессию, поэтому роутер работает с sync_engine
+        return ReplicaRouter(
+            primary=self.async_engine.sync_engine,
+            replicas=replicas,
+            max_lag=self.replica_max_lag,
+            check_interval=self.replica_check_interval,
+        )
+
+    @cached_property
+    def async_readonly_sessionmaker(self):
+        return async_sessionmaker(
+            sync_session_class=ReadonlySession,
+            info={"replica_router": self.async_replica_router},
+        )
+
+    def warm_up(self, connections: int | None = None) -> int:
+        """Заранее открыть соединения синхронного пула.
+
+        Args:
+            connections: Количество соединений; None - warmup_connections
+
+        Returns:
+            int: Количество открытых соединений (не больше pool_size)
+        """
+        count = min(self.warmup_connections if connections is None else connections, self.pool_size)
+        conns = []
+        try:
+            for _ in range(count):
+                conns.append(self.engine.connect())
+        finally:
+            for conn in conns:
+                conn.close()
+
+        self._logger.info(f"warmed up {count} sync connections")
+        return count
+
+    async def async_warm_up(self, connections: int | None = None) -> int:
+        """Заранее открыть соединения асинхронного пула.
+
+        Args:
+            connections: Количество соединений; None - warmup_connections
+
+        Returns:
+            int: Количество открытых соединений (не больше pool_size)
+        """
+        count = min(self.warmup_connections if connections is None else connections, self.pool_size)
+        results = await asyncio.gather(
+            *(self.async_engine.connect().start() for _ in range(count)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, AsyncConnection):
+                await result.close()
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        self._logger.info(f"warmed up {count} async connections")
+        return count
 
     def init(self):
         self.base_dbm.metadata.create_all(bind=self.engine, checkfirst=True)
@@ -133,14 +413,60 @@ class SQLAlchemyDb:
         self.engine.connect()
         self._logger.info("db conn is good")
 
-    def new_session(self, **kwargs) -> Session:
+    def new_session(self, readonly: bool = False, **kwargs) -> Session:
+        """Новая сессия.
+
+        Args:
+            readonly: Сессия только для чтения (аналитика, выгрузки): запросы
+                идут на реплику, а без подходящих реплик - на основной сервер
+        """
         self.func_new_session_counter += 1
+        if readonly and self.replica_db_urls:
+            return self.readonly_sessionmaker(**kwargs)
         return self.sessionmaker(**kwargs)
     
     
-    def new_async_session(self, **kwargs) -> AsyncSession:
+    def new_async_session(self, readonly: bool = False, **kwargs) -> AsyncSession:
+        """Новая асинхронная сессия.
+
+        Args:
+            readonly: Сессия только для чтения (аналитика, выгрузки): запросы
+                идут на реплику, а без подходящих реплик - на основной сервер
+        """
         self.func_new_async_session_counter += 1
+        if readonly and self.async_replica_db_urls:
+            return self.async_readonly_sessionmaker(**kwargs)
         return self.async_sessionmaker(**kwargs)
+
+    @asynccontextmanager
+    async def use_async_session(
+            self,
+            async_session: AsyncSession | None = None,
+            readonly: bool = False,
+    ) -> AsyncIterator[AsyncSession]:
+        """Сессия для одной операции сервиса.
+
+        Переданная сессия (например, сессия апдейта из DbSessionMiddleware)
+        используется как есть: commit или rollback выполняет ее владелец,
+        операция может только flush. Без нее открывается новая сессия,
+        которая фиксируется при выходе из блока без ошибки.
+
+        Args:
+            async_session: Открытая сессия вызывающего или None
+            readonly: Новая сессия - только для чтения (см. new_async_session)
+        """
+        if async_session is not None:
+            yield async_session
+            return
+
+        # Объекты остаются доступными после выхода, как при внешней сессии
+        async with self.new_async_session(readonly=readonly, expire_on_commit=False) as async_session:
+            try:
+                yield async_session
+            except BaseException:
+                await async_session.rollback()
+                raise
+            await async_session.commit()
     
     def is_conn_good(self) -> bool:
         try:
@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from typing import Generic, List, Optional, TypeVar
+
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class KeysetCursor:
+    """Позиция в списке для keyset-пагинации.
+
+    Хранится в callback data как "<ключ" (страница перед ключом)
+    или ">ключ" (страница после ключа).
+    """
+    key: int
+    backward: bool = False
+
+    def __str__(self) -> str:
+        return f"{'<' if self.backward else '>'}{self.key}"
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> Optional["KeysetCursor"]:
+        """Разобрать курсор из callback data.
+
+        Args:
+            value: Строка вида ">15" или "<15"
+
+        Returns:
+            Optional[KeysetCursor]: Курсор или None (первая страница),
+                если значение пустое или некорректное
+        """
+        if not value or value[0] not in "<>":
+            return None
+
+        try:
+            return cls(key=int(value[1:]), backward=value[0] == "<")
+        except ValueError:
+            return None
+
+
+@dataclass(frozen=True, slots=True)
+class KeysetPage(Generic[T]):
+    """Одна страница списка и курсоры соседних страниц"""
+    items: List[T]
+    keys: List[int]
+    has_prev: bool
+    has_next: bool
+
+    @property
+    def prev_cursor(self) -> Optional[KeysetCursor]:
+        if not self.has_prev or not self.keys:
+            return None
+        return KeysetCursor(key=self.keys[0], backward=True)
+
+    @property
+    def next_cursor(self) -> Optional[KeysetCursor]:
+        if not self.has_next or not self.keys:
+            return None
+        return KeysetCursor(key=self.keys[-1])
+
+
+async def fetch_keyset_page(
+    async_session: AsyncSession,
+    query: sqlalchemy.Select,
+    key: sqlalchemy.ColumnElement[int],
+    cursor: Optional[KeysetCursor] = None,
+    per_page: int = 5,
+) -> KeysetPage:
+    """Получить страницу запроса, упорядоченного по уникальному ключу.
+
+    Вместо OFFSET используется условие key > cursor (или key < cursor
+    для предыдущей страницы), поэтому стоимость не зависит от номера
+    страницы при наличии индекса, начинающегося с условий фильтра запроса
+    и заканчивающегося ключом. Читается per_page + 1 строка: лишняя строка
+    только сообщает, есть ли следующая (предыдущая) страница.
+
+    Args:
+        async_session: Асинхронная сессия SQLAlchemy
+        query: Запрос одной сущности без ORDER BY и LIMIT
+        key: Уникальный ключ сортировки (например, UserDBM.id)
+        cursor: Курсор из callback data; None - первая страница
+        per_page: Количество элементов на странице
+
+    Returns:
+        KeysetPage: Элементы страницы в порядке возрастания ключа
+    """
+    page_query = query.add_columns(key.label("page_key")).limit(per_page + 1)
+
+    if cursor is None:
+        page_query = page_query.order_by(key)
+    elif cursor.backward:
+        page_query = page_query.where(key < cursor.key).order_by(key.desc())
+    else:
+        page_query = page_query.where(key > cursor.key).order_by(key)
+
+    rows = (await async_session.execute(page_query)).all()
+
+    if not rows and cursor is not None:
+        # Элементы страницы удалены или больше не подходят под фильтр
+        return await fetch_keyset_page(async_session, query, key, per_page=per_page)
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if cursor is not None and cursor.backward:
+        rows.reverse()
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = cursor is not None, has_more
+
+    return KeysetPage(
+        items=[row[0] for row in rows],
+        keys=[row.page_key for row in rows],
+        has_prev=has_prev,
+        has_next=has_next,
+    )
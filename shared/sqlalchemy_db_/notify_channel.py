@@ -0,0 +1,146 @@
+import asyncio
+from typing import Any, Callable, Optional
+
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+
+
+SCHEDULED_SURVEY_CHANGED_CHANNEL = "scheduled_survey_changed"
+USER_CHANGED_CHANNEL = "user_changed"
+SURVEY_CHANGED_CHANNEL = "survey_changed"
+
+
+def notify_query(channel: str, payload_id: int) -> sqlalchemy.Select:
+    """Запрос NOTIFY с ID в payload (для синхронных и асинхронных сессий).
+
+    NOTIFY доставляется слушателям только после фиксации транзакции.
+
+    Args:
+        channel: Канал LISTEN/NOTIFY
+        payload_id: ID измененного объекта
+    """
+    return sqlalchemy.select(sqlalchemy.func.pg_notify(channel, str(payload_id)))
+
+
+async def notify_scheduled_survey_changed(async_session: AsyncSession, scheduled_survey_id: int) -> None:
+    """Сообщить планировщику об изменении запланированного опроса.
+
+    NOTIFY доставляется слушателям только после фиксации транзакции,
+    поэтому вызывать нужно в той же сессии перед commit().
+
+    Args:
+        async_session: Асинхронная сессия SQLAlchemy
+        scheduled_survey_id: ID запланированного опроса
+    """
+    await async_session.execute(notify_query(SCHEDULED_SURVEY_CHANGED_CHANNEL, scheduled_survey_id))
+
+
+async def notify_user_changed(async_session: AsyncSession, tg_id: int) -> None:
+    """Сообщить боту об изменении пользователя (сброс кэша пользователей).
+
+    Args:
+        async_session: Асинхронная сессия SQLAlchemy
+        tg_id: ID пользователя в Telegram
+    """
+    await async_session.execute(notify_query(USER_CHANGED_CHANNEL, tg_id))
+
+
+class ChannelListener:
+    """Подписка на канал LISTEN/NOTIFY с целочисленными ID в payload.
+
+    Держит отдельное соединение с LISTEN на канал и передает ID из
+    уведомлений в on_change. После переподключения вызывает
+    on_change(None): уведомления за время разрыва потеряны, и подписчику
+    нужно перечитать состояние целиком.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        on_change: Callable[[Optional[int]], None],
+        health_check_seconds: float = 30,
+        reconnect_seconds: float = 5,
+    ):
+        """Инициализация подписки.
+
+        Args:
+            channel: Имя канала
+            on_change: Обработчик изменения (ID или None при переподключении)
+            health_check_seconds: Период проверки соединения
+            reconnect_seconds: Пауза перед повторным подключением
+        """
+        self.channel = channel
+        self.on_change = on_change
+        self.health_check_seconds = health_check_seconds
+        self.reconnect_seconds = reconnect_seconds
+
+        self._connection: Optional[AsyncConnection] = None
+        self._driver_connection: Any = None
+        self._stopped = asyncio.Event()
+
+    def _handle_notification(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            changed_id = int(payload)
+        except ValueError:
+            print(f"Некорректное уведомление в канале {channel}: {payload!r}")
+            return
+        self.on_change(changed_id)
+
+    async def connect(self) -> None:
+        """Открыть соединение и подписаться на канал."""
+        self._connection = await get_cached_sqlalchemy_db().async_engine.connect()
+        # Слушающее соединение не должно держать открытую транзакцию,
+        # иначе уведомления будут доставлены только после ее завершения
+        await self._connection.execution_options(isolation_level="AUTOCOMMIT")
+
+        raw_connection = await self._connection.get_raw_connection()
+        self._driver_connection = raw_connection.driver_connection
+        await self._driver_connection.add_listener(self.channel, self._handle_notification)
+
+    async def close(self) -> None:
+        """Отписаться от канала и закрыть соединение."""
+        connection, self._connection = self._connection, None
+        driver_connection, self._driver_connection = self._driver_connection, None
+        if connection is None:
+            return
+
+        try:
+            # Соединение вернется в пул, поэтому отписываемся явно
+            await driver_connection.remove_listener(self.channel, self._handle_notification)
+            await connection.close()
+        except Exception as e:
+            print(f"Ошибка при закрытии соединения LISTEN: {str(e)}")
+            await connection.invalidate()
+
+    async def start(self) -> None:
+        """Слушать канал, переподключаясь при обрыве соединения."""
+        self._stopped.clear()
+        is_reconnect = False
+
+        while not self._stopped.is_set():
+            try:
+                await self.connect()
+                if is_reconnect:
+                    self.on_change(None)
+
+                while not self._stopped.is_set():
+                    try:
+                        await asyncio.wait_for(self._stopped.wait(), timeout=self.health_check_seconds)
+                    except asyncio.TimeoutError:
+                        await self._driver_connection.fetchval("SELECT 1")
+            except Exception as e:
+                print(f"Ошибка соединения LISTEN {self.channel}: {str(e)}")
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=self.reconnect_seconds)
+                except asyncio.TimeoutError:
+                    pass
+            finally:
+                await self.close()
+
+            is_reconnect = True
+
+    async def stop(self) -> None:
+        """Остановить подписку."""
+        self._stopped.set()
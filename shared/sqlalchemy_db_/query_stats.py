@@ -0,0 +1,316 @@
+import atexit
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import timedelta
+from functools import lru_cache
+import glob
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import Engine, event
+
+
+# Область без явного query_scope (фоновые задачи, LISTEN и т.п.)
+NO_SCOPE = "-"
+
+_current_scope: ContextVar[Optional["QueryScope"]] = ContextVar("query_scope", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUE_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Нормализованный текст запроса: литералы и параметры заменены на ?,
+    списки значений (IN, многострочный VALUES) свернуты в (...)."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _VALUE_LIST.sub("(...)", normalized)
+    normalized = _VALUE_ROWS.sub("(...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def _shorten(text: str, length: int = 300) -> str:
+    return text if len(text) <= length else f"{text[:length]}..."
+
+
+@dataclass
+class FingerprintStats:
+    """Накопленная статистика одного отпечатка запроса"""
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    scopes: Counter = field(default_factory=Counter)
+
+    def merge(self, other: "FingerprintStats") -> None:
+        self.count += other.count
+        self.total_seconds += other.total_seconds
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+        self.scopes.update(other.scopes)
+
+
+@dataclass
+class ScopeStats:
+    """Накопленная статистика запусков одной области (обработчик, тик, выгрузка)"""
+    runs: int = 0
+    statements: int = 0
+    max_statements: int = 0
+    total_seconds: float = 0.0
+
+    def merge(self, other: "ScopeStats") -> None:
+        self.runs += other.runs
+        self.statements += other.statements
+        self.max_statements = max(self.max_statements, other.max_statements)
+        self.total_seconds += other.total_seconds
+
+
+@dataclass
+class QueryScope:
+    """Текущий запуск области: счетчики запросов этого запуска"""
+    name: str
+    statements: int = 0
+    seconds: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+    stats: Optional["QueryStats"] = None
+
+
+@contextmanager
+def query_scope(name: str) -> Iterator[QueryScope]:
+    """Отнести запросы внутри блока к области name.
+
+    Область наследуется задачами, созданными внутри блока (contextvars),
+    вложенная область заменяет внешнюю до выхода из нее.
+
+    Args:
+        name: Имя области, например "callback:select_survey" или "notifier:outbox"
+    """
+    scope = QueryScope(name=name)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+        if scope.stats is not None:
+            scope.stats.finish_scope(scope)
+
+
+class QueryStats:
+    """Статистика запросов движков SQLAlchemy.
+
+    Подключается к движку через события before/after_cursor_execute,
+    считает время и количество запросов по отпечаткам и областям,
+    пишет в лог медленные запросы и повторы одного отпечатка в области
+    (признак N+1). Накопленные данные периодически сбрасываются в JSON,
+    сводку по всем процессам строит query_report.py.
+    """
+
+    def __init__(
+            self,
+            *,
+            slow_query_threshold: timedelta = timedelta(milliseconds=200),
+            n_plus_one_threshold: int = 10,
+            dump_path: str | None = None,
+            flush_interval: timedelta = timedelta(seconds=60),
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self.slow_query_threshold = slow_query_threshold.total_seconds()
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.dump_path = dump_path
+        self.flush_interval = flush_interval
+        self.fingerprints: Dict[str, FingerprintStats] = {}
+        self.scopes: Dict[str, ScopeStats] = {}
+        self._flush_thread: threading.Thread | None = None
+
+    def instrument(self, engine: Engine) -> None:
+        """Подключить сбор статистики к движку (для AsyncEngine - к sync_engine)."""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        self._start_flushing()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None:
+            context._query_stats_started_at = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started_at = getattr(context, "_query_stats_started_at", None)
+        if started_at is not None:
+            self.record(statement, time.perf_counter() - started_at)
+
+    def record(self, statement: str, seconds: float) -> None:
+        """Учесть выполненный запрос в статистике текущей области."""
+        statement_fingerprint = fingerprint(statement)
+        scope = _current_scope.get()
+        scope_name = scope.name if scope is not None else NO_SCOPE
+
+        with self._lock:
+            stats = self.fingerprints.get(statement_fingerprint)
+            if stats is None:
+                stats = self.fingerprints[statement_fingerprint] = FingerprintStats()
+            stats.count += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.scopes[scope_name] += 1
+
+        if seconds >= self.slow_query_threshold:
+            self._logger.warning(
+                f"slow query {seconds * 1000:.0f} ms in {scope_name}: {_shorten(statement_fingerprint)}"
+            )
+
+        if scope is None:
+            return
+
+        scope.stats = self
+        scope.statements += 1
+        scope.seconds += seconds
+        scope.fingerprints[statement_fingerprint] += 1
+        # Предупреждаем один раз на отпечаток за запуск области
+        if scope.fingerprints[statement_fingerprint] == self.n_plus_one_threshold + 1:
+            self._logger.warning(
+                f"possible N+1 in {scope.name}: query repeated more than "
+                f"{self.n_plus_one_threshold} times: {_shorten(statement_fingerprint)}"
+            )
+
+    def finish_scope(self, scope: QueryScope) -> None:
+        """Учесть завершенный запуск области."""
+        with self._lock:
+            stats = self.scopes.get(scope.name)
+            if stats is None:
+                stats = self.scopes[scope.name] = ScopeStats()
+            stats.runs += 1
+            stats.statements += scope.statements
+            stats.max_statements = max(stats.max_statements, scope.statements)
+            stats.total_seconds += scope.seconds
+
+    def merge(self, other: "QueryStats") -> None:
+        """Добавить статистику другого процесса."""
+        for key, stats in other.fingerprints.items():
+            self.fingerprints.setdefault(key, FingerprintStats()).merge(stats)
+        for key, stats in other.scopes.items():
+            self.scopes.setdefault(key, ScopeStats()).merge(stats)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "dumped_at": time.time(),
+                "fingerprints": {
+                    key: {
+                        "count": stats.count,
+                        "total_seconds": stats.total_seconds,
+                        "max_seconds": stats.max_seconds,
+                        "scopes": dict(stats.scopes),
+                    }
+                    for key, stats in self.fingerprints.items()
+                },
+                "scopes": {
+                    key: {
+                        "runs": stats.runs,
+                        "statements": stats.statements,
+                        "max_statements": stats.max_statements,
+                        "total_seconds": stats.total_seconds,
+                    }
+                    for key, stats in self.scopes.items()
+                },
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QueryStats":
+        query_stats = cls()
+        for key, stats in data.get("fingerprints", {}).items():
+            query_stats.fingerprints[key] = FingerprintStats(
+                count=stats["count"],
+                total_seconds=stats["total_seconds"],
+                max_seconds=stats["max_seconds"],
+                scopes=Counter(stats["scopes"]),
+            )
+        for key, stats in data.get("scopes", {}).items():
+            query_stats.scopes[key] = ScopeStats(**stats)
+        return query_stats
+
+    def dump(self) -> None:
+        """Записать накопленную статистику в dump_path (атомарной заменой файла)."""
+        if self.dump_path is None:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.dump_path), exist_ok=True)
+            tmp_path = f"{self.dump_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self.to_dict(), file, ensure_ascii=False)
+            os.replace(tmp_path, self.dump_path)
+        except OSError as e:
+            self._logger.error(f"query stats dump failed: {e}")
+
+    def _start_flushing(self) -> None:
+        if self.dump_path is None or self._flush_thread is not None:
+            return
+
+        # Процессы останавливаются по SIGTERM без atexit, поэтому сбрасываем и периодически
+        self._flush_thread = threading.Thread(target=self._flush_loop, name="query-stats-flush", daemon=True)
+        self._flush_thread.start()
+        atexit.register(self.dump)
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(self.flush_interval.total_seconds())
+            self.dump()
+
+    def report(self, top: int = 20, order_by: str = "total") -> List[str]:
+        """Строки сводки: отпечатки с наибольшей нагрузкой и области по числу запросов.
+
+        Args:
+            top: Количество строк в каждой таблице
+            order_by: Сортировка отпечатков: total (суммарное время), count или max
+        """
+        sort_keys = {
+            "total": lambda item: item[1].total_seconds,
+            "count": lambda item: item[1].count,
+            "max": lambda item: item[1].max_seconds,
+        }
+        fingerprints = sorted(self.fingerprints.items(), key=sort_keys[order_by], reverse=True)[:top]
+        scopes = sorted(
+            self.scopes.items(),
+            key=lambda item: item[1].statements / max(item[1].runs, 1),
+            reverse=True,
+        )[:top]
+
+        lines = [f"Top {len(fingerprints)} queries by {order_by}:"]
+        for key, stats in fingerprints:
+            scope_name, scope_count = stats.scopes.most_common(1)[0]
+            lines.append(
+                f"{stats.total_seconds * 1000:10.0f} ms total  {stats.count:8d} calls  "
+                f"{stats.total_seconds * 1000 / stats.count:8.2f} ms avg  {stats.max_seconds * 1000:8.0f} ms max  "
+                f"top scope {scope_name} ({scope_count})\n    {_shorten(key, 500)}"
+            )
+
+        lines.append("")
+        lines.append(f"Top {len(scopes)} scopes by statements per run:")
+        for key, stats in scopes:
+            lines.append(
+                f"{stats.statements / max(stats.runs, 1):8.1f} avg  {stats.max_statements:6d} max  "
+                f"{stats.runs:8d} runs  {stats.total_seconds * 1000:10.0f} ms total  {key}"
+            )
+
+        return lines
+
+
+def load_query_stats(dump_dir: str) -> QueryStats:
+    """Объединить дампы статистики всех процессов из каталога."""
+    query_stats = QueryStats()
+    for path in sorted(glob.glob(os.path.join(dump_dir, "*.json"))):
+        with open(path, encoding="utf-8") as file:
+            query_stats.merge(QueryStats.from_dict(json.load(file)))
+    return query_stats
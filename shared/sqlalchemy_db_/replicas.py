@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from datetime import timedelta
+import logging
+import threading
+import time
+from typing import Sequence
+
+import sqlalchemy
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+
+# Отставание реплики в секундах. Без новых транзакций на основном сервере
+# pg_last_xact_replay_timestamp() стареет, поэтому полностью
+# воспроизведенный WAL считается нулевым отставанием. Сервер не в режиме
+# восстановления (например, тестовая копия) тоже считается без отставания
+REPLICA_LAG_SQL = sqlalchemy.text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+@dataclass(slots=True)
+class _ReplicaState:
+    is_available: bool
+    checked_at: float
+
+
+class ReplicaRouter:
+    """Выбор реплики для сессий только для чтения.
+
+    Реплики перебираются по кругу; реплика пропускается, если недоступна
+    или отстает больше max_lag. Результат проверки кэшируется на
+    check_interval. Если подходящих реплик нет, используется основной сервер.
+    """
+
+    def __init__(
+            self,
+            *,
+            primary: Engine,
+            replicas: Sequence[Engine],
+            max_lag: timedelta = timedelta(seconds=30),
+            check_interval: timedelta = timedelta(seconds=10),
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._states: dict[Engine, _ReplicaState] = {}
+        self._next_index = 0
+
+    def choose(self) -> Engine:
+        """Следующая подходящая реплика или основной сервер.
+
+        Для движков AsyncEngine (переданных через sync_engine) вызывается
+        только внутри операций AsyncSession, где доступен синхронный API.
+        """
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = self.replicas[self._next_index % len(self.replicas)]
+                self._next_index += 1
+
+            if self.is_available(replica):
+                return replica
+
+        return self.primary
+
+    def is_available(self, replica: Engine) -> bool:
+        state = self._states.get(replica)
+        if state is None or time.monotonic() - state.checked_at >= self.check_interval.total_seconds():
+            state = self._check(replica, state)
+        return state.is_available
+
+    def _check(self, replica: Engine, previous: _ReplicaState | None) -> _ReplicaState:
+        try:
+            with replica.connect() as conn:
+                lag = float(conn.execute(REPLICA_LAG_SQL).scalar())
+            is_available = lag <= self.max_lag.total_seconds()
+            reason = f"lag {lag:.1f} s"
+        except Exception as e:
+            is_available = False
+            reason = str(e)
+
+        if previous is None or previous.is_available != is_available:
+            url = replica.url.render_as_string(hide_password=True)
+            if is_available:
+                self._logger.info(f"replica {url} is available, {reason}")
+            else:
+                self._logger.warning(f"replica {url} is skipped: {reason}")
+
+        state = self._states[replica] = _ReplicaState(is_available=is_available, checked_at=time.monotonic())
+        return state
+
+
+class ReadonlySession(Session):
+    """Сессия только для чтения.
+
+    Движок выбирается ReplicaRouter (info["replica_router"]) при первом
+    запросе и не меняется до закрытия сессии, поэтому все запросы сессии
+    видят данные одного сервера.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs) -> Engine:
+        bind = self.info.get("read_bind")
+        if bind is None:
+            bind = self.info["read_bind"] = self.info["replica_router"].choose()
+        return bind
@@ -1,22 +1,79 @@
+from datetime import timedelta
 from functools import lru_cache
+import os
 
 from shared.sqlalchemy_db_.database import SQLAlchemyDb
+from shared.sqlalchemy_db_.query_stats import QueryStats
 
 from shared.config import get_cached_settings
 from shared.sqlalchemy_db_.sqlalchemy_model import SimpleDBM
 
 
-def create_sqlalchemy_db() -> SQLAlchemyDb | None:
+# Профиль процесса для настроек пулов (DB_POOL_PROFILES)
+_sqlalchemy_db_profile = "default"
+
+
+def set_sqlalchemy_db_profile(profile: str) -> None:
+    """Задать профиль пулов соединений процесса (bot, notifier, admin, export).
+
+    Вызывается в точке входа процесса до первого get_cached_sqlalchemy_db().
+    """
+    global _sqlalchemy_db_profile
+    _sqlalchemy_db_profile = profile
+
+
+def create_sqlalchemy_db(profile: str | None = None) -> SQLAlchemyDb | None:
     if not get_cached_settings().database.DATABASE_URL and not get_cached_settings().database.ASYNC_DATABASE_URL:
         return None
+
+    pool_settings = get_cached_settings().database.get_pool_settings(profile or _sqlalchemy_db_profile)
     
     return SQLAlchemyDb(
         sync_db_url=get_cached_settings().database.DATABASE_URL,
         async_db_url=get_cached_settings().database.ASYNC_DATABASE_URL,
-        base_dbm=SimpleDBM
+        base_dbm=SimpleDBM,
+        pool_size=pool_settings.DB_POOL_SIZE,
+        max_overflow=pool_settings.DB_MAX_OVERFLOW,
+        pool_timeout=timedelta(seconds=pool_settings.DB_POOL_TIMEOUT_SECONDS),
+        pool_recycle=(
+            timedelta(seconds=pool_settings.DB_POOL_RECYCLE_SECONDS)
+            if pool_settings.DB_POOL_RECYCLE_SECONDS >= 0 else None
+        ),
+        pool_pre_ping=pool_settings.DB_POOL_PRE_PING,
+        statement_cache_size=pool_settings.DB_STATEMENT_CACHE_SIZE,
+        warmup_connections=pool_settings.DB_WARMUP_CONNECTIONS,
+        query_stats=get_cached_query_stats(),
+        replica_db_urls=get_cached_settings().database.REPLICA_DATABASE_URLS,
+        async_replica_db_urls=get_cached_settings().database.ASYNC_REPLICA_DATABASE_URLS,
+        replica_max_lag=timedelta(seconds=get_cached_settings().database.DB_REPLICA_MAX_LAG_SECONDS),
+        replica_check_interval=timedelta(seconds=get_cached_settings().database.DB_REPLICA_CHECK_SECONDS),
+        replica_connect_timeout=timedelta(seconds=get_cached_settings().database.DB_REPLICA_CONNECT_TIMEOUT_SECONDS),
+    )
+
+
+@lru_cache()
+def get_cached_query_stats() -> QueryStats | None:
+    settings = get_cached_settings().database
+    if not settings.DB_QUERY_STATS:
+        return None
+
+    dump_path = None
+    if settings.DB_QUERY_STATS_DIR:
+        # Файл на процесс: query_report.py объединяет все файлы каталога
+        dump_path = os.path.join(
+            get_cached_settings().BASE_DIRPATH,
+            settings.DB_QUERY_STATS_DIR,
+            f"{_sqlalchemy_db_profile}-{os.getpid()}.json",
+        )
+
+    return QueryStats(
+        slow_query_threshold=timedelta(milliseconds=settings.DB_SLOW_QUERY_MS),
+        n_plus_one_threshold=settings.DB_N_PLUS_ONE_THRESHOLD,
+        dump_path=dump_path,
+        flush_interval=timedelta(seconds=settings.DB_QUERY_STATS_FLUSH_SECONDS),
     )
 
 
 @lru_cache()
 def get_cached_sqlalchemy_db() -> SQLAlchemyDb | None:
-    return create_sqlalchemy_db()
\ No newline at end of file
+    return create_sqlalchemy_db()
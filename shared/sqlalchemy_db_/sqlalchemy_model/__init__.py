@@ -7,6 +7,10 @@ from shared.sqlalchemy_db_.sqlalchemy_model.survey_question import SurveyQuestio
 from shared.sqlalchemy_db_.sqlalchemy_model.scheduled_survey import ScheduledSurveyDBM
 from shared.sqlalchemy_db_.sqlalchemy_model.survey_reminders import SurveyReminderDBM
 from shared.sqlalchemy_db_.sqlalchemy_model.survey_responses import SurveyResponseDBM
+from shared.sqlalchemy_db_.sqlalchemy_model.reminder_slots import ReminderSlotDBM
+from shared.sqlalchemy_db_.sqlalchemy_model.fsm_states import FSMStateDBM
+from shared.sqlalchemy_db_.sqlalchemy_model.survey_daily_stats import SurveyDailyStatsDBM
+from shared.sqlalchemy_db_.sqlalchemy_model.survey_adherence_stats import SurveyAdherenceStatsDBM
 
 __all__ = [
     "SimpleDBM",
@@ -17,5 +21,9 @@ __all__ = [
     "SurveyQuestionDBM",
     "ScheduledSurveyDBM",
     "SurveyReminderDBM",
-    "SurveyResponseDBM"
+    "SurveyResponseDBM",
+    "ReminderSlotDBM",
+    "FSMStateDBM",
+    "SurveyDailyStatsDBM",
+    "SurveyAdherenceStatsDBM"
 ]
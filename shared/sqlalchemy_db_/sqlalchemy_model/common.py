@@ -1,6 +1,6 @@
 import sqlalchemy
 import pytz
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from sqlalchemy import func, text
 from sqlalchemy.orm import Mapped, mapped_column
 from shared.sqlalchemy_db_.database import BaseDBM
@@ -29,6 +29,19 @@ class SimpleDBM(BaseDBM):
         parts = [f"id={self.id}"]
         return f"{self.entity_name} ({', '.join(parts)})"
 
+    @classmethod
+    def created_on(cls, day: date) -> sqlalchemy.ColumnElement[bool]:
+        """Условие "создано в указанный день (UTC)" в виде полуоткрытого диапазона.
+
+        В отличие от func.date(creation_dt) == day, такое условие
+        может использовать индекс по creation_dt.
+        """
+        day_start = datetime.combine(day, datetime.min.time(), tzinfo=pytz.UTC)
+        return sqlalchemy.and_(
+            cls.creation_dt >= day_start,
+            cls.creation_dt < day_start + timedelta(days=1),
+        )
+
     @property
     def entity_name(self) -> str:
         return self.__class__.__name__.removesuffix("DBM")
@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import Optional
+
+import sqlalchemy
+from sqlalchemy.orm import Mapped, mapped_column
+
+from shared.sqlalchemy_db_.sqlalchemy_model.common import SimpleDBM
+
+
+class FSMStateDBM(SimpleDBM):
+    __tablename__ = "fsm_states"
+    __table_args__ = (
+        sqlalchemy.Index("ix_fsm_states_expires_at", "expires_at"),
+        {"extend_existing": True},
+    )
+
+    storage_key: Mapped[str] = mapped_column(
+        sqlalchemy.TEXT,
+        nullable=False,
+        unique=True,
+        comment="Ключ FSM (бот, чат, пользователь)"
+    )
+
+    state: Mapped[Optional[str]] = mapped_column(
+        sqlalchemy.TEXT,
+        nullable=True,
+        comment="Текущее состояние FSM"
+    )
+
+    data: Mapped[Optional[bytes]] = mapped_column(
+        sqlalchemy.LargeBinary,
+        nullable=True,
+        comment="Сериализованные данные FSM"
+    )
+
+    expires_at: Mapped[datetime] = mapped_column(
+        sqlalchemy.TIMESTAMP(timezone=True),
+        nullable=False,
+        comment="Момент, после которого брошенное состояние удаляется"
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"FSMStateDBM(id={self.id}, "
+            f"storage_key={self.storage_key}, "
+            f"state={self.state}, "
+            f"expires_at={self.expires_at})"
+        )
@@ -0,0 +1,87 @@
+from datetime import date, datetime, time
+from enum import Enum
+
+import sqlalchemy
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+
+from shared.sqlalchemy_db_.sqlalchemy_model.common import SimpleDBM
+from shared.sqlalchemy_db_.sqlalchemy_model.scheduled_survey import ScheduledSurveyDBM
+
+
+class ReminderSlotDBM(SimpleDBM):
+    __tablename__ = "reminder_slots"
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint(
+            "scheduled_survey_id", "slot_date", "scheduled_time", "attempt",
+            name="uq_reminder_slots_survey_date_time_attempt"
+        ),
+        sqlalchemy.Index("ix_reminder_slots_status_due_at", "status", "due_at"),
+        {"extend_existing": True},
+    )
+
+    class SlotStatus(str, Enum):
+        PENDING = "pending"
+        ENQUEUED = "enqueued"
+        SKIPPED = "skipped"
+
+        @classmethod
+        def to_set(cls) -> set[str]:
+            return {item.value for item in cls}
+
+    scheduled_survey_id: Mapped[int] = mapped_column(
+        sqlalchemy.BIGINT,
+        sqlalchemy.ForeignKey("scheduled_surveys.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="ID запланированного опроса"
+    )
+
+    slot_date: Mapped[date] = mapped_column(
+        sqlalchemy.DATE,
+        nullable=False,
+        comment="День, на который развернут слот (UTC)"
+    )
+
+    scheduled_time: Mapped[time] = mapped_column(
+        sqlalchemy.TIME,
+        nullable=False,
+        comment="Время слота из расписания"
+    )
+
+    attempt: Mapped[int] = mapped_column(
+        sqlalchemy.INTEGER,
+        nullable=False,
+        comment="Номер напоминания в слоте (1, 2, 3...)"
+    )
+
+    due_at: Mapped[datetime] = mapped_column(
+        sqlalchemy.TIMESTAMP(timezone=True),
+        nullable=False,
+        comment="Момент отправки напоминания (UTC)"
+    )
+
+    status: Mapped[str] = mapped_column(
+        sqlalchemy.String(20),
+        nullable=False,
+        default=SlotStatus.PENDING,
+        comment="Статус слота: pending, enqueued, skipped"
+    )
+
+    # Связи
+    scheduled_survey: Mapped["ScheduledSurveyDBM"] = relationship("ScheduledSurveyDBM")
+
+    @validates("status")
+    def _validate_status(self, key: str, value: str) -> str:
+        if value not in self.SlotStatus.to_set():
+            raise ValueError(
+                f"Недопустимый статус слота. Допустимые значения: {self.SlotStatus.to_set()}"
+            )
+        return value
+
+    def __repr__(self) -> str:
+        return (
+            f"ReminderSlotDBM(id={self.id}, "
+            f"scheduled_survey_id={self.scheduled_survey_id}, "
+            f"due_at={self.due_at}, "
+            f"attempt={self.attempt}, "
+            f"status={self.status})"
+        )
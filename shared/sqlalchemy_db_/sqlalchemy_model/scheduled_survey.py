@@ -12,6 +12,14 @@ from shared.sqlalchemy_db_.sqlalchemy_model.survey import SurveyDBM
 
 class ScheduledSurveyDBM(SimpleDBM):
     __tablename__ = "scheduled_surveys"
+    __table_args__ = (
+        sqlalchemy.Index(
+            "ix_scheduled_surveys_active_next_scheduled_date",
+            "next_scheduled_date",
+            postgresql_where=sqlalchemy.text("is_active")
+        ),
+        {"extend_existing": True},
+    )
 
     class FrequencyType(str, Enum):
         MULTIPLE_TIMES_PER_DAY = "multiple_times_per_day" 
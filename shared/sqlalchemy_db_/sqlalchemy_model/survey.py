@@ -10,6 +10,14 @@ from shared.sqlalchemy_db_.sqlalchemy_model.survey_question import SurveyQuestio
 
 class SurveyDBM(SimpleDBM):
     __tablename__ = "surveys"
+    __table_args__ = (
+        # Постраничный список активных опросов врача (keyset по id)
+        sqlalchemy.Index(
+            "ix_surveys_active_created_by_id",
+            "created_by", "id",
+            postgresql_where=sqlalchemy.text("is_active")
+        ),
+    )
 
     # Основные поля
     title: Mapped[str] = mapped_column(
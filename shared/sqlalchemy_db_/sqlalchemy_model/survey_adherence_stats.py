@@ -0,0 +1,65 @@
+from datetime import date
+
+import sqlalchemy
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from shared.sqlalchemy_db_.sqlalchemy_model.common import SimpleDBM
+from shared.sqlalchemy_db_.sqlalchemy_model.scheduled_survey import ScheduledSurveyDBM
+
+
+class SurveyAdherenceStatsDBM(SimpleDBM):
+    __tablename__ = "survey_adherence_stats"
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint(
+            "scheduled_survey_id", "stat_date",
+            name="uq_survey_adherence_stats_key"
+        ),
+        {"extend_existing": True},
+    )
+
+    scheduled_survey_id: Mapped[int] = mapped_column(
+        sqlalchemy.BIGINT,
+        sqlalchemy.ForeignKey("scheduled_surveys.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="ID запланированного опроса (опрос конкретного пациента)"
+    )
+
+    stat_date: Mapped[date] = mapped_column(
+        sqlalchemy.DATE,
+        nullable=False,
+        comment="День напоминаний (UTC)"
+    )
+
+    sent_count: Mapped[int] = mapped_column(
+        sqlalchemy.INTEGER,
+        nullable=False,
+        default=0,
+        comment="Напоминаний в статусе sent"
+    )
+
+    completed_count: Mapped[int] = mapped_column(
+        sqlalchemy.INTEGER,
+        nullable=False,
+        default=0,
+        comment="Напоминаний в статусе completed"
+    )
+
+    failed_count: Mapped[int] = mapped_column(
+        sqlalchemy.INTEGER,
+        nullable=False,
+        default=0,
+        comment="Напоминаний в статусе failed"
+    )
+
+    # Связи
+    scheduled_survey: Mapped["ScheduledSurveyDBM"] = relationship("ScheduledSurveyDBM")
+
+    def __repr__(self) -> str:
+        return (
+            f"SurveyAdherenceStatsDBM(id={self.id}, "
+            f"scheduled_survey_id={self.scheduled_survey_id}, "
+            f"stat_date={self.stat_date}, "
+            f"sent={self.sent_count}, "
+            f"completed={self.completed_count}, "
+            f"failed={self.failed_count})"
+        )
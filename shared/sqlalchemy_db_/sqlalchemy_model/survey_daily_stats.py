@@ -0,0 +1,75 @@
+from datetime import date, time
+from typing import Optional
+
+import sqlalchemy
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from shared.sqlalchemy_db_.sqlalchemy_model.common import SimpleDBM
+from shared.sqlalchemy_db_.sqlalchemy_model.question import QuestionDBM
+from shared.sqlalchemy_db_.sqlalchemy_model.scheduled_survey import ScheduledSurveyDBM
+
+
+class SurveyDailyStatsDBM(SimpleDBM):
+    __tablename__ = "survey_daily_stats"
+    __table_args__ = (
+        # Ключ агрегата; NULL-ответы считаются одним вариантом
+        sqlalchemy.UniqueConstraint(
+            "scheduled_survey_id", "stat_date", "scheduled_time", "question_id", "answer",
+            name="uq_survey_daily_stats_key",
+            postgresql_nulls_not_distinct=True
+        ),
+        {"extend_existing": True},
+    )
+
+    scheduled_survey_id: Mapped[int] = mapped_column(
+        sqlalchemy.BIGINT,
+        sqlalchemy.ForeignKey("scheduled_surveys.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="ID запланированного опроса"
+    )
+
+    stat_date: Mapped[date] = mapped_column(
+        sqlalchemy.DATE,
+        nullable=False,
+        comment="День ответа (UTC)"
+    )
+
+    scheduled_time: Mapped[time] = mapped_column(
+        sqlalchemy.TIME,
+        nullable=False,
+        comment="Запланированное время прохождения"
+    )
+
+    question_id: Mapped[int] = mapped_column(
+        sqlalchemy.BIGINT,
+        sqlalchemy.ForeignKey("question.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="ID вопроса"
+    )
+
+    answer: Mapped[Optional[str]] = mapped_column(
+        sqlalchemy.TEXT,
+        nullable=True,
+        comment="Вариант ответа"
+    )
+
+    answers_count: Mapped[int] = mapped_column(
+        sqlalchemy.INTEGER,
+        nullable=False,
+        default=0,
+        comment="Количество таких ответов"
+    )
+
+    # Связи
+    scheduled_survey: Mapped["ScheduledSurveyDBM"] = relationship("ScheduledSurveyDBM")
+
+    question: Mapped["QuestionDBM"] = relationship("QuestionDBM")
+
+    def __repr__(self) -> str:
+        return (
+            f"SurveyDailyStatsDBM(id={self.id}, "
+            f"scheduled_survey_id={self.scheduled_survey_id}, "
+            f"stat_date={self.stat_date}, "
+            f"question_id={self.question_id}, "
+            f"answers_count={self.answers_count})"
+        )
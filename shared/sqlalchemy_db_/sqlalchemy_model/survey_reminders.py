@@ -13,9 +13,60 @@ from shared.sqlalchemy_db_.sqlalchemy_model.scheduled_survey import ScheduledSur
 
 class SurveyReminderDBM(SimpleDBM):
     __tablename__ = "survey_reminders"
+    __table_args__ = (
+        sqlalchemy.Index(
+            "ix_survey_reminders_survey_time_creation_dt",
+            "scheduled_survey_id", "scheduled_time", "creation_dt"
+        ),
+        sqlalchemy.Index(
+            "ix_survey_reminders_pending_creation_dt",
+            "creation_dt",
+            postgresql_where=text("status = 'pending'")
+        ),
+        sqlalchemy.Index(
+            "ix_survey_reminders_sent_creation_dt",
+            "creation_dt",
+            postgresql_where=text("status = 'sent'")
+        ),
+        # Зависшие отправки (например, после падения воркера outbox)
+        sqlalchemy.Index(
+            "ix_survey_reminders_sending_claimed_at",
+            "claimed_at",
+            postgresql_where=text("status = 'sending'")
+        ),
+        # Не больше одного завершенного прохождения на слот (опрос, время, день UTC)
+        sqlalchemy.Index(
+            "uq_survey_reminders_completed_slot",
+            "scheduled_survey_id",
+            "scheduled_time",
+            text("date(timezone('UTC', creation_dt))"),
+            unique=True,
+            postgresql_where=text("status = 'completed'")
+        ),
+        # Не больше одного напоминания с данным номером на слот: страховка от
+        # повторного планирования, если воркер потерял аренду партиции
+        sqlalchemy.Index(
+            "uq_survey_reminders_slot_reminder_number",
+            "scheduled_survey_id",
+            "scheduled_time",
+            "reminder_number",
+            text("date(timezone('UTC', creation_dt))"),
+            unique=True,
+        ),
+        {"extend_existing": True},
+    )
+
+    # Ключ uq_survey_reminders_slot_reminder_number для ON CONFLICT
+    SLOT_REMINDER_NUMBER_KEY = (
+        "scheduled_survey_id",
+        "scheduled_time",
+        "reminder_number",
+        text("date(timezone('UTC', creation_dt))"),
+    )
 
     class ReminderStatus(str, Enum):
         PENDING = "pending"
+        SENDING = "sending"
         SENT = "sent"
         COMPLETED = "completed"
         FAILED = "failed"
@@ -50,6 +101,12 @@ class SurveyReminderDBM(SimpleDBM):
         comment="Статус напоминания"
     )
     
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(
+        sqlalchemy.TIMESTAMP(timezone=True),
+        nullable=True,
+        comment="Время, когда воркер outbox забрал напоминание на отправку"
+    )
+
     completed_at: Mapped[Optional[datetime]] = mapped_column(
         sqlalchemy.TIMESTAMP(timezone=True),
         nullable=True,
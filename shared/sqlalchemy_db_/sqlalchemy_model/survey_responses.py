@@ -12,6 +12,19 @@ from shared.sqlalchemy_db_.sqlalchemy_model.scheduled_survey import ScheduledSur
 
 class SurveyResponseDBM(SimpleDBM):
     __tablename__ = "survey_responses"
+    __table_args__ = (
+        sqlalchemy.Index(
+            "ix_survey_responses_survey_creation_dt_time",
+            "scheduled_survey_id", "creation_dt", "scheduled_time"
+        ),
+        sqlalchemy.Index("ix_survey_responses_patient_creation_dt", "patient_id", "creation_dt"),
+        # Повторная отправка того же прохождения не создает дублей ответов (ON CONFLICT DO NOTHING)
+        sqlalchemy.UniqueConstraint(
+            "survey_reminder_id", "question_id",
+            name="uq_survey_responses_reminder_question"
+        ),
+        {"extend_existing": True},
+    )
 
     scheduled_survey_id: Mapped[Optional[int]] = mapped_column(
         sqlalchemy.BIGINT,
@@ -20,6 +33,13 @@ class SurveyResponseDBM(SimpleDBM):
         comment="ID запланированного опроса"
     )
     
+    survey_reminder_id: Mapped[Optional[int]] = mapped_column(
+        sqlalchemy.BIGINT,
+        sqlalchemy.ForeignKey("survey_reminders.id", ondelete="SET NULL"),
+        nullable=True,
+        comment="ID напоминания, по которому пройден опрос"
+    )
+
     patient_id: Mapped[int] = mapped_column(
         sqlalchemy.BIGINT,
         sqlalchemy.ForeignKey("user.tg_id", ondelete="CASCADE"),
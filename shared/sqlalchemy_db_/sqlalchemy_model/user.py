@@ -9,6 +9,14 @@ from shared.sqlalchemy_db_.sqlalchemy_model.common import SimpleDBM
 
 class UserDBM(SimpleDBM):
     __tablename__ = "user"
+    __table_args__ = (
+        # Постраничный список активных докторов (keyset по id)
+        sqlalchemy.Index(
+            "ix_user_active_role_id",
+            "role", "id",
+            postgresql_where=sqlalchemy.text("is_active")
+        ),
+    )
  
     class Roles(str, Enum):
         doctor = "Доктор"
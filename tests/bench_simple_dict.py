@@ -0,0 +1,127 @@
+import argparse
+import os
+from pathlib import Path
+import sys
+import time
+from typing import Any, Callable, Collection
+
+# Получаем путь к родительской директории
+parent_dir = Path(__file__).parent.parent
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.append(str(parent_dir))
+# Устанавливаем текущую рабочую директорию
+os.chdir(parent_dir)
+
+from sqlalchemy import inspect
+
+from shared.sqlalchemy_db_.database import BaseDBM
+from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM
+
+
+def legacy_simple_dict(
+        obj: BaseDBM,
+        *,
+        need_include_columns: bool = True,
+        need_include_sd_properties: bool = True,
+        include_columns: Collection[str] | None = None,
+        exclude_columns: Collection[str] | None = None,
+        include_sd_properties: Collection[str] | None = None,
+        exclude_sd_properties: Collection[str] | None = None,
+        include_columns_and_sd_properties: Collection[str] | None = None,
+        kwargs: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Прежняя реализация BaseDBM.simple_dict: маппер и dir() на каждый вызов."""
+    if exclude_columns is None:
+        exclude_columns = set()
+    if exclude_sd_properties is None:
+        exclude_sd_properties = set()
+
+    res = {}
+
+    if need_include_columns:
+        for c in inspect(obj).mapper.column_attrs:
+            if include_columns_and_sd_properties is not None and c.key not in include_columns_and_sd_properties:
+                continue
+            if include_columns is not None and c.key not in include_columns:
+                continue
+            if c.key in exclude_columns:
+                continue
+            res[c.key] = getattr(obj, c.key)
+
+    if need_include_sd_properties:
+        for attr_name in dir(obj):
+            if not attr_name.startswith("sdp_") or not isinstance(getattr(type(obj), attr_name, None), property):
+                continue
+
+            sd_property_name = attr_name.removeprefix("sdp_")
+
+            if (
+                    include_columns_and_sd_properties is not None
+                    and sd_property_name not in include_columns_and_sd_properties
+            ):
+                continue
+            if include_sd_properties is not None and sd_property_name not in include_sd_properties:
+                continue
+            if sd_property_name in exclude_sd_properties:
+                continue
+
+            res[sd_property_name] = getattr(obj, attr_name)
+
+    if kwargs is not None:
+        res.update(kwargs)
+
+    return res
+
+
+def make_rows(count: int) -> list[UserDBM]:
+    """Несохраненные пользователи: замер не зависит от БД."""
+    return [
+        UserDBM(
+            id=i,
+            tg_id=1_000_000 + i,
+            full_name=f"Пациент {i}",
+            role=UserDBM.Roles.patient,
+            is_active=True,
+        )
+        for i in range(count)
+    ]
+
+
+def measure(title: str, func: Callable[[], list[dict[str, Any]]], baseline: float | None = None) -> float:
+    started_at = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - started_at
+
+    speedup = f"  x{baseline / seconds:.1f}" if baseline else ""
+    print(f"{title:<45} {seconds:8.3f} с{speedup}")
+    return seconds
+
+
+def main(count: int) -> int:
+    rows = make_rows(count)
+    options_cases = [
+        ("все поля", {}),
+        ("include_columns_and_sd_properties", {"include_columns_and_sd_properties": {"id", "tg_id", "entity_name"}}),
+    ]
+
+    for case_title, options in options_cases:
+        expected = [legacy_simple_dict(row, **options) for row in rows[:100]]
+        if [row.simple_dict(**options) for row in rows[:100]] != expected:
+            print(f"FAIL  simple_dict ({case_title}) отличается от прежней реализации")
+            return 1
+        if BaseDBM.simple_dicts(rows[:100], **options) != expected:
+            print(f"FAIL  simple_dicts ({case_title}) отличается от прежней реализации")
+            return 1
+
+        print(f"{count} строк, {case_title}:")
+        baseline = measure("  прежний simple_dict", lambda: [legacy_simple_dict(row, **options) for row in rows])
+        measure("  simple_dict", lambda: [row.simple_dict(**options) for row in rows], baseline)
+        measure("  simple_dicts", lambda: BaseDBM.simple_dicts(rows, **options), baseline)
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сравнение прежнего и текущего BaseDBM.simple_dict")
+    parser.add_argument("--rows", type=int, default=100_000, help="Количество сериализуемых строк")
+    sys.exit(main(parser.parse_args().rows))
@@ -0,0 +1,185 @@
+from datetime import datetime, time
+import asyncio
+import json
+import os
+from pathlib import Path
+import sys
+
+import pytz
+import sqlalchemy
+
+# Получаем путь к родительской директории
+parent_dir = Path(__file__).parent.parent
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.append(str(parent_dir))
+# Устанавливаем текущую рабочую директорию
+os.chdir(parent_dir)
+
+from sqlalchemy.dialects import postgresql
+
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+from shared.sqlalchemy_db_.sqlalchemy_model import (
+    DoctorPatientDBM,
+    ReminderSlotDBM,
+    ScheduledSurveyDBM,
+    SurveyAdherenceStatsDBM,
+    SurveyDailyStatsDBM,
+    SurveyDBM,
+    SurveyReminderDBM,
+    SurveyResponseDBM,
+    UserDBM,
+)
+
+
+def hot_queries() -> list[tuple[str, str, sqlalchemy.Select]]:
+    """Горячие запросы и индексы, которые они должны использовать."""
+    now = datetime.now(tz=pytz.UTC)
+    today = now.date()
+
+    return [
+        (
+            "Активные опросы на сегодня (планировщик)",
+            "ix_scheduled_surveys_active_next_scheduled_date",
+            sqlalchemy.select(ScheduledSurveyDBM.id)
+            .where(ScheduledSurveyDBM.is_active)
+            .where(ScheduledSurveyDBM.next_scheduled_date == today),
+        ),
+        (
+            "Расписания, день которых закончился (переход на новый день)",
+            "ix_scheduled_surveys_active_next_scheduled_date",
+            sqlalchemy.select(ScheduledSurveyDBM.id)
+            .where(ScheduledSurveyDBM.is_active)
+            .where(ScheduledSurveyDBM.next_scheduled_date < today),
+        ),
+        (
+            "Попытки прохождения слота за день (сохранение ответов)",
+            "ix_survey_reminders_survey_time_creation_dt",
+            sqlalchemy.select(SurveyReminderDBM.id)
+            .where(SurveyReminderDBM.scheduled_survey_id == 1)
+            .where(SurveyReminderDBM.scheduled_time == time(9, 0))
+            .where(SurveyReminderDBM.created_on(today)),
+        ),
+        (
+            "Outbox неотправленных напоминаний",
+            "ix_survey_reminders_pending_creation_dt",
+            sqlalchemy.select(SurveyReminderDBM.id)
+            .where(SurveyReminderDBM.status == SurveyReminderDBM.ReminderStatus.PENDING.value)
+            .where(SurveyReminderDBM.creation_dt >= now),
+        ),
+        (
+            "Напоминания без ответа за прошлые дни (переход на новый день)",
+            "ix_survey_reminders_sent_creation_dt",
+            sqlalchemy.select(SurveyReminderDBM.id)
+            .where(SurveyReminderDBM.status == SurveyReminderDBM.ReminderStatus.SENT.value)
+            .where(SurveyReminderDBM.creation_dt < now),
+        ),
+        (
+            "Ответы по опросу за день (статистика)",
+            "ix_survey_responses_survey_creation_dt_time",
+            sqlalchemy.select(SurveyResponseDBM.id)
+            .where(SurveyResponseDBM.scheduled_survey_id == 1)
+            .where(SurveyResponseDBM.created_on(today))
+            .where(SurveyResponseDBM.scheduled_time == time(9, 0)),
+        ),
+        (
+            "Ответы пациента за период",
+            "ix_survey_responses_patient_creation_dt",
+            sqlalchemy.select(SurveyResponseDBM.id)
+            .where(SurveyResponseDBM.patient_id == 1)
+            .where(SurveyResponseDBM.created_on(today)),
+        ),
+        (
+            "Наступившие слоты напоминаний",
+            "ix_reminder_slots_status_due_at",
+            sqlalchemy.select(ReminderSlotDBM.id)
+            .where(ReminderSlotDBM.status == ReminderSlotDBM.SlotStatus.PENDING.value)
+            .where(ReminderSlotDBM.due_at <= now)
+            .order_by(ReminderSlotDBM.due_at)
+            .limit(100),
+        ),
+        (
+            "Агрегаты ответов по опросу за период",
+            "uq_survey_daily_stats_key",
+            sqlalchemy.select(SurveyDailyStatsDBM.answers_count)
+            .where(SurveyDailyStatsDBM.scheduled_survey_id == 1)
+            .where(SurveyDailyStatsDBM.stat_date >= today),
+        ),
+        (
+            "Агрегаты выполнения опроса пациентом за период",
+            "uq_survey_adherence_stats_key",
+            sqlalchemy.select(SurveyAdherenceStatsDBM.completed_count)
+            .where(SurveyAdherenceStatsDBM.scheduled_survey_id == 1)
+            .where(SurveyAdherenceStatsDBM.stat_date >= today),
+        ),
+        (
+            "Страница опросов врача (выбор опроса)",
+            "ix_surveys_active_created_by_id",
+            sqlalchemy.select(SurveyDBM.id)
+            .where(SurveyDBM.created_by == 1)
+            .where(SurveyDBM.is_active)
+            .where(SurveyDBM.id > 0)
+            .order_by(SurveyDBM.id)
+            .limit(6),
+        ),
+        (
+            "Страница пациентов врача (выбор пациента)",
+            "uq_doctor_patient",
+            sqlalchemy.select(DoctorPatientDBM.patient_id)
+            .where(DoctorPatientDBM.doctor_id == 1)
+            .where(DoctorPatientDBM.patient_id > 0)
+            .order_by(DoctorPatientDBM.patient_id)
+            .limit(6),
+        ),
+        (
+            "Страница докторов (закрепление за доктором)",
+            "ix_user_active_role_id",
+            sqlalchemy.select(UserDBM.id)
+            .where(UserDBM.role == UserDBM.Roles.doctor)
+            .where(UserDBM.is_active)
+            .where(UserDBM.id > 0)
+            .order_by(UserDBM.id)
+            .limit(6),
+        ),
+    ]
+
+
+def used_indexes(plan: dict) -> set[str]:
+    """Имена индексов, встречающихся в плане запроса."""
+    indexes = set()
+    if "Index Name" in plan:
+        indexes.add(plan["Index Name"])
+    for subplan in plan.get("Plans", []):
+        indexes |= used_indexes(subplan)
+    return indexes
+
+
+async def main() -> int:
+    failed = 0
+
+    async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+        # На маленьких таблицах планировщик предпочитает seq scan,
+        # поэтому проверяем, что индекс в принципе применим к запросу
+        await async_session.execute(sqlalchemy.text("SET LOCAL enable_seqscan = off"))
+
+        for title, index_name, query in hot_queries():
+            sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+            plan = (await async_session.execute(
+                sqlalchemy.text(f"EXPLAIN (FORMAT JSON) {sql}")
+            )).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            indexes = used_indexes(plan[0]["Plan"])
+            if index_name in indexes:
+                print(f"OK    {title}: {index_name}")
+            else:
+                failed += 1
+                print(f"FAIL  {title}: ожидался {index_name}, использованы {sorted(indexes) or 'нет индексов'}")
+
+        await async_session.rollback()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,120 @@
+"""Проверка маршрутизации сессий между основным сервером и репликой.
+
+Вместо настоящей реплики подойдет второй локальный PostgreSQL с той же
+БД, пользователем и паролем, например на порту 5433:
+
+    python tests/check_replica_routing.py localhost:5433
+
+Без аргумента используется первая реплика из POSTGRES_REPLICAS.
+"""
+from datetime import timedelta
+import asyncio
+import os
+from pathlib import Path
+import sys
+
+import sqlalchemy
+
+# Получаем путь к родительской директории
+parent_dir = Path(__file__).parent.parent
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.append(str(parent_dir))
+# Устанавливаем текущую рабочую директорию
+os.chdir(parent_dir)
+
+from shared.config import DatabaseSettings
+from shared.sqlalchemy_db_.database import SQLAlchemyDb
+
+
+# Сервер, на который пришел запрос: адрес, порт и время запуска отличают экземпляры на одной машине
+SERVER_IDENTITY_SQL = sqlalchemy.text(
+    "SELECT inet_server_addr()::text, inet_server_port(), pg_postmaster_start_time()::text"
+)
+
+# Порт, на котором заведомо нет сервера: реплика недоступна
+UNREACHABLE_REPLICA = "127.0.0.1:1"
+
+
+def create_db(settings: DatabaseSettings) -> SQLAlchemyDb:
+    return SQLAlchemyDb(
+        sync_db_url=settings.DATABASE_URL,
+        async_db_url=settings.ASYNC_DATABASE_URL,
+        pool_size=1,
+        max_overflow=0,
+        replica_db_urls=settings.REPLICA_DATABASE_URLS,
+        async_replica_db_urls=settings.ASYNC_REPLICA_DATABASE_URLS,
+        replica_check_interval=timedelta(seconds=0),
+        replica_connect_timeout=timedelta(seconds=1),
+    )
+
+
+def sync_identity(db: SQLAlchemyDb, readonly: bool) -> tuple:
+    with db.new_session(readonly=readonly) as session:
+        first = tuple(session.execute(SERVER_IDENTITY_SQL).one())
+        second = tuple(session.execute(SERVER_IDENTITY_SQL).one())
+        # Все запросы сессии должны идти на один сервер
+        return first if first == second else ("разные серверы в одной сессии", first, second)
+
+
+async def async_identity(db: SQLAlchemyDb, readonly: bool) -> tuple:
+    async with db.use_async_session(readonly=readonly) as async_session:
+        first = tuple((await async_session.execute(SERVER_IDENTITY_SQL)).one())
+        second = tuple((await async_session.execute(SERVER_IDENTITY_SQL)).one())
+        return first if first == second else ("разные серверы в одной сессии", first, second)
+
+
+async def main() -> int:
+    base_settings = DatabaseSettings()
+    replica = sys.argv[1] if len(sys.argv) > 1 else next(iter(base_settings.POSTGRES_REPLICAS), None)
+    if replica is None:
+        print("Укажите реплику (host:port) аргументом или в POSTGRES_REPLICAS")
+        return 2
+
+    with_replica = create_db(base_settings.model_copy(update={"POSTGRES_REPLICAS": [replica]}))
+    without_replica = create_db(base_settings.model_copy(update={"POSTGRES_REPLICAS": []}))
+    unreachable_replica = create_db(base_settings.model_copy(update={"POSTGRES_REPLICAS": [UNREACHABLE_REPLICA]}))
+
+    with without_replica.engine.connect() as conn:
+        primary_identity = tuple(conn.execute(SERVER_IDENTITY_SQL).one())
+    with with_replica.replica_router.replicas[0].connect() as conn:
+        replica_identity = tuple(conn.execute(SERVER_IDENTITY_SQL).one())
+    if primary_identity == replica_identity:
+        print(f"Реплика {replica} - тот же сервер, что и основной: проверка не имеет смысла")
+        return 2
+
+    checks = [
+        ("Синхронная сессия на запись", sync_identity(with_replica, readonly=False), primary_identity),
+        ("Синхронная сессия только для чтения", sync_identity(with_replica, readonly=True), replica_identity),
+        ("Асинхронная сессия на запись", await async_identity(with_replica, readonly=False), primary_identity),
+        ("Асинхронная сессия только для чтения", await async_identity(with_replica, readonly=True), replica_identity),
+        ("Чтение без настроенных реплик", sync_identity(without_replica, readonly=True), primary_identity),
+        (
+            "Асинхронное чтение без настроенных реплик",
+            await async_identity(without_replica, readonly=True),
+            primary_identity,
+        ),
+        ("Чтение при недоступной реплике", sync_identity(unreachable_replica, readonly=True), primary_identity),
+        (
+            "Асинхронное чтение при недоступной реплике",
+            await async_identity(unreachable_replica, readonly=True),
+            primary_identity,
+        ),
+    ]
+
+    failed = 0
+    for title, actual, expected in checks:
+        target = "основной сервер" if expected == primary_identity else f"реплика {replica}"
+        if actual == expected:
+            print(f"OK    {title}: {target}")
+        else:
+            failed += 1
+            print(f"FAIL  {title}: ожидался {target} {expected}, получено {actual}")
+
+    for db in (with_replica, without_replica, unreachable_replica):
+        await db.async_engine.dispose()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
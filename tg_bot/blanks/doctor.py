@@ -1,3 +1,4 @@
+import html
 from datetime import datetime, timedelta
 from typing import Optional
 from shared.sqlalchemy_db_.sqlalchemy_model import SurveyDBM, UserDBM
@@ -440,17 +441,12 @@ class DoctorBlank(CommonBlank):
     
 
     @staticmethod
-    def get_survey_selection_blank(has_surveys: bool = False) -> str:
+    def get_survey_selection_blank(has_surveys: bool = False, search: Optional[str] = None) -> str:
         """Бланк выбора опроса с inline-кнопками
         
         Args:
-            surveys: Список опросов формата:
-                [{
-                    'id': int, 
-                    'title': str, 
-                    'questions_count': int,
-                    'created_at': str (дата)
-                }]
+            has_surveys: Есть ли опросы на текущей странице
+            search: Начало названия, по которому отфильтрован список
         """
         base_text = (
             "📋 <b>Выберите опрос для планирования</b>\n\n"
@@ -458,10 +454,21 @@ class DoctorBlank(CommonBlank):
             "1. Просмотрите список ваших опросов ниже\n"
             "2. Нажмите на кнопку с нужным опросом\n"
             "3. Система перейдет к выбору пациента\n\n"
-            "🔍 <b>Доступные опросы:</b>"
+            "🔎 <i>Чтобы найти опрос, отправьте начало его названия</i>\n\n"
         )
+
+        if search:
+            base_text += f"🔍 <b>Опросы, начинающиеся с «{html.escape(search)}»:</b>"
+        else:
+            base_text += "🔍 <b>Доступные опросы:</b>"
         
         if not has_surveys:
+            if search:
+                return (
+                    f"{base_text}\n\n"
+                    "😔 <i>Ничего не найдено</i>\n\n"
+                    "✏️ Отправьте другое начало названия"
+                )
             return (
                 f"{base_text}\n\n"
                 "😔 <i>У вас нет доступных опросов</i>\n\n"
@@ -505,6 +512,7 @@ class DoctorBlank(CommonBlank):
         survey_dbm: SurveyDBM, 
         user_id: int,
         has_patients: bool = True,
+        search: Optional[str] = None,
     ) -> str:
         """Бланк выбора пациента после подтверждения опроса
         
@@ -512,12 +520,20 @@ class DoctorBlank(CommonBlank):
             survey_dbm: Объект опроса
             has_patients: Есть ли прикрепленные пациенты
             user_id: ID врача в системе (для подстановки в инструкцию)
+            search: Начало ФИО, по которому отфильтрован список
         """
         base_text = (
             "👤 <b>Выбор пациента для опроса</b>\n\n"
             f"📋 <b>Опрос:</b> {survey_dbm.title} (ID: {survey_dbm.id})\n\n"
         )
         
+        if not has_patients and search:
+            return (
+                f"{base_text}"
+                f"😔 <i>Нет пациентов, ФИО которых начинается с «{html.escape(search)}»</i>\n\n"
+                "✏️ Отправьте другое начало ФИО"
+            )
+
         if not has_patients:
             instruction = (
                 "ℹ️ <i>У вас пока нет прикрепленных пациентов</i>\n\n"
@@ -531,12 +547,16 @@ class DoctorBlank(CommonBlank):
             instruction += "После этого пациент появится в вашем списке"
             return f"{base_text}{instruction}"
         
+        search_text = f"🔍 <b>Пациенты, ФИО которых начинается с «{html.escape(search)}»</b>\n" if search else ""
+
         return (
             f"{base_text}"
             "ℹ️ <i>Инструкция:</i>\n"
             "1. Выберите пациента из списка ниже\n"
             "2. Подтвердите выбор пациента\n"
             "3. Укажите дату и время прохождения\n\n"
+            f"{search_text}"
+            "🔎 <i>Чтобы найти пациента, отправьте начало его ФИО</i>\n"
             "👇 <b>Используйте кнопки ниже для выбора</b>"
         )
     
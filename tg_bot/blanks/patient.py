@@ -1,4 +1,6 @@
+import html
 from datetime import time
+from typing import Optional
 from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM
 from tg_bot.blanks import CommonBlank
 
@@ -16,11 +18,20 @@ class PatientBlank(CommonBlank):
         return text
 
     @staticmethod
-    def get_doctor_selection_blank() -> str:
+    def get_doctor_selection_blank(has_doctors: bool = True, search: Optional[str] = None) -> str:
         text = (
             f"👨⚕️👩⚕️ Выберите доктора, к которому вы хотите закрепиться!\n\n"
-            f"👇 Доступные специалисты:"
+            f"🔎 Чтобы найти доктора, отправьте начало его ФИО\n\n"
         )
+
+        if search and not has_doctors:
+            text += f"😔 Нет докторов, ФИО которых начинается с «{html.escape(search)}»"
+        elif search:
+            text += f"👇 Специалисты, ФИО которых начинается с «{html.escape(search)}»:"
+        elif not has_doctors:
+            text += f"😔 Пока нет доступных специалистов"
+        else:
+            text += f"👇 Доступные специалисты:"
         return text
 
     @staticmethod
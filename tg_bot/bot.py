@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from pathlib import Path
@@ -6,7 +7,9 @@ from aiogram import Bot, Dispatcher
 from aiogram.methods import DeleteWebhook
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
+from datetime import timedelta
 
 # Получаем путь к родительской директории
 parent_dir = Path(__file__).parent.parent
@@ -16,7 +19,12 @@ sys.path.append(str(parent_dir))
 os.chdir(parent_dir)
 
 from shared.config import BotSettings
-from tg_bot.middlewares import UserActivityMiddleware
+from shared.sqlalchemy_db_.notify_channel import ChannelListener, SURVEY_CHANGED_CHANNEL, USER_CHANGED_CHANNEL
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db, set_sqlalchemy_db_profile
+from tg_bot.export_jobs import get_cached_export_job_queue
+from tg_bot.fsm_storage import SQLAlchemyStorage
+from tg_bot.middlewares import DbSessionMiddleware, QueryScopeMiddleware, UserActivityMiddleware
+from tg_bot.utils import get_cached_survey_cache, get_cached_user_cache
 from tg_bot.handlers.main_router import main_router
 
 class LoggerConfig:
@@ -44,6 +52,16 @@ class BotInitializer:
         self.logger = LoggerConfig().logger
         self.bot = self._create_bot()
         self.dp = self._create_dispatcher()
+        # Изменения пользователей в админке сбрасывают кэш пользователей бота
+        self.user_changes_listener = ChannelListener(
+            USER_CHANGED_CHANNEL,
+            get_cached_user_cache().invalidate
+        )
+        # Правки опросов и вопросов в админке сбрасывают кэш описаний опросов
+        self.survey_changes_listener = ChannelListener(
+            SURVEY_CHANGED_CHANNEL,
+            get_cached_survey_cache().invalidate
+        )
 
     def _create_bot(self) -> Bot:
         return Bot(
@@ -51,15 +69,31 @@ class BotInitializer:
             default=DefaultBotProperties(parse_mode=ParseMode.HTML)
         )
 
+    def _create_storage(self) -> BaseStorage:
+        if self.settings.BOT_FSM_STORAGE == "memory":
+            return MemoryStorage()
+
+        return SQLAlchemyStorage(
+            ttl=timedelta(hours=self.settings.BOT_FSM_STATE_TTL_HOURS),
+            flush_interval_seconds=self.settings.BOT_FSM_FLUSH_INTERVAL_SECONDS,
+        )
+
     def _create_dispatcher(self) -> Dispatcher:
-        storage = MemoryStorage()
-        dp = Dispatcher(storage=storage)
+        storage = self._create_storage()
+        # FSMContextMiddleware подключается в _setup_middleware внутри DbSessionMiddleware
+        dp = Dispatcher(storage=storage, disable_fsm=True)
         self._setup_middleware(dp)
         self._setup_routers(dp)
         return dp
 
     def _setup_middleware(self, dp: Dispatcher):
         """Настройка middleware (Strategy pattern)"""
+        # Одна сессия (и не больше одного соединения из пула) на апдейт, включая чтение состояния FSM
+        dp.update.outer_middleware(DbSessionMiddleware())
+        dp.update.outer_middleware(dp.fsm)
+        # Запросы всех обработчиков апдейта (включая поиск пользователя) - одна область статистики,
+        # имя области зависит от состояния FSM
+        dp.update.outer_middleware(QueryScopeMiddleware())
         activity_middleware = UserActivityMiddleware(logger=self.logger)
         dp.message.middleware(activity_middleware)
         dp.callback_query.middleware(activity_middleware)
@@ -70,6 +104,7 @@ class BotInitializer:
     async def start(self):
         """Запуск бота"""
         await self.bot(DeleteWebhook(drop_pending_updates=True))
+        await get_cached_sqlalchemy_db().async_warm_up()
         
         for admin_id in self.settings.ADMIN_IDS:
             await self.bot.send_message(
@@ -78,14 +113,25 @@ class BotInitializer:
             )
             
         self.logger.info("Bot started successfully")
-        await self.dp.start_polling(self.bot)
+        listeners = [self.user_changes_listener, self.survey_changes_listener]
+        listener_tasks = [asyncio.create_task(listener.start()) for listener in listeners]
+        try:
+            await self.dp.start_polling(self.bot)
+        finally:
+            for listener in listeners:
+                await listener.stop()
+            await asyncio.gather(*listener_tasks)
+            await get_cached_export_job_queue().close()
+            self.logger.info(f"Export job stats: {get_cached_export_job_queue().stats()}")
+            self.logger.info(f"User cache stats: {get_cached_user_cache().stats()}")
+            self.logger.info(f"Survey cache stats: {get_cached_survey_cache().stats()}")
 
 def start_bot():
     """Точка входа в приложение"""
+    set_sqlalchemy_db_profile("bot")
     bot_settings = BotSettings()
     bot_initializer = BotInitializer(settings=bot_settings)
     
-    import asyncio
     asyncio.run(bot_initializer.start())
 
 if __name__ == "__main__":
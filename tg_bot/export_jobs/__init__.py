@@ -0,0 +1,10 @@
+from tg_bot.export_jobs.queue import ExportJob, ExportJobQueue, get_cached_export_job_queue, report_progress
+from tg_bot.export_jobs.reports import build_survey_statistics_report
+
+__all__ = [
+    "ExportJob",
+    "ExportJobQueue",
+    "build_survey_statistics_report",
+    "get_cached_export_job_queue",
+    "report_progress",
+]
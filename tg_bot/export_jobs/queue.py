@@ -0,0 +1,208 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Coroutine, Hashable, Optional
+
+from shared.config import get_cached_settings
+from shared.sqlalchemy_db_.query_stats import query_scope
+from shared.sqlalchemy_db_.sqlalchemy_db import set_sqlalchemy_db_profile
+from tg_bot.utils.table_export import ExportFile
+
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+
+# Состояние процесса-исполнителя: очередь прогресса и текущая задача
+_worker_progress_queue: Any = None
+_worker_job_id: Optional[int] = None
+
+
+def _init_worker(progress_queue: Any) -> None:
+    global _worker_progress_queue
+    _worker_progress_queue = progress_queue
+    set_sqlalchemy_db_profile("export")
+
+
+def _run_job(job_id: int, func: Callable[..., list[ExportFile]], *args: Any) -> list[ExportFile]:
+    global _worker_job_id
+    _worker_job_id = job_id
+    try:
+        with query_scope(f"export:{getattr(func, '__name__', 'job')}"):
+            return func(*args)
+    finally:
+        _worker_job_id = None
+
+
+def report_progress(done: int, total: int) -> None:
+    """Сообщить о прогрессе задачи выгрузки (вызывается внутри исполнителя).
+
+    Args:
+        done: Выполнено шагов
+        total: Всего шагов
+    """
+    if _worker_progress_queue is None or _worker_job_id is None:
+        return
+    _worker_progress_queue.put_nowait((_worker_job_id, done, total))
+
+
+@dataclass
+class ExportJob:
+    """Выполняющаяся задача выгрузки."""
+    id: int
+    future: asyncio.Future
+    on_progress: Optional[ProgressCallback] = field(default=None)
+
+
+class ExportJobQueue:
+    """Фоновые выгрузки в пуле процессов.
+
+    Сборка отчета (запросы и формирование файла) выполняется в отдельных
+    процессах, цикл событий бота только ждет результат. Задачи с
+    одинаковым ключом объединяются в одну, готовые результаты хранятся
+    в LRU кэше по ключу, поэтому ключ должен включать версию данных.
+    """
+
+    def __init__(self, max_workers: int = 2, cache_size: int = 32):
+        """Инициализация очереди.
+
+        Args:
+            max_workers: Количество процессов-исполнителей
+            cache_size: Количество хранимых готовых результатов
+        """
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._progress_queue: Any = None
+        self._progress_task: Optional[asyncio.Task] = None
+        self._jobs: dict[Hashable, ExportJob] = {}
+        self._jobs_by_id: dict[int, ExportJob] = {}
+        self._results: OrderedDict[Hashable, list[ExportFile]] = OrderedDict()
+        self._job_ids = itertools.count(1)
+        self._tasks: set[asyncio.Task] = set()
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.completed_jobs = 0
+        self.failed_jobs = 0
+
+    def _ensure_started(self) -> None:
+        if self._executor is not None:
+            return
+
+        # spawn: дочерний процесс не наследует цикл событий и соединения бота
+        context = multiprocessing.get_context("spawn")
+        self._progress_queue = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._progress_queue,),
+        )
+        self._progress_task = asyncio.create_task(self._read_progress())
+
+    def get_result(self, key: Hashable) -> Optional[list[ExportFile]]:
+        """Готовый результат по ключу или None."""
+        files = self._results.get(key)
+        if files is not None:
+            self._results.move_to_end(key)
+        return files
+
+    def submit(
+        self,
+        key: Hashable,
+        func: Callable[..., list[ExportFile]],
+        *args: Any,
+    ) -> tuple[ExportJob, bool]:
+        """Поставить выгрузку в очередь.
+
+        Args:
+            key: Ключ задачи и результата
+            func: Функция сборки отчета (уровня модуля, выполняется в исполнителе)
+            *args: Аргументы функции (должны сериализоваться pickle)
+
+        Returns:
+            tuple[ExportJob, bool]: Задача и признак, что она создана
+                (False - уже выполнялась задача с тем же ключом)
+        """
+        job = self._jobs.get(key)
+        if job is not None:
+            return job, False
+
+        self._ensure_started()
+
+        job_id = next(self._job_ids)
+        future = asyncio.get_running_loop().run_in_executor(self._executor, _run_job, job_id, func, *args)
+        job = ExportJob(id=job_id, future=future)
+        self._jobs[key] = job
+        self._jobs_by_id[job_id] = job
+        future.add_done_callback(lambda done_future: self._finish_job(key, job))
+
+        return job, True
+
+    def _finish_job(self, key: Hashable, job: ExportJob) -> None:
+        self._jobs.pop(key, None)
+        self._jobs_by_id.pop(job.id, None)
+        if job.future.cancelled():
+            return
+
+        error = job.future.exception()
+        if error is not None:
+            # Трассировка исполнителя приходит в error.__cause__ и попадает в лог вместе с ошибкой
+            self.failed_jobs += 1
+            self._logger.error(
+                f"export job {job.id} {key!r} failed: {error!r}",
+                exc_info=(type(error), error, error.__traceback__),
+            )
+            return
+
+        self.completed_jobs += 1
+        self._results[key] = job.future.result()
+        self._results.move_to_end(key)
+        while len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        """Счетчики выполненных и упавших задач."""
+        return {"completed": self.completed_jobs, "failed": self.failed_jobs, "cached": len(self._results)}
+
+    def spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        """Запустить фоновую корутину (например, доставку результата)."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _read_progress(self) -> None:
+        while True:
+            item = await asyncio.to_thread(self._progress_queue.get)
+            if item is None:
+                return
+
+            job_id, done, total = item
+            job = self._jobs_by_id.get(job_id)
+            if job is not None and job.on_progress is not None:
+                self.spawn(job.on_progress(done, total))
+
+    async def close(self) -> None:
+        """Остановить исполнителей и фоновые задачи."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._progress_queue.put(None)
+            await self._progress_task
+            await asyncio.to_thread(self._executor.shutdown, wait=True)
+            self._executor = None
+
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+@lru_cache()
+def get_cached_export_job_queue() -> ExportJobQueue:
+    return ExportJobQueue(
+        max_workers=get_cached_settings().bot.BOT_EXPORT_WORKERS,
+        cache_size=get_cached_settings().bot.BOT_EXPORT_CACHE_SIZE,
+    )
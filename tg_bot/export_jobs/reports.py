@@ -0,0 +1,85 @@
+import sqlalchemy
+
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+from shared.sqlalchemy_db_.sqlalchemy_model import SurveyDBM, SurveyQuestionDBM
+from tg_bot.export_jobs.queue import report_progress
+from tg_bot.handlers.doctor.schedule_survey_service import ScheduleSurveyService
+from tg_bot.utils.table_export import ExportColumn, ExportFile, ExportFormat, TableExportWriter
+
+
+def build_survey_statistics_report(
+    survey_ids: list[int],
+    export_format: ExportFormat,
+    yield_per: int = 1000,
+) -> list[ExportFile]:
+    """Отчет со статистикой ответов: по листу на опрос и сводный лист
+    выполнения опросов пациентами (из агрегатов survey_adherence_stats).
+
+    Выполняется в процессе-исполнителе ExportJobQueue, поэтому работает
+    с синхронной сессией и сообщает о прогрессе после каждого опроса.
+
+    Args:
+        survey_ids: ID опросов
+        export_format: Формат выгрузки
+        yield_per: Размер пачки строк, читаемой из курсора
+
+    Returns:
+        list[ExportFile]: Файлы отчета
+    """
+    # Тяжелые выборки читаются с реплики, если она настроена и не отстает
+    with get_cached_sqlalchemy_db().new_session(readonly=True) as session, TableExportWriter(
+        filename="survey_stats",
+        export_format=export_format,
+    ) as writer:
+        surveys = session.execute(
+            sqlalchemy
+            .select(SurveyDBM.id, SurveyDBM.title)
+            .where(SurveyDBM.id.in_(survey_ids))
+            .order_by(SurveyDBM.id)
+        ).all()
+
+        for survey_number, survey in enumerate(surveys):
+            # Вопросы в порядке их ID
+            question_ids = list(session.execute(
+                sqlalchemy
+                .select(SurveyQuestionDBM.question_id)
+                .where(SurveyQuestionDBM.survey_id == survey.id)
+                .order_by(SurveyQuestionDBM.question_id)
+            ).scalars())
+
+            writer.add_sheet(
+                title=f"{survey.title[:25]}_{survey.id}",
+                columns=[
+                    ExportColumn("Пользователь", width=15),
+                    ExportColumn("Запланированная дата", width=22),
+                    ExportColumn("Запланированное время", width=22),
+                    *(ExportColumn(f"Вопрос с ID: {question_id}", width=20) for question_id in question_ids),
+                ],
+                header_height=25,
+            )
+
+            rows = session.execute(
+                ScheduleSurveyService
+                .build_survey_statistics_query(survey_id=survey.id)
+                .execution_options(yield_per=yield_per)
+            )
+            for row in rows:
+                user_id, curr_date, scheduled_time, answers = ScheduleSurveyService.statistics_row(row, question_ids)
+                writer.append([user_id, curr_date, scheduled_time, *answers])
+
+            report_progress(survey_number + 1, len(surveys))
+
+        writer.add_sheet(
+            title="Выполнение",
+            columns=[
+                ExportColumn("ID опроса", width=12),
+                ExportColumn("Пользователь", width=15),
+                ExportColumn("Отправлено без ответа", width=22),
+                ExportColumn("Пройдено", width=12),
+                ExportColumn("Пропущено", width=12),
+            ],
+        )
+        for row in session.execute(ScheduleSurveyService.build_patient_adherence_query(survey_ids=survey_ids)):
+            writer.append(list(row))
+
+        return writer.build()
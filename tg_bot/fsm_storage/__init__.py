@@ -0,0 +1,7 @@
+from tg_bot.fsm_storage.serializer import FSMDataSerializer
+from tg_bot.fsm_storage.sqlalchemy_storage import SQLAlchemyStorage
+
+__all__ = [
+    "FSMDataSerializer",
+    "SQLAlchemyStorage",
+]
@@ -0,0 +1,54 @@
+import json
+import zlib
+from typing import Any, Optional
+
+
+class FSMDataSerializer:
+    """Компактная сериализация данных FSM.
+
+    Данные хранятся в JSON, большие payload дополнительно сжимаются zlib.
+    Первый байт определяет формат, чтобы его можно было менять без
+    миграции уже сохраненных состояний. Данные FSM - простые словари
+    (см. to_state() моделей), поэтому pickle не нужен: его загрузка из
+    общей таблицы позволила бы выполнить произвольный код.
+    """
+
+    # Прежние форматы на pickle: такие данные не загружаются и считаются пустыми
+    FORMAT_PICKLE = b"\x00"
+    FORMAT_PICKLE_ZLIB = b"\x01"
+    FORMAT_JSON = b"\x02"
+    FORMAT_JSON_ZLIB = b"\x03"
+
+    def __init__(self, compress_threshold: int = 512):
+        """Инициализация.
+
+        Args:
+            compress_threshold: Размер (в байтах), начиная с которого payload сжимается
+        """
+        self.compress_threshold = compress_threshold
+
+    def dumps(self, data: dict[str, Any]) -> Optional[bytes]:
+        """Сериализовать данные (None для пустых данных)."""
+        if not data:
+            return None
+
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(payload) >= self.compress_threshold:
+            return self.FORMAT_JSON_ZLIB + zlib.compress(payload)
+        return self.FORMAT_JSON + payload
+
+    def loads(self, raw: Optional[bytes]) -> dict[str, Any]:
+        """Десериализовать данные."""
+        if not raw:
+            return {}
+
+        raw = bytes(raw)
+        data_format, payload = raw[:1], raw[1:]
+        if data_format in (self.FORMAT_PICKLE, self.FORMAT_PICKLE_ZLIB):
+            return {}
+        if data_format == self.FORMAT_JSON_ZLIB:
+            payload = zlib.decompress(payload)
+        elif data_format != self.FORMAT_JSON:
+            raise ValueError(f"Неизвестный формат данных FSM: {data_format!r}")
+
+        return json.loads(payload)
@@ -0,0 +1,268 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Mapping, Optional
+
+import pytz
+import sqlalchemy
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+from shared.sqlalchemy_db_.sqlalchemy_model import FSMStateDBM
+from tg_bot.fsm_storage.serializer import FSMDataSerializer
+from tg_bot.middlewares.db_session import get_update_session
+
+
+_UNSET: Any = object()
+
+# Ключ session.info сессии апдейта: прочитанные за апдейт строки (state, data) по ключам FSM
+_LOADED_ROWS_INFO_KEY = "fsm_loaded_rows"
+
+
+@dataclass
+class _PendingWrite:
+    """Еще не сохраненные в БД изменения одного ключа."""
+    state: Any = _UNSET
+    data: Any = _UNSET
+
+    def merge(self, newer: "_PendingWrite") -> "_PendingWrite":
+        return _PendingWrite(
+            state=self.state if newer.state is _UNSET else newer.state,
+            data=self.data if newer.data is _UNSET else newer.data,
+        )
+
+
+class SQLAlchemyStorage(BaseStorage):
+    """Хранилище FSM в таблице fsm_states (PostgreSQL).
+
+    Состояние и данные ключа читаются одним запросом в сессии апдейта
+    (DbSessionMiddleware) и запоминаются до конца апдейта, поэтому FSM
+    не берет из пула дополнительных соединений.
+
+    Смена состояния сохраняется сразу, до возврата из set_state. Изменения
+    данных копятся в памяти и пачками сохраняются одним upsert на каждый
+    flush (write-behind); пока изменение не сохранено, чтение этого ключа
+    обслуживается из буфера. Цена буфера: до flush_interval_seconds
+    изменения данных не видны другим процессам бота и теряются при
+    аварийном завершении процесса (при 0 - сохраняются сразу, write-through).
+
+    Состояние, которое не менялось дольше ttl, считается брошенным:
+    оно не читается и периодически удаляется.
+    """
+
+    def __init__(
+        self,
+        key_builder: Optional[KeyBuilder] = None,
+        serializer: Optional[FSMDataSerializer] = None,
+        ttl: timedelta = timedelta(days=3),
+        flush_interval_seconds: float = 0.2,
+        flush_batch_size: int = 200,
+        cleanup_interval: timedelta = timedelta(minutes=10),
+    ):
+        """Инициализация хранилища.
+
+        Args:
+            key_builder: Построитель ключей FSM
+            serializer: Сериализатор данных FSM
+            ttl: Время жизни неизменяемого состояния
+            flush_interval_seconds: Максимальная задержка сохранения изменений данных (0 - сохранять сразу)
+            flush_batch_size: Количество измененных ключей, при котором сохранение запускается досрочно
+            cleanup_interval: Период удаления брошенных состояний
+        """
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self.serializer = serializer or FSMDataSerializer()
+        self.ttl = ttl
+        self.flush_interval_seconds = flush_interval_seconds
+        self.flush_batch_size = flush_batch_size
+        self.cleanup_interval = cleanup_interval
+
+        self._pending: dict[str, _PendingWrite] = {}
+        self._flushing: dict[str, _PendingWrite] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_requested = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._next_cleanup_at: Optional[datetime] = None
+        self._is_closing = False
+
+    def _find_pending(self, storage_key: str, field: str) -> Any:
+        """Последнее несохраненное значение поля или _UNSET."""
+        for writes in (self._pending, self._flushing):
+            write = writes.get(storage_key)
+            if write is not None and getattr(write, field) is not _UNSET:
+                return getattr(write, field)
+        return _UNSET
+
+    async def _enqueue(self, storage_key: str, write: _PendingWrite, flush_now: bool = False) -> None:
+        previous = self._pending.get(storage_key)
+        self._pending[storage_key] = previous.merge(write) if previous else write
+
+        # Прочитанная в этом апдейте строка устарела
+        update_session = get_update_session()
+        if update_session is not None:
+            update_session.info.get(_LOADED_ROWS_INFO_KEY, {}).pop(storage_key, None)
+
+        if flush_now or self.flush_interval_seconds <= 0:
+            await self.flush()
+            return
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        if len(self._pending) >= self.flush_batch_size:
+            self._flush_requested.set()
+
+    @staticmethod
+    async def _select_row(async_session: AsyncSession, storage_key: str) -> tuple[Optional[str], Optional[str]]:
+        row = (await async_session.execute(
+            sqlalchemy.select(FSMStateDBM.state, FSMStateDBM.data)
+            .where(FSMStateDBM.storage_key == storage_key)
+            .where(FSMStateDBM.expires_at > datetime.now(tz=pytz.UTC))
+        )).one_or_none()
+        return (row.state, row.data) if row is not None else (None, None)
+
+    async def _read(self, storage_key: str) -> tuple[Optional[str], Optional[str]]:
+        """Сохраненные состояние и данные ключа."""
+        update_session = get_update_session()
+        if update_session is None:
+            async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+                return await self._select_row(async_session, storage_key)
+
+        loaded_rows = update_session.info.setdefault(_LOADED_ROWS_INFO_KEY, {})
+        if storage_key not in loaded_rows:
+            loaded_rows[storage_key] = await self._select_row(update_session, storage_key)
+        return loaded_rows[storage_key]
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._enqueue(
+            self.key_builder.build(key),
+            _PendingWrite(state=state.state if isinstance(state, State) else state),
+            flush_now=True,
+        )
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        storage_key = self.key_builder.build(key)
+        state = self._find_pending(storage_key, "state")
+        if state is not _UNSET:
+            return state
+        state, _ = await self._read(storage_key)
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            msg = f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            raise DataNotDictLikeError(msg)
+
+        # Сериализуем сразу: дальнейшие изменения объектов не должны попасть в хранилище
+        await self._enqueue(self.key_builder.build(key), _PendingWrite(data=self.serializer.dumps(data)))
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        storage_key = self.key_builder.build(key)
+        raw = self._find_pending(storage_key, "data")
+        if raw is _UNSET:
+            _, raw = await self._read(storage_key)
+
+        try:
+            return self.serializer.loads(raw)
+        except Exception as e:
+            # Нечитаемые данные (например, после смены формата) не должны блокировать пользователя
+            print(f"Ошибка чтения данных FSM {storage_key}: {str(e)}")
+            return {}
+
+    async def _write(self, writes: dict[str, _PendingWrite]) -> None:
+        """Сохранить изменения: один upsert на каждый набор изменяемых колонок."""
+        now = datetime.now(tz=pytz.UTC)
+        groups: dict[tuple[bool, bool], list[dict[str, Any]]] = {}
+        for storage_key, write in writes.items():
+            row = {"storage_key": storage_key, "creation_dt": now, "expires_at": now + self.ttl}
+            if write.state is not _UNSET:
+                row["state"] = write.state
+            if write.data is not _UNSET:
+                row["data"] = write.data
+            groups.setdefault((write.state is not _UNSET, write.data is not _UNSET), []).append(row)
+
+        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+            try:
+                for (has_state, has_data), rows in groups.items():
+                    stmt = postgresql.insert(FSMStateDBM.__table__)
+                    values = {"expires_at": stmt.excluded.expires_at}
+                    if has_state:
+                        values["state"] = stmt.excluded.state
+                    if has_data:
+                        values["data"] = stmt.excluded.data
+
+                    await async_session.execute(
+                        stmt.on_conflict_do_update(index_elements=[FSMStateDBM.storage_key], set_=values),
+                        rows,
+                    )
+
+                await async_session.commit()
+            except Exception:
+                await async_session.rollback()
+                raise
+
+    async def flush(self) -> None:
+        """Сохранить все накопленные изменения."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            self._flushing, self._pending = self._pending, {}
+            try:
+                await self._write(self._flushing)
+            except Exception:
+                # Возвращаем несохраненное в буфер, не перетирая более новые изменения
+                for storage_key, write in self._flushing.items():
+                    newer = self._pending.get(storage_key)
+                    self._pending[storage_key] = write.merge(newer) if newer else write
+                raise
+            finally:
+                self._flushing = {}
+
+    async def delete_expired(self) -> int:
+        """Удалить брошенные и пустые состояния.
+
+        Returns:
+            int: Количество удаленных состояний
+        """
+        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+            result = await async_session.execute(
+                sqlalchemy.delete(FSMStateDBM.__table__)
+                .where(sqlalchemy.or_(
+                    FSMStateDBM.expires_at <= datetime.now(tz=pytz.UTC),
+                    sqlalchemy.and_(FSMStateDBM.state.is_(None), FSMStateDBM.data.is_(None)),
+                ))
+            )
+            await async_session.commit()
+
+        return result.rowcount
+
+    async def _flush_loop(self) -> None:
+        while not self._is_closing:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+
+            try:
+                await self.flush()
+
+                now = datetime.now(tz=pytz.UTC)
+                if self._next_cleanup_at is None or now >= self._next_cleanup_at:
+                    self._next_cleanup_at = now + self.cleanup_interval
+                    await self.delete_expired()
+            except Exception as e:
+                print(f"Ошибка при сохранении состояний FSM: {str(e)}")
+
+    async def close(self) -> None:
+        # Не отменяем задачу, чтобы не прервать сохранение на середине
+        self._is_closing = True
+        self._flush_requested.set()
+        if self._flush_task is not None:
+            await self._flush_task
+            self._flush_task = None
+
+        await self.flush()
@@ -2,13 +2,14 @@ from aiogram import F, Router
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from tg_bot.keyboards import CommonKeyboard, CommonAction
 from tg_bot.blanks import CommonBlank
 from tg_bot.handlers.common.message_service import MessageService
 from tg_bot.handlers.common.user_service import UserService
-from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM
 from tg_bot.states import ChangeFullNameStates
+from tg_bot.utils.user_cache import UserSnapshot
 
 
 router = Router()
@@ -19,7 +20,7 @@ async def proccess_start_message(
     state: FSMContext,
     keyboard: type[CommonKeyboard],
     blank: type[CommonBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True,
 ):
     message_from_cq = message if from_cq else None
@@ -50,7 +51,7 @@ async def handle_start_message(
     state: FSMContext,
     keyboard: type[CommonKeyboard],
     blank: type[CommonBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ) -> None:
     """
     Обработка начального сообщения от пользователя
@@ -107,6 +108,7 @@ async def handle_new_full_name_input(
     state: FSMContext,
     blank: type[CommonBlank],
     keyboard: type[CommonKeyboard],
+    session: AsyncSession,
 ) -> None:
     """
     Обработка нового ФИО, введенного пользователем
@@ -126,7 +128,8 @@ async def handle_new_full_name_input(
         # Обновляем ФИО в базе данных
         await UserService.update_user_full_name(
             message.from_user.id,
-            normalized_full_name
+            normalized_full_name,
+            session=session
         )
     else:
         text = blank.get_invalid_name_format_blank()
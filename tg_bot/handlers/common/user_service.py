@@ -1,5 +1,9 @@
+from typing import Optional
+
 import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from shared.sqlalchemy_db_.notify_channel import notify_user_changed
 from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
 from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM
 from tg_bot.utils import validate_and_normalize_full_name
@@ -11,7 +15,8 @@ class UserService:
     @staticmethod
     async def update_user_full_name(
         user_id: int,
-        new_full_name: str
+        new_full_name: str,
+        session: Optional[AsyncSession] = None,
     ) -> None:
         """
         Обновление ФИО пользователя в базе данных
@@ -19,14 +24,19 @@ class UserService:
         Args:
             user_id: ID пользователя в Telegram
             new_full_name: Новое ФИО пользователя
+            session: Сессия апдейта; None - отдельная сессия
         """
-        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as async_session:
             result = await async_session.execute(
                 sqlalchemy.select(UserDBM).where(UserDBM.tg_id == user_id)
             )
             user = result.scalar_one()  # Получаем одного пользователя
             user.full_name = new_full_name  # Обновляем ФИО
-            await async_session.commit()  # Сохраняем изменения
+            await async_session.flush()  # Сохраняем изменения (commit - у владельца сессии)
+
+            # Кэш пользователей сбросит слушатель USER_CHANGED_CHANNEL: NOTIFY доставляется
+            # только после commit, поэтому параллельный апдейт не вернет в кэш старые данные
+            await notify_user_changed(async_session, user_id)
 
     @staticmethod
     async def full_name_is_valid(full_name: str) -> bool:
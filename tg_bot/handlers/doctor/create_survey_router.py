@@ -1,18 +1,16 @@
-import os
-import uuid
 from aiogram import F, Router
-from aiogram.types import CallbackQuery, Message, FSInputFile
+from aiogram.types import BufferedInputFile, CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
-from openpyxl.utils import get_column_letter
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from shared.sqlalchemy_db_.sqlalchemy_model.user import UserDBM
+from shared.config import get_cached_settings
 from tg_bot.handlers.common.message_service import MessageService
 from tg_bot.handlers.doctor.create_survey_service import CreateSurveyService
 from tg_bot.keyboards import DoctorAction, DoctorKeyboard
 from tg_bot.blanks import DoctorBlank
 from tg_bot.states.survey import CreateSurveyStates
+from tg_bot.utils.table_export import ExportColumn, TableExportWriter
+from tg_bot.utils.user_cache import UserSnapshot
 
 router = Router()
 
@@ -22,7 +20,7 @@ async def handle_create_title_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await callback_query.answer()
     
@@ -45,7 +43,7 @@ async def proccess_edit_survey_title(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     change_title: bool = True
 ):
     if change_title:
@@ -82,7 +80,7 @@ async def handle_input_title_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_edit_survey_title(
         message=message,
@@ -99,7 +97,7 @@ async def handle_edit_survey_title(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_edit_survey_title(
         message=callback_query.message,
@@ -115,7 +113,7 @@ async def proccess_handle_choose_type_question(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True
 ):
     count_questions = await CreateSurveyService.get_count_questions_in_survey(state)
@@ -147,7 +145,7 @@ async def handle_confirm_title_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await CreateSurveyService.confirm_survey_title(
         state=state
@@ -167,7 +165,7 @@ async def handle_choose_type_question_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_handle_choose_type_question(
         message=callback_query.message,
@@ -183,7 +181,7 @@ async def handle_choose_type_question(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_handle_choose_type_question(
         message=message,
@@ -199,7 +197,7 @@ async def proccess_choose_new_question_select(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True
 ):
     message_from_cq = message if from_cq else None
@@ -229,7 +227,7 @@ async def handle_choose_new_question_type_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_choose_new_question_select(
         message=callback_query.message,
@@ -245,7 +243,7 @@ async def handle_choose_new_question_type(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_choose_new_question_select(
         message=message,
@@ -261,7 +259,7 @@ async def proccess_choose_template_question_select(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True
 ):
     message_from_cq = message if from_cq else None
@@ -291,7 +289,7 @@ async def handle_choose_template_question_type_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_choose_template_question_select(
         message=callback_query.message,
@@ -307,7 +305,7 @@ async def handle_choose_template_question_type(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_choose_template_question_select(
         message=message,
@@ -324,7 +322,7 @@ async def handle_confirm_new_question_type(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     count_questions = await CreateSurveyService.get_count_questions_in_survey(state)
 
@@ -346,7 +344,7 @@ async def handle_confirm_template_question_type(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     count_questions = await CreateSurveyService.get_count_questions_in_survey(state)
     
@@ -369,7 +367,7 @@ async def handle_add_new_question_text(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     # Добавляем текст в опрос
     await CreateSurveyService.add_or_edit_question_text_in_survey(
@@ -404,7 +402,7 @@ async def handle_add_new_question_options(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     count_questions = await CreateSurveyService.get_count_questions_in_survey(state=state)
     
@@ -451,7 +449,8 @@ async def handle_add_template_question(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot,
+    session: AsyncSession
 ):
     template_question_id = await MessageService.get_value_from_callback_data(
         message.text,
@@ -463,7 +462,8 @@ async def handle_add_template_question(
     is_success = await CreateSurveyService.add_or_edit_template_question_to_survey(
         state=state,
         user_id=message.from_user.id,
-        template_question_id=template_question_id
+        template_question_id=template_question_id,
+        session=session
     )
     
     count_questions = await CreateSurveyService.get_count_questions_in_survey(state)
@@ -504,11 +504,13 @@ async def handle_save_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot,
+    session: AsyncSession
 ):
     survey_was_added = await CreateSurveyService.save_survey_in_db(
         state=state,
         user_id=callback_query.from_user.id,
+        session=session,
     )
 
     await MessageService.edith_managed_message(
@@ -534,7 +536,7 @@ async def handle_cancel_create_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await MessageService.edith_managed_message(
         bot=callback_query.bot,
@@ -561,7 +563,7 @@ async def proccess_handle_edit_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True
 ):
     message_from_cq = message if from_cq else None
@@ -599,7 +601,7 @@ async def handle_edit_survey_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_handle_edit_survey(
         message=callback_query.message,
@@ -615,7 +617,7 @@ async def handle_edit_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_handle_edit_survey(
         message=message,
@@ -632,7 +634,7 @@ async def handle_set_current_question(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     question_id = await MessageService.get_value_from_callback_data(
         callback_data=callback_query.data,
@@ -660,7 +662,7 @@ async def handle_remove_current_question(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await CreateSurveyService.remove_current_question(state)
     
@@ -677,7 +679,7 @@ async def process_handle_create_question(
         state: FSMContext,
         keyboard: type[DoctorKeyboard],
         blank: type[DoctorBlank],
-        user_dbm: type[UserDBM],
+        user_dbm: UserSnapshot,
         save_edit_question: bool = False,
 ):
     current_question = await CreateSurveyService.get_current_question(state)
@@ -715,7 +717,7 @@ async def handle_finish_editing(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await process_handle_create_question(
         callback_query=callback_query,
@@ -731,7 +733,7 @@ async def handle_edit_current_question(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await process_handle_create_question(
         callback_query=callback_query,
@@ -748,98 +750,42 @@ async def handle_get_list_questions(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot,
+    session: AsyncSession
 ):
     await callback_query.answer()
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Список вопросов"
-    
-    # Стили форматирования
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True, size=12)
-    border = Border(left=Side(style='thin'), 
-                  right=Side(style='thin'), 
-                  top=Side(style='thin'), 
-                  bottom=Side(style='thin'))
-    alignment = Alignment(wrap_text=True, vertical='center', horizontal='left')
-    
-    # Заголовки
-    headers = ["ID вопроса", "Текст вопроса", "Варианты ответов", "Создатель", "Публичный"]
-    ws.append(headers)
-    
-    # Форматирование заголовков
-    for row in ws.iter_rows(min_row=1, max_row=1):
-        for cell in row:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = border
-    
-    # Получаем данные
-    question_dbms = await CreateSurveyService.get_available_questions(user_dbm.tg_id)
-
-    # Заполняем данными
-    for question_dbm in question_dbms:
-        answer_options = "\n".join(question_dbm.answer_options) if question_dbm.answer_options else ""
-        row = [
-            question_dbm.id, 
-            question_dbm.question_text, 
-            answer_options, 
-            question_dbm.created_by, 
-            "✓" if question_dbm.is_public else "✗"
-        ]
-        ws.append(row)
-        
-        # Форматирование строки данных
-        current_row = ws.max_row
-        for col in range(1, 6):
-            cell = ws.cell(row=current_row, column=col)
-            cell.alignment = alignment
-            cell.border = border
-            
-            # Центрируем ID и статус публичности
-            if col in [1, 5]:
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-    
-    # Автоматическая ширина столбцов с ограничением
-    col_widths = {
-        'A': 10,  # ID вопроса
-        'B': 40,  # Текст вопроса
-        'C': 30,  # Варианты ответов
-        'D': 15,  # Создатель
-        'E': 10   # Публичный
-    }
-    
-    for col_letter, width in col_widths.items():
-        ws.column_dimensions[col_letter].width = width
-    
-    # Автоматическая высота строк
-    for row in ws.iter_rows(min_row=2):
-        max_lines = 1
-        for cell in row:
-            if cell.value and isinstance(cell.value, str):
-                lines = cell.value.count('\n') + 1
-                if lines > max_lines:
-                    max_lines = lines
-        ws.row_dimensions[row[0].row].height = 20 * max_lines
-    
-    # Замораживаем заголовки
-    ws.freeze_panes = 'A2'
-    
-    # Добавляем фильтры
-    ws.auto_filter.ref = f"A1:E{ws.max_row}"
-    
-    # Сохраняем и отправляем файл
-    file_path = f'./questions_list_{uuid.uuid4()}.xlsx'
-    wb.save(file_path)
-    
-    try:
-        stat_file = FSInputFile(file_path)
+
+    with TableExportWriter(
+        filename="questions_list",
+        export_format=get_cached_settings().bot.BOT_EXPORT_FORMAT,
+    ) as writer:
+        writer.add_sheet(
+            title="Список вопросов",
+            columns=[
+                ExportColumn("ID вопроса", width=10, centered=True),
+                ExportColumn("Текст вопроса", width=40),
+                ExportColumn("Варианты ответов", width=30),
+                ExportColumn("Создатель", width=15),
+                ExportColumn("Публичный", width=10, centered=True),
+            ],
+            auto_filter=True,
+            line_height=20,
+        )
+
+        async for question_dbm in CreateSurveyService.iter_available_questions(user_dbm.tg_id, session=session):
+            answer_options = "\n".join(question_dbm.answer_options) if question_dbm.answer_options else ""
+            writer.append([
+                question_dbm.id,
+                question_dbm.question_text,
+                answer_options,
+                question_dbm.created_by,
+                "✓" if question_dbm.is_public else "✗"
+            ])
+
+        export_files = writer.build()
+
+    for export_file in export_files:
         await callback_query.message.answer_document(
-            document=stat_file,
+            document=BufferedInputFile(export_file.content, filename=export_file.filename),
             caption="Список всех доступных вопросов"
-        )
-    finally:
-        if os.path.exists(file_path):
-            os.remove(file_path)
\ No newline at end of file
+        )
\ No newline at end of file
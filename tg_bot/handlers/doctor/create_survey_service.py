@@ -1,4 +1,6 @@
-from typing import Optional
+from datetime import datetime
+from typing import AsyncIterator, Optional
+import pytz
 import sqlalchemy
 from sqlalchemy.ext.asyncio import AsyncSession
 from aiogram.fsm.context import FSMContext
@@ -13,9 +15,9 @@ class CreateSurveyService:
     async def _get_or_create_survey(
         state: FSMContext
     ) -> CreatedSurvey:
-        survey: CreatedSurvey = await MessageService.get_state_data(
+        survey = CreatedSurvey.from_state(await MessageService.get_state_data(
             state=state, key=CreatedSurvey._STATE_KEY_SURVEY_DATA,
-        )
+        ))
 
         if survey is None:
             survey = CreatedSurvey()
@@ -73,7 +75,7 @@ class CreateSurveyService:
         await MessageService.set_state_data(
             state=state,
             key=CreatedSurvey._STATE_KEY_SURVEY_DATA,
-            value=survey,
+            value=survey.to_state(),
         )
 
     @staticmethod
@@ -268,7 +270,9 @@ class CreateSurveyService:
         question_id: str
     ):
         survey = await CreateSurveyService._get_or_create_survey(state)
-        return survey.set_current_question(question_id)
+        survey.set_current_question(question_id)
+
+        await CreateSurveyService._save_survey_changes(state, survey)
 
     @staticmethod
     async def get_current_question_number(
@@ -331,9 +335,10 @@ class CreateSurveyService:
     @staticmethod
     async def _get_template_question_from_db(
         user_id: int,
-        template_question_id: int
+        template_question_id: int,
+        session: Optional[AsyncSession] = None,
     ) -> Optional[QuestionDBM]:
-        async with get_cached_sqlalchemy_db().new_async_session() as session:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as session:
             question_dbm = (await session.execute(
                 sqlalchemy
                 .select(QuestionDBM)
@@ -351,10 +356,12 @@ class CreateSurveyService:
         state: FSMContext,
         user_id: int,
         template_question_id: int,
+        session: Optional[AsyncSession] = None,
     ) -> bool:
         question_dbm = await CreateSurveyService._get_template_question_from_db(
             user_id=user_id, 
             template_question_id=template_question_id,
+            session=session,
         )
 
         if question_dbm is None:
@@ -380,11 +387,13 @@ class CreateSurveyService:
     async def add_or_edit_template_question_to_survey(
         state: FSMContext,
         user_id: int,
-        template_question_id: int
+        template_question_id: int,
+        session: Optional[AsyncSession] = None,
     ) -> bool:
         question_dbm = await CreateSurveyService._get_template_question_from_db(
             user_id=user_id,
             template_question_id=template_question_id,
+            session=session,
         )
         if question_dbm is None:
             return False
@@ -436,55 +445,107 @@ class CreateSurveyService:
         )
         session.add(survey)
         await session.flush()
-        await session.refresh(survey)
         return survey
 
     @staticmethod
-    async def _create_question_record(
-        session: AsyncSession, 
+    async def _get_available_template_ids(
+        session: AsyncSession,
         user_id: int,
-        survey_id: int,
-        question: Question,
-        order: int,
-    ) -> bool:
-        if question.is_from_template and question.template_question_id:
-            try:
-                question_dbm = (await session.execute(
-                    sqlalchemy
-                    .select(QuestionDBM)
-                    .where(QuestionDBM.id == question.template_question_id)
-                    .where(
-                        (QuestionDBM.created_by == user_id) |
-                        (QuestionDBM.is_public)
-                    )
-                )).scalar_one()
-            except Exception as e:
-                return False
-        else:
-            if question.text is None or question.options is None:
-                return False
-
-            question_dbm = QuestionDBM(
-                created_by=user_id,
-                question_type=QuestionDBM.QuestionType.CHOICE,
-                question_text=question.text,
-                answer_options=question.options,
+        template_question_ids: set[int],
+    ) -> set[int]:
+        """Отбирает шаблонные вопросы, доступные врачу (один запрос на все)"""
+        if not template_question_ids:
+            return set()
+
+        return set((await session.execute(
+            sqlalchemy
+            .select(QuestionDBM.id)
+            .where(QuestionDBM.id.in_(template_question_ids))
+            .where(
+                (QuestionDBM.created_by == user_id) |
+                (QuestionDBM.is_public)
             )
+        )).scalars())
+
+    @staticmethod
+    async def _create_question_records(
+        session: AsyncSession,
+        user_id: int,
+        survey_id: int,
+        questions: list[Question],
+    ) -> int:
+        """Сохраняет вопросы опроса пачкой, независимо от их количества:
+        проверка шаблонов, вставка новых вопросов и вставка связей с опросом.
 
-            session.add(question_dbm)
-            await session.flush()
-            await session.refresh(question_dbm)
+        Вопросы, которые нельзя сохранить (недоступный шаблон, нет текста
+        или вариантов), пропускаются, как и раньше.
 
-        survey_question_dbm = SurveyQuestionDBM(
-            survey_id=survey_id,
-            question_id=question_dbm.id,
-            order_index=order
+        Returns:
+            int: Количество добавленных в опрос вопросов
+        """
+        template_ids = await CreateSurveyService._get_available_template_ids(
+            session=session,
+            user_id=user_id,
+            template_question_ids={
+                question.template_question_id
+                for question in questions
+                if question.is_from_template and question.template_question_id
+            },
         )
-        session.add(survey_question_dbm)
-        await session.flush()
-        await session.refresh(survey_question_dbm)
-        
-        return True
+
+        # (order_index, вопрос, id шаблона или None для нового вопроса)
+        links: list[tuple[int, Question, Optional[int]]] = []
+        for order, question in enumerate(questions, 1):
+            if question.is_from_template and question.template_question_id:
+                if question.template_question_id in template_ids:
+                    links.append((order, question, question.template_question_id))
+            # Вставка через Core минует @validates модели, поэтому варианты проверяются здесь
+            elif question.text is not None and CreatedSurvey.is_valid_options(question.options):
+                links.append((order, question, None))
+
+        if not links:
+            return 0
+
+        # creation_dt передаем явно: insert_default модели вычислен при импорте
+        now = datetime.now(tz=pytz.UTC)
+
+        new_questions = [question for _, question, template_id in links if template_id is None]
+        new_question_ids: dict[str, int] = {}  # id черновика: id в БД
+        if new_questions:
+            new_question_ids = dict(zip(
+                (question.id for question in new_questions),
+                (await session.execute(
+                    sqlalchemy
+                    .insert(QuestionDBM)
+                    .returning(QuestionDBM.id, sort_by_parameter_order=True),
+                    [
+                        {
+                            "creation_dt": now,
+                            "created_by": user_id,
+                            "question_type": QuestionDBM.QuestionType.CHOICE.value,
+                            "question_text": question.text,
+                            "answer_options": question.options,
+                            "is_public": False,
+                        }
+                        for question in new_questions
+                    ],
+                )).scalars().all(),
+            ))
+
+        await session.execute(
+            sqlalchemy.insert(SurveyQuestionDBM),
+            [
+                {
+                    "creation_dt": now,
+                    "survey_id": survey_id,
+                    "question_id": template_id if template_id is not None else new_question_ids[question.id],
+                    "order_index": order,
+                }
+                for order, question, template_id in links
+            ],
+        )
+
+        return len(links)
 
     @staticmethod
     async def clear_survey_data(
@@ -500,30 +561,27 @@ class CreateSurveyService:
     @staticmethod
     async def save_survey_in_db(
         state: FSMContext,
-        user_id: int
+        user_id: int,
+        session: Optional[AsyncSession] = None,
     ) -> bool:
         survey = await CreateSurveyService._get_or_create_survey(state)
 
         if survey.count_valid_questions == 0:
             return False
         
-        async with get_cached_sqlalchemy_db().new_async_session() as session:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as session:
             survey_dbm = await CreateSurveyService._create_survey_record(
                 session=session,
                 title=survey.title,
                 user_id=user_id
             )
 
-            for order, question in enumerate(survey.get_active_questions(), 1):
-                added = await CreateSurveyService._create_question_record(
-                    session=session,
-                    user_id=user_id,
-                    survey_id=survey_dbm.id,
-                    question=question,
-                    order=order
-                )
-            
-            await session.commit()
+            await CreateSurveyService._create_question_records(
+                session=session,
+                user_id=user_id,
+                survey_id=survey_dbm.id,
+                questions=survey.get_active_questions(),
+            )
         
         await CreateSurveyService.clear_survey_data(
             state=state,
@@ -532,11 +590,32 @@ class CreateSurveyService:
 
         return True
     
+    @staticmethod
+    async def iter_available_questions(
+        user_id: int,
+        yield_per: int = 500,
+        session: Optional[AsyncSession] = None,
+    ) -> AsyncIterator[QuestionDBM]:
+        """Доступные врачу вопросы, читаемые через серверный курсор пачками по yield_per"""
+        async with get_cached_sqlalchemy_db().use_async_session(session) as session:
+            question_dbms = await session.stream_scalars(
+                sqlalchemy
+                .select(QuestionDBM)
+                .where(
+                    (QuestionDBM.created_by == user_id) |
+                    (QuestionDBM.is_public)
+                ).order_by(QuestionDBM.id)
+                .execution_options(yield_per=yield_per)
+            )
+            async for question_dbm in question_dbms:
+                yield question_dbm
+
     @staticmethod
     async def get_available_questions(
-        user_id: int
+        user_id: int,
+        session: Optional[AsyncSession] = None,
     ) -> list[QuestionDBM]:
-        async with get_cached_sqlalchemy_db().new_async_session() as session:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as session:
             question_dbms = (await session.execute(
                 sqlalchemy
                 .select(QuestionDBM)
@@ -1,19 +1,22 @@
-import os
 from typing import Optional
-import uuid
 from aiogram import F, Router
-from aiogram.types import CallbackQuery, Message, FSInputFile
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM, ScheduledSurveyDBM, SurveyDBM
+from shared.config import get_cached_settings
+from shared.sqlalchemy_db_.keyset_pagination import KeysetCursor
+from shared.sqlalchemy_db_.sqlalchemy_model import ScheduledSurveyDBM, SurveyDBM
 from tg_bot.handlers.common.message_service import MessageService
 from tg_bot.keyboards import DoctorAction, DoctorKeyboard
 from tg_bot.blanks import DoctorBlank
 from tg_bot.states.survey import ScheduleSurveyStates
 from tg_bot.handlers.doctor.schedule_survey_service import ScheduleSurveyService
+from tg_bot.export_jobs import ExportJob, build_survey_statistics_report, get_cached_export_job_queue
+from tg_bot.utils.common import normalize_search_text
+from tg_bot.utils.table_export import ExportFile
+from tg_bot.utils.user_cache import UserSnapshot
 
 router = Router()
 
@@ -23,7 +26,7 @@ async def hadle_cancel_scheduling(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await ScheduleSurveyService.clear_schedule_data(
         state=state,
@@ -46,7 +49,7 @@ async def proccess_hadle_shoose_type_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True
 ):
     await ScheduleSurveyService.clear_schedule_data(
@@ -80,7 +83,7 @@ async def handle_choose_type_survey_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_hadle_shoose_type_survey(
         message=callback_query.message,
@@ -96,7 +99,7 @@ async def handle_choose_type_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_hadle_shoose_type_survey(
         message=message,
@@ -113,7 +116,7 @@ async def proccess_hadle_choose_multiple_times_per_day(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True
 ):
     message_from_cq = message if from_cq else None
@@ -148,7 +151,7 @@ async def hadle_choose_multiple_times_per_day_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_hadle_choose_multiple_times_per_day(
         message=callback_query.message,
@@ -164,7 +167,7 @@ async def hadle_choose_multiple_times_per_day(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_hadle_choose_multiple_times_per_day(
         message=message,
@@ -181,7 +184,7 @@ async def proccess_handle_set_times_per_day(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True,
     times_per_day: Optional[int] = None,
     error_msg: Optional[str] = None
@@ -219,7 +222,7 @@ async def hadle_choose_times_per_day_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
 ):
     times_per_day = await MessageService.get_value_from_callback_data(
         callback_data=callback_query.data,
@@ -241,7 +244,7 @@ async def hadle_choose_times_per_day(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     count = await ScheduleSurveyService.get_times_per_day(state=state)
     
@@ -286,7 +289,7 @@ async def proccess_hadle_select_once_per_day(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True,
     error_msg: Optional[str] = None
 ):
@@ -322,7 +325,7 @@ async def hadle_select_once_per_day_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_hadle_select_once_per_day(
         message=callback_query.message,
@@ -338,7 +341,7 @@ async def hadle_select_once_per_day(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     is_success, schedule_times, error_msg = await ScheduleSurveyService.validate_and_parse_times(message.text, 1)
     if is_success:
@@ -380,7 +383,7 @@ async def proccess_hadle_select_every_few_days(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True
 ):
     await ScheduleSurveyService.save_frequency_type_survey(
@@ -415,7 +418,7 @@ async def hadle_select_every_few_days_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_hadle_select_every_few_days(
         message=callback_query.message,
@@ -431,7 +434,7 @@ async def hadle_select_every_few_days(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     await proccess_hadle_select_every_few_days(
         message=message,
@@ -448,7 +451,7 @@ async def proccess_handle_set_interval_days(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True,
     interval_days: Optional[int] = None,
     error_msg: Optional[str] = None
@@ -485,7 +488,7 @@ async def handle_set_interval_days_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
 ):
     interval_days = await MessageService.get_value_from_callback_data(
         callback_data=callback_query.data,
@@ -507,7 +510,7 @@ async def handle_set_interval_days(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     is_success, schedule_times, error_msg = await ScheduleSurveyService.validate_and_parse_times(message.text, 1)
     
@@ -551,7 +554,7 @@ async def handle_set_survey_period(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     start_date_str = await MessageService.get_value_from_callback_data(
         callback_data=message.text, 
@@ -610,12 +613,16 @@ async def proccess_handle_survey_selection(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
-    page: int = 0,
+    user_dbm: UserSnapshot,
     from_cq: bool = False,
+    session: Optional[AsyncSession] = None,
 ):
-    survey_dbms = await ScheduleSurveyService.get_available_surveys(
+    search = await ScheduleSurveyService.get_select_survey_search(state)
+    survey_page = await ScheduleSurveyService.get_available_surveys(
         user_id=user_dbm.tg_id,
+        search=search,
+        cursor=await ScheduleSurveyService.get_select_survey_cursor(state),
+        session=session,
     )
 
     message_from_cq = message if from_cq else None
@@ -623,11 +630,8 @@ async def proccess_handle_survey_selection(
     await MessageService.edith_managed_message(
             bot=message.bot,
             user_id=user_dbm.tg_id,
-            text=blank.get_survey_selection_blank(len(survey_dbms)),
-            reply_markup=keyboard.get_survey_selection_keyboard(
-                survey_dbms=survey_dbms,
-                page=page,
-            ),
+            text=blank.get_survey_selection_blank(bool(survey_page.items), search=search),
+            reply_markup=keyboard.get_survey_selection_keyboard(survey_page=survey_page),
             state=state,
             previous_message_key="start_msg_id",
             message_id_storage_key="start_msg_id",
@@ -648,16 +652,22 @@ async def handle_survey_selection_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
+    session: AsyncSession,
 ):
-    current_page = await MessageService.get_value_from_callback_data(
+    cursor = KeysetCursor.parse(await MessageService.get_value_from_callback_data(
         callback_data=call_back_query.data,
-        default_value=0,
-    )
+        default_value=None,
+        type=str,
+    ))
+
+    # Переход к списку (а не листание) сбрасывает поиск
+    if cursor is None:
+        await ScheduleSurveyService.save_select_survey_search(state=state, search=None)
 
-    await ScheduleSurveyService.save_select_survey_current_page(
+    await ScheduleSurveyService.save_select_survey_cursor(
         state=state,
-        page=current_page,
+        cursor=cursor,
     )
 
     await proccess_handle_survey_selection(
@@ -666,8 +676,8 @@ async def handle_survey_selection_cq(
         keyboard=keyboard,
         blank=blank,
         user_dbm=user_dbm,
-        page=current_page,
         from_cq=True,
+        session=session,
     )
 
 @router.message(ScheduleSurveyStates.waiting_select_survey)
@@ -676,9 +686,15 @@ async def handle_survey_selection(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
+    session: AsyncSession,
 ):
-    current_page = await ScheduleSurveyService.get_select_survey_current_page(state)
+    # Текст сообщения - начало названия опроса для поиска
+    await ScheduleSurveyService.save_select_survey_search(
+        state=state,
+        search=normalize_search_text(message.text),
+    )
+    await ScheduleSurveyService.save_select_survey_cursor(state=state, cursor=None)
 
     await proccess_handle_survey_selection(
         message=message,
@@ -686,7 +702,7 @@ async def handle_survey_selection(
         keyboard=keyboard,
         blank=blank,
         user_dbm=user_dbm,
-        page=current_page,
+        session=session,
     )
 
 
@@ -695,7 +711,7 @@ async def proccess_confirm_selected_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     survey_dbm: Optional[SurveyDBM] = None,
     from_cq: bool = False
 ):
@@ -727,7 +743,8 @@ async def show_selected_survey_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
+    session: AsyncSession,
 ):
     survey_id = await MessageService.get_value_from_callback_data(
         callback_data=call_back_query.data,
@@ -738,6 +755,7 @@ async def show_selected_survey_cq(
         state=state,
         survey_id=survey_id,
         user_id=user_dbm.tg_id,
+        session=session,
     )
 
     survey_dbm = await ScheduleSurveyService.get_selected_survey(state)
@@ -759,7 +777,7 @@ async def show_selected_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
 ):
     survey_dbm = await ScheduleSurveyService.get_selected_survey(state)
 
@@ -778,14 +796,20 @@ async def proccess_handle_patient_selection(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True,
-    page: int = 0
+    session: Optional[AsyncSession] = None,
 ):
     message_from_cq = message if from_cq else None
 
     survey_dbm = await ScheduleSurveyService.get_selected_survey(state)
-    patient_dbms = await ScheduleSurveyService.get_connected_patients(user_dbm.tg_id)
+    search = await ScheduleSurveyService.get_select_patient_search(state)
+    patient_page = await ScheduleSurveyService.get_connected_patients(
+        user_id=user_dbm.tg_id,
+        search=search,
+        cursor=await ScheduleSurveyService.get_select_patient_cursor(state),
+        session=session,
+    )
 
     await MessageService.edith_managed_message(
             bot=message.bot,
@@ -793,11 +817,11 @@ async def proccess_handle_patient_selection(
             text=blank.get_patient_selection_template(
                 survey_dbm=survey_dbm,
                 user_id=user_dbm.tg_id,
-                has_patients=len(patient_dbms),
+                has_patients=bool(patient_page.items),
+                search=search,
             ),
             reply_markup=keyboard.get_patient_selection_keyboard(
-                patients_dbms=patient_dbms,
-                page=page,
+                patient_page=patient_page,
             ),
             state=state,
             previous_message_key="start_msg_id",
@@ -820,16 +844,22 @@ async def handle_patient_selection_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
+    session: AsyncSession,
 ):
-    current_page = await MessageService.get_value_from_callback_data(
+    cursor = KeysetCursor.parse(await MessageService.get_value_from_callback_data(
         callback_data=call_back_query.data,
-        default_value=0,
-    )
+        default_value=None,
+        type=str,
+    ))
+
+    # Переход к списку (а не листание) сбрасывает поиск
+    if cursor is None:
+        await ScheduleSurveyService.save_select_patient_search(state=state, search=None)
 
-    await ScheduleSurveyService.save_select_patient_current_page(
+    await ScheduleSurveyService.save_select_patient_cursor(
         state=state,
-        page=current_page,
+        cursor=cursor,
     )
 
     await proccess_handle_patient_selection(
@@ -838,7 +868,7 @@ async def handle_patient_selection_cq(
         keyboard=keyboard,
         blank=blank,
         user_dbm=user_dbm,
-        page=current_page,
+        session=session,
     )
 
 @router.message(ScheduleSurveyStates.waiting_select_patient)
@@ -847,9 +877,15 @@ async def handle_patient_selection(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
+    session: AsyncSession,
 ):
-    current_page = await ScheduleSurveyService.get_select_patient_current_page(state)
+    # Текст сообщения - начало ФИО пациента для поиска
+    await ScheduleSurveyService.save_select_patient_search(
+        state=state,
+        search=normalize_search_text(message.text),
+    )
+    await ScheduleSurveyService.save_select_patient_cursor(state=state, cursor=None)
 
     await proccess_handle_patient_selection(
         message=message,
@@ -857,8 +893,8 @@ async def handle_patient_selection(
         keyboard=keyboard,
         blank=blank,
         user_dbm=user_dbm,
-        page=current_page,
         from_cq=False,
+        session=session,
     )
 
 
@@ -867,7 +903,7 @@ async def proccess_show_selected_patient(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True,
 ):
     message_from_cq = message if from_cq else None
@@ -927,7 +963,8 @@ async def show_selected_patient_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
+    session: AsyncSession,
 ):
     patient_id = await MessageService.get_value_from_callback_data(
         callback_data=call_back_query.data,
@@ -936,6 +973,7 @@ async def show_selected_patient_cq(
     await ScheduleSurveyService.save_selected_patient(
         state=state,
         patient_id=patient_id,
+        session=session,
     )
 
     await proccess_show_selected_patient(
@@ -952,18 +990,17 @@ async def show_selected_patient(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
+    session: AsyncSession,
 ):
-    current_page = await ScheduleSurveyService.get_select_patient_current_page(state)
-
     await proccess_handle_patient_selection(
         message=message,
         state=state,
         keyboard=keyboard,
         blank=blank,
         user_dbm=user_dbm,
-        page=current_page,
         from_cq=False,
+        session=session,
     )
 
 
@@ -973,7 +1010,7 @@ async def proccess_show_schedule_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True,
 ):
     message_from_cq = message if from_cq else None
@@ -1006,7 +1043,7 @@ async def show_schedule_survey_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
 ):
     await proccess_show_schedule_survey(
         message=call_back_query.message,
@@ -1022,7 +1059,7 @@ async def show_schedule_survey(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
 ):
     await proccess_show_schedule_survey(
         message=message,
@@ -1039,13 +1076,15 @@ async def confirm_schedule_survey_cq(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
+    session: AsyncSession,
 ):
     await callback_query.answer("Опрос успешно был запланирован!")
 
     await ScheduleSurveyService.schedule_suvey(
         state=state, 
-        user_id=user_dbm.tg_id
+        user_id=user_dbm.tg_id,
+        session=session
     )
 
     await MessageService.edith_managed_message(
@@ -1068,99 +1107,65 @@ async def handle_get_survey_statistics(
     state: FSMContext,
     keyboard: type[DoctorKeyboard],
     blank: type[DoctorBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot,
+    session: AsyncSession
 ):
-    await callback_query.answer()
-    wb = Workbook()
-    
-    # Удаляем дефолтный лист
-    if 'Sheet' in wb.sheetnames:
-        del wb['Sheet']
-    
     # Получаем все опросы
-    surveys = await ScheduleSurveyService.get_all_surveys(user_dbm.tg_id)
-    
-    for survey in surveys:
-        # Создаем лист для каждого опроса
-        ws = wb.create_sheet(title=f"{survey.title[:25]}_{survey.id}")
-        
-        # Настройки форматирования
-        ws.row_dimensions[1].height = 25
-        alignment = Alignment(wrap_text=True, vertical='center', horizontal='left')
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-        border = Border(left=Side(style='thin'), 
-                      right=Side(style='thin'), 
-                      top=Side(style='thin'), 
-                      bottom=Side(style='thin'))
-        
-        # Получаем вопросы для этого опроса
-        question_dbms = await ScheduleSurveyService.get_questions_by_survey(
-            survey_id=survey.id
+    surveys = await ScheduleSurveyService.get_all_surveys(user_dbm.tg_id, session=session)
+    survey_ids = sorted(survey.id for survey in surveys)
+    export_format = get_cached_settings().bot.BOT_EXPORT_FORMAT
+    caption = f"Статистика по {len(surveys)} опросам"
+
+    # Отчет по тем же данным уже собирался - отправляем готовый
+    # Версия читается с реплики, как и отчет, а не в сессии апдейта
+    data_version = await ScheduleSurveyService.get_statistics_data_version(survey_ids)
+    job_key = ("survey_statistics", user_dbm.tg_id, tuple(survey_ids), data_version, export_format)
+    export_job_queue = get_cached_export_job_queue()
+
+    export_files = export_job_queue.get_result(job_key)
+    if export_files is not None:
+        await callback_query.answer()
+        await _send_export_files(callback_query.message, export_files, caption)
+        return
+
+    # Отчет собирается в фоне, повторное нажатие не создает новую задачу
+    export_job, is_created = export_job_queue.submit(
+        job_key, build_survey_statistics_report, survey_ids, export_format,
+    )
+    if not is_created:
+        await callback_query.answer("Отчет уже готовится")
+        return
+
+    await callback_query.answer()
+    progress_message = await callback_query.message.answer("Отчет готовится...")
+
+    async def on_progress(done: int, total: int):
+        try:
+            await progress_message.edit_text(f"Отчет готовится: {done} из {total} опросов")
+        except TelegramBadRequest:
+            pass
+
+    export_job.on_progress = on_progress
+    export_job_queue.spawn(_deliver_export(export_job, progress_message, caption))
+
+
+async def _send_export_files(message: Message, export_files: list[ExportFile], caption: str):
+    for export_file in export_files:
+        await message.answer_document(
+            document=BufferedInputFile(export_file.content, filename=export_file.filename),
+            caption=caption
         )
-        
-        # Формируем заголовки
-        headers = [
-            "Пользователь",
-            "Запланированная дата",
-            "Запланированное время",
-        ]
-
-        # Добавляем вопросы в порядке их ID
-        question_dbms_sorted = sorted(question_dbms, key=lambda x: x.id)
-        for question_dbm in question_dbms_sorted:
-            headers.append(f"Вопрос с ID: {question_dbm.id}")
-        
-        ws.append(headers)
-    
-        # Форматирование заголовков
-        for col_idx, cell in enumerate(ws[1], start=1):
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = alignment
-            cell.border = border
-            
-            # Автоматическое выравнивание ширины столбцов
-            column_letter = get_column_letter(col_idx)
-            ws.column_dimensions[column_letter].width = max(
-                len(str(cell.value)) + 2,  # +2 для отступов
-                10  # Минимальная ширина
-            )
-
-        response_for_all_time = await ScheduleSurveyService.get_survey_responses_for_all_time(survey.id)
-
-        for row_idx, row in enumerate(response_for_all_time, start=2):
-            user_id, curr_date, scheduled_time, answers = row
-            
-            # Создаем строку для Excel
-            excel_row = [user_id, curr_date, scheduled_time]
-            excel_row.extend(answers)
-            
-            # Добавляем строку в лист
-            ws.append(excel_row)
-            
-            # Форматирование ячеек данных
-            for col_idx, cell in enumerate(ws[row_idx], start=1):
-                cell.alignment = alignment
-                cell.border = border
-                
-                # Обновляем ширину столбца, если значение шире текущего
-                column_letter = get_column_letter(col_idx)
-                current_width = ws.column_dimensions[column_letter].width
-                value_length = len(str(cell.value)) + 2  # +2 для отступов
-                if value_length > current_width:
-                    ws.column_dimensions[column_letter].width = min(value_length, 50)  # Макс 50 символов
-    
-    # Сохраняем и отправляем файл
-    file_path = f'./survey_stats_{uuid.uuid4()}.xlsx'
-    wb.save(file_path)
-    
+
+
+async def _deliver_export(export_job: ExportJob, progress_message: Message, caption: str):
+    """Дождаться фоновой выгрузки и отправить результат вместо сообщения о прогрессе"""
     try:
-        stat_file = FSInputFile(file_path)
-        await callback_query.message.answer_document(
-            document=stat_file,
-            caption=f"Статистика по {len(surveys)} опросам"
-        )
-    finally:
-        if os.path.exists(file_path):
-            os.remove(file_path)
\ No newline at end of file
+        export_files = await export_job.future
+    except Exception:
+        # Ошибка с трассировкой исполнителя уже записана в лог ExportJobQueue
+        await progress_message.edit_text("Не удалось подготовить отчет, попробуйте позже")
+        return
+
+    export_job.on_progress = None
+    await progress_message.delete()
+    await _send_export_files(progress_message, export_files, caption)
\ No newline at end of file
@@ -1,5 +1,7 @@
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
+import pytz
 import sqlalchemy
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 from aiogram.fsm.context import FSMContext
@@ -7,7 +9,9 @@ from datetime import date, datetime, time, timedelta
 from typing import Tuple
 
 from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
-from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM, SurveyDBM, ScheduledSurveyDBM, SurveyQuestionDBM, QuestionDBM, SurveyResponseDBM, DoctorPatientDBM
+from shared.sqlalchemy_db_.keyset_pagination import KeysetCursor, KeysetPage, fetch_keyset_page
+from shared.sqlalchemy_db_.notify_channel import notify_scheduled_survey_changed
+from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM, SurveyDBM, ScheduledSurveyDBM, SurveyQuestionDBM, QuestionDBM, SurveyResponseDBM, DoctorPatientDBM, SurveyAdherenceStatsDBM
 from tg_bot.handlers.common.message_service import MessageService
 from tg_bot.handlers.doctor.survey_models import Question, ScheduledSurvey
 from tg_bot.utils.time_validator import TimeValidator
@@ -18,9 +22,9 @@ class ScheduleSurveyService:
     async def _get_or_create_survey(
         state: FSMContext,
     ) -> ScheduledSurvey:
-        survey: ScheduledSurvey = await MessageService.get_state_data(
+        survey = ScheduledSurvey.from_state(await MessageService.get_state_data(
             state=state, key=ScheduledSurvey._STATE_KEY_SURVEY_DATA,
-        )
+        ))
 
         if survey is None:
             survey = ScheduledSurvey()
@@ -35,7 +39,7 @@ class ScheduleSurveyService:
         await MessageService.set_state_data(
             state=state,
             key=ScheduledSurvey._STATE_KEY_SURVEY_DATA,
-            value=survey,
+            value=survey.to_state(),
         )
 
     @staticmethod
@@ -173,49 +177,80 @@ class ScheduleSurveyService:
     @staticmethod
     async def get_available_surveys(
         user_id: int,
-    ):
-        async with get_cached_sqlalchemy_db().new_async_session() as session:
-            survey_dbms = (await session.execute(
-                sqlalchemy
-                .select(SurveyDBM)
-                .where(SurveyDBM.created_by == user_id)
-                .where(SurveyDBM.is_active)
-            )).scalars().unique().all()
+        search: Optional[str] = None,
+        cursor: Optional[KeysetCursor] = None,
+        per_page: int = 5,
+        session: Optional[AsyncSession] = None,
+    ) -> KeysetPage[SurveyDBM]:
+        """Страница активных опросов врача (ix_surveys_active_created_by_id)
+
+        Args:
+            user_id: Telegram ID врача
+            search: Начало названия опроса (без учета регистра)
+            cursor: Курсор страницы из callback data; None - первая страница
+            per_page: Количество опросов на странице
+            session: Сессия апдейта; None - отдельная сессия
+        """
+        query = (
+            sqlalchemy
+            .select(SurveyDBM)
+            .where(SurveyDBM.created_by == user_id)
+            .where(SurveyDBM.is_active)
+        )
+        if search:
+            query = query.where(SurveyDBM.title.istartswith(search, autoescape=True))
 
-        return survey_dbms
+        async with get_cached_sqlalchemy_db().use_async_session(session) as session:
+            return await fetch_keyset_page(session, query, SurveyDBM.id, cursor, per_page)
 
     @staticmethod
-    async def save_select_survey_current_page(
+    async def save_select_survey_cursor(
         state: FSMContext,
-        page: int
+        cursor: Optional[KeysetCursor],
     ) -> None:
         await MessageService.set_state_data(
             state=state,
-            key=ScheduledSurvey._STATE_KEY_SELECT_SURVEY_CURRENT_PAGE,
-            value=page,
+            key=ScheduledSurvey._STATE_KEY_SELECT_SURVEY_CURSOR,
+            value=str(cursor) if cursor else None,
         )
     
     @staticmethod
-    async def get_select_survey_current_page(
+    async def get_select_survey_cursor(
         state: FSMContext,
-    ) -> Optional[int]:
-        current_page = await MessageService.get_state_data(
+    ) -> Optional[KeysetCursor]:
+        return KeysetCursor.parse(await MessageService.get_state_data(
             state=state,
-            key=ScheduledSurvey._STATE_KEY_SELECT_SURVEY_CURRENT_PAGE,
+            key=ScheduledSurvey._STATE_KEY_SELECT_SURVEY_CURSOR,
+        ))
+
+    @staticmethod
+    async def save_select_survey_search(
+        state: FSMContext,
+        search: Optional[str],
+    ) -> None:
+        await MessageService.set_state_data(
+            state=state,
+            key=ScheduledSurvey._STATE_KEY_SELECT_SURVEY_SEARCH,
+            value=search,
+        )
+
+    @staticmethod
+    async def get_select_survey_search(
+        state: FSMContext,
+    ) -> Optional[str]:
+        return await MessageService.get_state_data(
+            state=state,
+            key=ScheduledSurvey._STATE_KEY_SELECT_SURVEY_SEARCH,
         )
-        
-        if current_page is not None:
-            return current_page
-        
-        return None 
 
     @staticmethod
     async def save_selected_survey(
         state: FSMContext,
         survey_id: int,
         user_id: int,
+        session: Optional[AsyncSession] = None,
     ) -> None:
-        async with get_cached_sqlalchemy_db().new_async_session() as session:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as session:
             survey_dbm = (await session.execute(
                 sqlalchemy
                 .select(SurveyDBM)
@@ -241,54 +276,87 @@ class ScheduleSurveyService:
     @staticmethod
     async def get_connected_patients(
         user_id: int,
-    ) -> list[UserDBM]:
-        async with get_cached_sqlalchemy_db().new_async_session() as session:
-            patient_dbms = (await session.execute(
-                sqlalchemy
-                .select(UserDBM)
-                .where(UserDBM.role == UserDBM.Roles.patient)
-                .join(DoctorPatientDBM, sqlalchemy.and_(
-                    DoctorPatientDBM.doctor_id == user_id,
-                    DoctorPatientDBM.patient_id == UserDBM.tg_id
-                    )
+        search: Optional[str] = None,
+        cursor: Optional[KeysetCursor] = None,
+        per_page: int = 5,
+        session: Optional[AsyncSession] = None,
+    ) -> KeysetPage[UserDBM]:
+        """Страница прикрепленных к врачу пациентов
+
+        Пациенты упорядочены по Telegram ID, поэтому страница читается
+        по индексу uq_doctor_patient (doctor_id, patient_id).
+
+        Args:
+            user_id: Telegram ID врача
+            search: Начало ФИО пациента (без учета регистра)
+            cursor: Курсор страницы из callback data; None - первая страница
+            per_page: Количество пациентов на странице
+            session: Сессия апдейта; None - отдельная сессия
+        """
+        query = (
+            sqlalchemy
+            .select(UserDBM)
+            .where(UserDBM.role == UserDBM.Roles.patient)
+            .join(DoctorPatientDBM, sqlalchemy.and_(
+                DoctorPatientDBM.doctor_id == user_id,
+                DoctorPatientDBM.patient_id == UserDBM.tg_id
                 )
-                .order_by(UserDBM.id)
-            )).scalars().unique().all()
-        
-        return patient_dbms
+            )
+        )
+        if search:
+            query = query.where(UserDBM.full_name.istartswith(search, autoescape=True))
+
+        async with get_cached_sqlalchemy_db().use_async_session(session) as session:
+            return await fetch_keyset_page(session, query, DoctorPatientDBM.patient_id, cursor, per_page)
     
     @staticmethod
-    async def save_select_patient_current_page(
+    async def save_select_patient_cursor(
         state: FSMContext,
-        page: int
+        cursor: Optional[KeysetCursor],
     ) -> None:
         await MessageService.set_state_data(
             state=state,
-            key=ScheduledSurvey._STATE_KEY_SELECT_PATIENT_CURRENT_PAGE,
-            value=page,
+            key=ScheduledSurvey._STATE_KEY_SELECT_PATIENT_CURSOR,
+            value=str(cursor) if cursor else None,
         )
 
     @staticmethod
-    async def get_select_patient_current_page(
+    async def get_select_patient_cursor(
+        state: FSMContext,
+    ) -> Optional[KeysetCursor]:
+        return KeysetCursor.parse(await MessageService.get_state_data(
+            state=state,
+            key=ScheduledSurvey._STATE_KEY_SELECT_PATIENT_CURSOR,
+        ))
+
+    @staticmethod
+    async def save_select_patient_search(
         state: FSMContext,
-    ) -> Optional[int]:
-        current_page = await MessageService.get_state_data(
+        search: Optional[str],
+    ) -> None:
+        await MessageService.set_state_data(
             state=state,
-            key=ScheduledSurvey._STATE_KEY_SELECT_PATIENT_CURRENT_PAGE,
+            key=ScheduledSurvey._STATE_KEY_SELECT_PATIENT_SEARCH,
+            value=search,
+        )
+
+    @staticmethod
+    async def get_select_patient_search(
+        state: FSMContext,
+    ) -> Optional[str]:
+        return await MessageService.get_state_data(
+            state=state,
+            key=ScheduledSurvey._STATE_KEY_SELECT_PATIENT_SEARCH,
         )
-        
-        if current_page is not None:
-            return current_page
-        
-        return None 
 
 
     @staticmethod
     async def save_selected_patient(
         state: FSMContext,
-        patient_id: int
+        patient_id: int,
+        session: Optional[AsyncSession] = None,
     ) -> None:
-        async with get_cached_sqlalchemy_db().new_async_session() as session:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as session:
             user_dbm = (await session.execute(
                 sqlalchemy
                 .select(UserDBM)
@@ -312,11 +380,12 @@ class ScheduleSurveyService:
     @staticmethod
     async def save_selected_doctor(
         state: FSMContext,
-        user_id: int
+        user_id: int,
+        session: Optional[AsyncSession] = None,
     ):
         survey = await ScheduleSurveyService._get_or_create_survey(state)
 
-        async with get_cached_sqlalchemy_db().new_async_session() as session:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as session:
             user_dbm = (await session.execute(
                 sqlalchemy
                 .select(UserDBM)
@@ -332,17 +401,19 @@ class ScheduleSurveyService:
     async def schedule_suvey(
         state: FSMContext,
         user_id: int,
+        session: Optional[AsyncSession] = None,
     ):
         await ScheduleSurveyService.save_selected_doctor(
             state=state, 
-            user_id=user_id
+            user_id=user_id,
+            session=session,
         )
 
         survey_form = await ScheduleSurveyService._get_or_create_survey(state)
         
         survey = survey_form.get_survey()
 
-        async with get_cached_sqlalchemy_db().new_async_session() as session:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as session:
             schedule_survey = ScheduledSurveyDBM(
                 survey_id=survey.survey_dbm.id,
                 patient_id=survey.patient_dbm.tg_id,
@@ -358,7 +429,10 @@ class ScheduleSurveyService:
             )
 
             session.add(schedule_survey)
-            await session.commit()
+            await session.flush()
+
+            # Планировщик подхватит расписание сразу, не дожидаясь опроса БД
+            await notify_scheduled_survey_changed(session, schedule_survey.id)
 
         await ScheduleSurveyService.clear_schedule_data(
             state=state,
@@ -367,9 +441,10 @@ class ScheduleSurveyService:
     
     @staticmethod
     async def get_all_surveys(
-        user_tg_id: int
+        user_tg_id: int,
+        session: Optional[AsyncSession] = None,
     ) -> list[SurveyDBM]:
-        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as async_session:
             surveys_dbms = (await async_session.execute(
                 sqlalchemy
                 .select(SurveyDBM)
@@ -382,9 +457,10 @@ class ScheduleSurveyService:
 
     @staticmethod
     async def get_questions_by_survey(
-        survey_id: int
+        survey_id: int,
+        session: Optional[AsyncSession] = None,
     ) -> list[QuestionDBM]:
-        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as async_session:
             survey_question_dbms = (await async_session.execute(
                 sqlalchemy
                 .select(SurveyQuestionDBM)
@@ -398,98 +474,225 @@ class ScheduleSurveyService:
         
 
     @staticmethod
-    async def _get_statistic_by_params(
+    def build_survey_statistics_query(
         survey_id: int,
-        scheduled_date: date,
-        scdeduled_time: time,
-        user_id: int,
-        async_session: AsyncSession
-    ) -> list[str]:
-        responses = (await async_session.execute(
-            sqlalchemy
-            .select(SurveyResponseDBM)
-            .options(
-                joinedload(SurveyResponseDBM.scheduled_survey)
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        patient_ids: Optional[list[int]] = None,
+    ) -> sqlalchemy.Select:
+        """Запрос матрицы ответов: по строке на (пациент, день, время прохождения).
+
+        Args:
+            survey_id: ID опроса
+            date_from: Первый день выборки (UTC), включительно
+            date_to: Последний день выборки (UTC), включительно
+            patient_ids: ID пациентов в Telegram (None - все пациенты)
+
+        Returns:
+            sqlalchemy.Select: Запрос, строки которого разбирает statistics_row
+        """
+        response_date = sqlalchemy.func.date(
+            sqlalchemy.func.timezone('UTC', SurveyResponseDBM.creation_dt)
+        ).label('response_date')
+
+        query = (
+            sqlalchemy.select(
+                SurveyResponseDBM.patient_id,
+                response_date,
+                SurveyResponseDBM.scheduled_time,
+                sqlalchemy.func.array_agg(
+                    aggregate_order_by(SurveyResponseDBM.question_id, SurveyResponseDBM.id)
+                ).label('question_ids'),
+                sqlalchemy.func.array_agg(
+                    aggregate_order_by(SurveyResponseDBM.answer, SurveyResponseDBM.id)
+                ).label('answers'),
             )
-            .where(sqlalchemy.func.date(SurveyResponseDBM.creation_dt) == scheduled_date)
+            .join(ScheduledSurveyDBM, SurveyResponseDBM.scheduled_survey_id == ScheduledSurveyDBM.id)
             .where(ScheduledSurveyDBM.survey_id == survey_id)
-            .where(SurveyResponseDBM.scheduled_time == scdeduled_time)
-            .where(SurveyResponseDBM.patient_id == user_id)
-        )).scalars().unique().all()
-        
+            .where(SurveyResponseDBM.creation_dt.is_not(None))
+            .group_by(SurveyResponseDBM.patient_id, response_date, SurveyResponseDBM.scheduled_time)
+            .order_by(response_date, SurveyResponseDBM.scheduled_time, SurveyResponseDBM.patient_id)
+        )
+        # Диапазон по creation_dt, а не по дате, чтобы использовался индекс
+        if date_from is not None:
+            query = query.where(
+                SurveyResponseDBM.creation_dt >= datetime.combine(date_from, time.min, tzinfo=pytz.UTC)
+            )
+        if date_to is not None:
+            query = query.where(
+                SurveyResponseDBM.creation_dt < datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=pytz.UTC)
+            )
+        if patient_ids is not None:
+            query = query.where(SurveyResponseDBM.patient_id.in_(patient_ids))
 
-        response_answers = [
-            response.answer for response in responses
-            if response.scheduled_survey.survey_id == survey_id
-        ]
+        return query
 
-        return response_answers
-    
     @staticmethod
-    async def get_survey_responses_for_all_time(
-        survey_id: int
-    ):
-        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
-            # Получаем все уникальные даты, когда были ответы для данного survey_id
-            dates_result = await async_session.execute(
-                sqlalchemy.select(
-                    sqlalchemy.func.date(SurveyResponseDBM.creation_dt).label('response_date')
-                )
-                .join(ScheduledSurveyDBM, SurveyResponseDBM.scheduled_survey_id == ScheduledSurveyDBM.id)
-                .where(ScheduledSurveyDBM.survey_id == survey_id)
-                .where(SurveyResponseDBM.creation_dt.is_not(None))
-                .distinct()
+    def statistics_row(
+        row: sqlalchemy.Row,
+        question_ids: list[int],
+    ) -> Tuple[int, date, time, list[Optional[str]]]:
+        """Раскладывает строку build_survey_statistics_query по столбцам вопросов"""
+        # При повторных ответах на вопрос берется последний
+        answers = dict(zip(row.question_ids, row.answers))
+        adjusted_time = (datetime.combine(row.response_date, row.scheduled_time) + timedelta(hours=5)).time()
+        return (
+            row.patient_id,
+            row.response_date,
+            adjusted_time,
+            [answers.get(question_id) for question_id in question_ids],
+        )
+
+    @staticmethod
+    async def iter_survey_statistics(
+        survey_id: int,
+        question_ids: list[int],
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        patient_ids: Optional[list[int]] = None,
+        yield_per: int = 1000,
+    ) -> AsyncIterator[Tuple[int, date, time, list[Optional[str]]]]:
+        """Матрица ответов по опросу одним запросом.
+
+        Ответы группируются по (пациент, день, время прохождения) на стороне БД,
+        каждая строка раскладывается по столбцам вопросов. Строки читаются
+        через серверный курсор пачками по yield_per, поэтому выгрузка
+        не держит в памяти всю матрицу.
+
+        Args:
+            survey_id: ID опроса
+            question_ids: ID вопросов в порядке столбцов
+            date_from: Первый день выборки (UTC), включительно
+            date_to: Последний день выборки (UTC), включительно
+            patient_ids: ID пациентов в Telegram (None - все пациенты)
+            yield_per: Размер пачки строк, читаемой из курсора
+
+        Yields:
+            Tuple[int, date, time, list[Optional[str]]]: Строки
+                (пациент, день, время прохождения, ответы по вопросам)
+        """
+        query = ScheduleSurveyService.build_survey_statistics_query(
+            survey_id=survey_id,
+            date_from=date_from,
+            date_to=date_to,
+            patient_ids=patient_ids,
+        )
+
+        async with get_cached_sqlalchemy_db().new_async_session(readonly=True) as async_session:
+            rows = await async_session.stream(query.execution_options(yield_per=yield_per))
+            async for row in rows:
+                yield ScheduleSurveyService.statistics_row(row, question_ids)
+
+    @staticmethod
+    async def get_statistics_data_version(
+        survey_ids: list[int],
+        session: Optional[AsyncSession] = None,
+    ) -> Tuple[int, int, int, int, int, int]:
+        """Версия данных статистики по набору опросов.
+
+        Меняется при добавлении или удалении ответов и вопросов опросов и
+        при смене статусов напоминаний, поэтому подходит как часть ключа кэша
+        готовых отчетов. Без сессии читается с реплики, как и сам отчет:
+        версия не опережает данные отчета.
+
+        Returns:
+            Tuple[int, int, int, int, int, int]: (число ответов, max ID ответа,
+                число вопросов, max ID связи опрос-вопрос,
+                напоминаний без ответа, пропущенных напоминаний)
+        """
+        responses = (
+            sqlalchemy.select(
+                sqlalchemy.func.count(SurveyResponseDBM.id),
+                sqlalchemy.func.coalesce(sqlalchemy.func.max(SurveyResponseDBM.id), 0),
             )
-            
-            dates = [row.response_date for row in dates_result]
-            
-            responses_for_all_time = []
-
-            for curr_date in dates:
-                # Получаем все ответы для текущей даты и survey_id
-                responses_result = await async_session.execute(
-                    sqlalchemy.select(SurveyResponseDBM)
-                    .join(ScheduledSurveyDBM, SurveyResponseDBM.scheduled_survey_id == ScheduledSurveyDBM.id)
-                    .options(
-                        joinedload(SurveyResponseDBM.scheduled_survey),
-                        joinedload(SurveyResponseDBM.patient)  # Добавляем загрузку пользователя
-                    )
-                    .where(sqlalchemy.func.date(SurveyResponseDBM.creation_dt) == curr_date)
-                    .where(ScheduledSurveyDBM.survey_id == survey_id)
+            .join(ScheduledSurveyDBM, SurveyResponseDBM.scheduled_survey_id == ScheduledSurveyDBM.id)
+            .where(ScheduledSurveyDBM.survey_id.in_(survey_ids))
+            .subquery()
+        )
+        questions = (
+            sqlalchemy.select(
+                sqlalchemy.func.count(SurveyQuestionDBM.id),
+                sqlalchemy.func.coalesce(sqlalchemy.func.max(SurveyQuestionDBM.id), 0),
+            )
+            .where(SurveyQuestionDBM.survey_id.in_(survey_ids))
+            .subquery()
+        )
+        # Пройденные напоминания уже учтены ответами
+        adherence = (
+            sqlalchemy.select(
+                sqlalchemy.func.coalesce(sqlalchemy.func.sum(SurveyAdherenceStatsDBM.sent_count), 0),
+                sqlalchemy.func.coalesce(sqlalchemy.func.sum(SurveyAdherenceStatsDBM.failed_count), 0),
+            )
+            .join(ScheduledSurveyDBM, SurveyAdherenceStatsDBM.scheduled_survey_id == ScheduledSurveyDBM.id)
+            .where(ScheduledSurveyDBM.survey_id.in_(survey_ids))
+            .subquery()
+        )
+
+        async with get_cached_sqlalchemy_db().use_async_session(session, readonly=True) as async_session:
+            version = (await async_session.execute(
+                # Все подзапросы возвращают ровно одну строку
+                sqlalchemy.select(responses, questions, adherence)
+                .select_from(
+                    responses
+                    .join(questions, sqlalchemy.true())
+                    .join(adherence, sqlalchemy.true())
                 )
+            )).one()
+
+        return tuple(version)
+
+    @staticmethod
+    async def get_survey_statistics(
+        survey_id: int,
+        question_ids: list[int],
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        patient_ids: Optional[list[int]] = None,
+    ) -> list[Tuple[int, date, time, list[Optional[str]]]]:
+        """Матрица ответов по опросу списком (см. iter_survey_statistics)."""
+        return [
+            row async for row in ScheduleSurveyService.iter_survey_statistics(
+                survey_id=survey_id,
+                question_ids=question_ids,
+                date_from=date_from,
+                date_to=date_to,
+                patient_ids=patient_ids,
+            )
+        ]
+
+    @staticmethod
+    def build_patient_adherence_query(
+        survey_ids: list[int],
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> sqlalchemy.Select:
+        """Запрос выполнения опросов пациентами из агрегатов survey_adherence_stats.
+
+        Args:
+            survey_ids: ID опросов
+            date_from: Первый день выборки (UTC), включительно
+            date_to: Последний день выборки (UTC), включительно
+
+        Returns:
+            sqlalchemy.Select: Запрос строк (ID опроса, ID пациента в Telegram,
+                отправлено без ответа, пройдено, пропущено)
+        """
+        query = (
+            sqlalchemy.select(
+                ScheduledSurveyDBM.survey_id,
+                ScheduledSurveyDBM.patient_id,
+                sqlalchemy.func.sum(SurveyAdherenceStatsDBM.sent_count),
+                sqlalchemy.func.sum(SurveyAdherenceStatsDBM.completed_count),
+                sqlalchemy.func.sum(SurveyAdherenceStatsDBM.failed_count),
+            )
+            .join(ScheduledSurveyDBM, SurveyAdherenceStatsDBM.scheduled_survey_id == ScheduledSurveyDBM.id)
+            .where(ScheduledSurveyDBM.survey_id.in_(survey_ids))
+            .group_by(ScheduledSurveyDBM.survey_id, ScheduledSurveyDBM.patient_id)
+            .order_by(ScheduledSurveyDBM.survey_id, ScheduledSurveyDBM.patient_id)
+        )
+        if date_from is not None:
+            query = query.where(SurveyAdherenceStatsDBM.stat_date >= date_from)
+        if date_to is not None:
+            query = query.where(SurveyAdherenceStatsDBM.stat_date <= date_to)
 
-                responses = responses_result.scalars().unique().all()
-                
-                # Получаем уникальные запланированные времена для текущего дня
-                scheduled_times = list({
-                    response.scheduled_time for response in responses 
-                    if response.scheduled_time is not None
-                })
-                
-                # Словарь для хранения данных по текущей дате
-                date_data = {}
-                
-                for scheduled_time in scheduled_times:
-                    # Получаем уникальных пользователей для данного времени
-                    users = list({
-                        response.patient_id for response in responses
-                        if response.scheduled_time == scheduled_time
-                    })
-                    
-                    time_data = {}
-                    
-                    for user_id in users:
-                        user_reponces = await ScheduleSurveyService._get_statistic_by_params(
-                            survey_id=survey_id,
-                            scheduled_date=curr_date,
-                            scdeduled_time=scheduled_time,
-                            user_id=user_id,
-                            async_session=async_session,
-                        )
-
-                        adjusted_time = (datetime.combine(curr_date, scheduled_time) + timedelta(hours=5)).time()
-
-                        responses_for_all_time.append((user_id, curr_date, adjusted_time, user_reponces))
-                    date_data[scheduled_time] = time_data
-                
-            return responses_for_all_time
\ No newline at end of file
+        return query
@@ -1,11 +1,12 @@
 from datetime import date, datetime, time
-from typing import List, Dict, Optional
-from dataclasses import dataclass, field
+from typing import Any, List, Dict, Optional
+from dataclasses import asdict, dataclass, field
 from uuid import uuid4
 
 from shared.sqlalchemy_db_.sqlalchemy_model import ScheduledSurveyDBM, SurveyDBM, UserDBM
+from tg_bot.utils.user_cache import UserSnapshot
 
-@dataclass
+@dataclass(slots=True)
 class Question:
     id: str = field(default_factory=lambda: str(uuid4()))
     text: Optional[str] = None
@@ -14,7 +15,18 @@ class Question:
     is_from_template: bool = False
     template_question_id: Optional[int] = None
 
+    def to_state(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_state(cls, data: Dict[str, Any]) -> "Question":
+        return cls(**data)
+
 class CreatedSurvey:
+    """Создаваемый врачом опрос, хранящийся в состоянии FSM"""
+    __slots__ = ("questions", "current_question_id", "title")
+
+    _STATE_VERSION = 1
     _STATE_KEY_SURVEY_DATA = "create_survey"
     _STATE_KEY_EDIT_QUESTION_ID = "create_survey_edit_question_id"
     _STATE_KEY_SURVEY_NOT_CONFIRMED_TITLE = "create_survey_not_confirmed_title"
@@ -95,7 +107,12 @@ class CreatedSurvey:
         if q.is_from_template:
             return not(q.template_question_id is None)
         else:
-            return isinstance(q.text, str) and (isinstance(q.options, list) and 1 < len(q.options) < 11)
+            return isinstance(q.text, str) and CreatedSurvey.is_valid_options(q.options)
+
+    @staticmethod
+    def is_valid_options(options: Optional[List[str]]) -> bool:
+        """Проверяет варианты ответов вопроса типа 'choice' (от 2 до 10)"""
+        return isinstance(options, list) and 1 < len(options) < 11
 
     def get_active_questions(self) -> List[Question]:
         """Возвращает список активных вопросов в порядке добавления"""
@@ -115,13 +132,61 @@ class CreatedSurvey:
     def count_valid_questions(self) -> int:
         return len(self.get_active_questions())
 
+    def to_state(self) -> Dict[str, Any]:
+        """Сериализация в данные FSM"""
+        return {
+            "v": self._STATE_VERSION,
+            "title": self.title,
+            "current_question_id": self.current_question_id,
+            "questions": [question.to_state() for question in self.questions.values()],
+        }
+
+    @classmethod
+    def from_state(cls, data: Any) -> Optional["CreatedSurvey"]:
+        """Десериализация из данных FSM (None для данных другой версии)"""
+        if not isinstance(data, dict) or data.get("v") != cls._STATE_VERSION:
+            return None
+
+        survey = cls()
+        survey.title = data["title"]
+        survey.current_question_id = data["current_question_id"]
+        for question_data in data["questions"]:
+            question = Question.from_state(question_data)
+            survey.questions[question.id] = question
+        return survey
+
+
+@dataclass(frozen=True, slots=True)
+class SurveySnapshot:
+    """Снимок опроса, достаточный для бланков планирования"""
+    id: int
+    title: str
+    description: Optional[str]
+    is_active: bool
+
+    @classmethod
+    def from_dbm(cls, survey_dbm: SurveyDBM) -> "SurveySnapshot":
+        return cls(
+            id=survey_dbm.id,
+            title=survey_dbm.title,
+            description=survey_dbm.description,
+            is_active=survey_dbm.is_active,
+        )
 
-@dataclass
+    def to_state(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_state(cls, data: Dict[str, Any]) -> "SurveySnapshot":
+        return cls(**data)
+
+
+@dataclass(slots=True)
 class Survey:
-    survey_dbm: Optional[SurveyDBM] = None
-    patient_dbm: Optional[UserDBM] = None
-    doctor_dbm: Optional[UserDBM] = None
-    frequency_type: Optional[str] = None 
+    survey_dbm: Optional[SurveySnapshot] = None
+    patient_dbm: Optional[UserSnapshot] = None
+    doctor_dbm: Optional[UserSnapshot] = None
+    frequency_type: Optional[ScheduledSurveyDBM.FrequencyType] = None 
     times_per_day: Optional[int] = None
     interval_days: Optional[int] = None
     start_date: Optional[date] = None
@@ -130,14 +195,63 @@ class Survey:
     max_reminders: int = 3
     reminder_interval_hours: int = 2
 
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "survey": self.survey_dbm.to_state() if self.survey_dbm else None,
+            "patient": self.patient_dbm.to_state() if self.patient_dbm else None,
+            "doctor": self.doctor_dbm.to_state() if self.doctor_dbm else None,
+            "frequency_type": self.frequency_type.value if self.frequency_type else None,
+            "times_per_day": self.times_per_day,
+            "interval_days": self.interval_days,
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "schedule_times": (
+                [t.isoformat() for t in self.schedule_times]
+                if self.schedule_times is not None else None
+            ),
+            "max_reminders": self.max_reminders,
+            "reminder_interval_hours": self.reminder_interval_hours,
+        }
+
+    @classmethod
+    def from_state(cls, data: Dict[str, Any]) -> "Survey":
+        return cls(
+            survey_dbm=SurveySnapshot.from_state(data["survey"]) if data["survey"] else None,
+            patient_dbm=UserSnapshot.from_state(data["patient"]) if data["patient"] else None,
+            doctor_dbm=UserSnapshot.from_state(data["doctor"]) if data["doctor"] else None,
+            # Бланки сравнивают тип через is, поэтому восстанавливаем элемент перечисления
+            frequency_type=(
+                ScheduledSurveyDBM.FrequencyType(data["frequency_type"])
+                if data["frequency_type"] else None
+            ),
+            times_per_day=data["times_per_day"],
+            interval_days=data["interval_days"],
+            start_date=date.fromisoformat(data["start_date"]) if data["start_date"] else None,
+            end_date=date.fromisoformat(data["end_date"]) if data["end_date"] else None,
+            schedule_times=(
+                [time.fromisoformat(t) for t in data["schedule_times"]]
+                if data["schedule_times"] is not None else None
+            ),
+            max_reminders=data["max_reminders"],
+            reminder_interval_hours=data["reminder_interval_hours"],
+        )
+
 class ScheduledSurvey:
+    """Планируемое врачом прохождение опроса, хранящееся в состоянии FSM"""
+    __slots__ = ("survey",)
+
+    _STATE_VERSION = 1
     _STATE_KEY_SURVEY_DATA = "schedule_survey"
-    _STATE_KEY_SELECT_SURVEY_CURRENT_PAGE = "select_survey_current_page"
-    _STATE_KEY_SELECT_PATIENT_CURRENT_PAGE = "select_patient_current_page"
+    _STATE_KEY_SELECT_SURVEY_CURSOR = "select_survey_cursor"
+    _STATE_KEY_SELECT_SURVEY_SEARCH = "select_survey_search"
+    _STATE_KEY_SELECT_PATIENT_CURSOR = "select_patient_cursor"
+    _STATE_KEY_SELECT_PATIENT_SEARCH = "select_patient_search"
     _STATE_KEYS = [
         _STATE_KEY_SURVEY_DATA,
-        _STATE_KEY_SELECT_SURVEY_CURRENT_PAGE,
-        _STATE_KEY_SELECT_PATIENT_CURRENT_PAGE,
+        _STATE_KEY_SELECT_SURVEY_CURSOR,
+        _STATE_KEY_SELECT_SURVEY_SEARCH,
+        _STATE_KEY_SELECT_PATIENT_CURSOR,
+        _STATE_KEY_SELECT_PATIENT_SEARCH,
     ]
 
     def __init__(self):
@@ -163,22 +277,36 @@ class ScheduledSurvey:
         self.survey.end_date = end_date
 
     def save_selected_survey(self, survey_dbm: SurveyDBM):
-        self.survey.survey_dbm = survey_dbm
+        self.survey.survey_dbm = SurveySnapshot.from_dbm(survey_dbm)
 
     def get_selected_survey(self):
         return self.survey.survey_dbm
     
-    def save_selected_patient(self, user_dbm: UserDBM):
-        self.survey.patient_dbm = user_dbm
+    def save_selected_patient(self, user_dbm: Optional[UserDBM]):
+        self.survey.patient_dbm = UserSnapshot.from_dbm(user_dbm) if user_dbm else None
 
     def get_selected_patient(self):
         return self.survey.patient_dbm
 
     def save_selected_doctor(self, user_dbm: UserDBM):
-        self.survey.doctor_dbm = user_dbm
+        self.survey.doctor_dbm = UserSnapshot.from_dbm(user_dbm)
 
     def get_selected_doctor(self):
         return self.survey.doctor_dbm
 
     def get_survey(self):
-        return self.survey
\ No newline at end of file
+        return self.survey
+
+    def to_state(self) -> Dict[str, Any]:
+        """Сериализация в данные FSM"""
+        return {"v": self._STATE_VERSION, "survey": self.survey.to_state()}
+
+    @classmethod
+    def from_state(cls, data: Any) -> Optional["ScheduledSurvey"]:
+        """Десериализация из данных FSM (None для данных другой версии)"""
+        if not isinstance(data, dict) or data.get("v") != cls._STATE_VERSION:
+            return None
+
+        scheduled_survey = cls()
+        scheduled_survey.survey = Survey.from_state(data["survey"])
+        return scheduled_survey
\ No newline at end of file
@@ -1,15 +1,19 @@
+from typing import Optional
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM
+from shared.sqlalchemy_db_.keyset_pagination import KeysetCursor
 from tg_bot.keyboards import PatientAction
 from tg_bot.handlers.common.message_service import MessageService
 from tg_bot.handlers.patient.patient_service import PatientService
 from tg_bot.keyboards import PatientKeyboard
 from tg_bot.blanks import PatientBlank
 from tg_bot.states.patient import ConnectToDoctorStates
+from tg_bot.utils.common import normalize_search_text
+from tg_bot.utils.user_cache import UserSnapshot
 
 router = Router()
 
@@ -19,19 +23,24 @@ async def proccess_connect_to_doctor(
     state: FSMContext,
     keyboard: type[PatientKeyboard],
     blank: type[PatientBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True,
+    session: Optional[AsyncSession] = None,
 ):
     message_from_cq = message if from_cq else None
 
-    available_doctors = await PatientService.get_available_doctors()
-    page = await PatientService.get_connect_to_doctor_current_page(state)
+    search = await PatientService.get_connect_to_doctor_search(state)
+    doctor_page = await PatientService.get_available_doctors(
+        search=search,
+        cursor=await PatientService.get_connect_to_doctor_cursor(state),
+        session=session,
+    )
 
     await MessageService.edith_managed_message(
         bot=message.bot,
         user_id=user_dbm.tg_id,
-        text=blank.get_doctor_selection_blank(),
-        reply_markup=keyboard.get_doctor_selection_keyboard(doctors=available_doctors, page=page),
+        text=blank.get_doctor_selection_blank(has_doctors=bool(doctor_page.items), search=search),
+        reply_markup=keyboard.get_doctor_selection_keyboard(doctor_page=doctor_page),
         state=state,
         previous_message_key="start_msg_id",
         new_state=ConnectToDoctorStates.waiting_select_doctor,
@@ -53,15 +62,24 @@ async def connect_to_doctor_selection(
     state: FSMContext,
     keyboard: type[PatientKeyboard],
     blank: type[PatientBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot,
+    session: AsyncSession
 ):
+    # Текст сообщения - начало ФИО доктора для поиска
+    await PatientService.save_connect_to_doctor_search(
+        state=state,
+        search=normalize_search_text(message.text),
+    )
+    await PatientService.save_connect_to_doctor_cursor(state=state, cursor=None)
+
     await proccess_connect_to_doctor(
         message=message,
         state=state,
         keyboard=keyboard,
         blank=blank,
         user_dbm=user_dbm,
-        from_cq=False
+        from_cq=False,
+        session=session
     )
 
 
@@ -71,13 +89,20 @@ async def connect_to_doctor_selection_cq(
     state: FSMContext,
     keyboard: type[PatientKeyboard],
     blank: type[PatientBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot,
+    session: AsyncSession
 ):
-    page = await MessageService.get_value_from_callback_data(callback_query.data)
+    cursor = KeysetCursor.parse(await MessageService.get_value_from_callback_data(
+        callback_query.data, default_value=None, type=str
+    ))
+
+    # Переход к списку (а не листание) сбрасывает поиск
+    if cursor is None:
+        await PatientService.save_connect_to_doctor_search(state=state, search=None)
 
-    await PatientService.save_connect_to_doctor_current_page(
+    await PatientService.save_connect_to_doctor_cursor(
         state=state, 
-        page=page
+        cursor=cursor
     )
 
     await proccess_connect_to_doctor(
@@ -86,6 +111,7 @@ async def connect_to_doctor_selection_cq(
         keyboard=keyboard,
         blank=blank,
         user_dbm=user_dbm,
+        session=session,
     )
 
 
@@ -94,13 +120,14 @@ async def proccess_select_doctor(
     state: FSMContext,
     keyboard: type[PatientKeyboard],
     blank: type[PatientBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True,
+    session: Optional[AsyncSession] = None,
 ):
     message_from_cq = message if from_cq else None
 
     selected_doctor_id = await PatientService.get_selected_from_state(state=state)
-    doctor_dbm = await PatientService.get_selected_doctor(selected_doctor_id)
+    doctor_dbm = await PatientService.get_selected_doctor(selected_doctor_id, session=session)
 
     await MessageService.edith_managed_message(
         bot=message.bot,
@@ -127,7 +154,8 @@ async def handle_confirm_selected_doctor(
     state: FSMContext,
     keyboard: type[PatientKeyboard],
     blank: type[PatientBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot,
+    session: AsyncSession
 ):
     await proccess_select_doctor(
         message=message,
@@ -135,7 +163,8 @@ async def handle_confirm_selected_doctor(
         keyboard=keyboard,
         blank=blank,
         user_dbm=user_dbm,
-        from_cq=False
+        from_cq=False,
+        session=session
     )
 
 @router.callback_query(F.data.startswith(PatientAction.SELECT_DOCTOR))
@@ -144,7 +173,8 @@ async def handle_confirm_selected_doctor_cq(
     state: FSMContext,
     keyboard: type[PatientKeyboard],
     blank: type[PatientBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot,
+    session: AsyncSession
 ):
     selected_doctor_id = await MessageService.get_value_from_callback_data(callback_query.data)
     
@@ -159,6 +189,7 @@ async def handle_confirm_selected_doctor_cq(
         keyboard=keyboard,
         blank=blank,
         user_dbm=user_dbm,
+        session=session,
     )
 
 
@@ -168,16 +199,18 @@ async def handle_select_doctor(
     state: FSMContext,
     keyboard: type[PatientKeyboard],
     blank: type[PatientBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot,
+    session: AsyncSession
 ):
     selected_doctor_id = await MessageService.get_value_from_callback_data(callback_query.data)
 
-    if await PatientService.is_patient_has_connected(callback_query.from_user.id):
+    if await PatientService.is_patient_has_connected(callback_query.from_user.id, session=session):
         await callback_query.answer(f"Вы уже закреплены к доктору!")
     else:
         await PatientService.connect_patient_to_doctor(
             user_id=callback_query.from_user.id,
-            doctor_id=selected_doctor_id
+            doctor_id=selected_doctor_id,
+            session=session
         )
         await callback_query.answer(f"Связь с {selected_doctor_id} создана!")
 
@@ -197,7 +230,7 @@ async def handle_cancel_connect_to_doctor(
     state: FSMContext,
     keyboard: type[PatientKeyboard],
     blank: type[PatientBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ) -> None:
     """
     Обработка начального сообщения от пользователя
@@ -1,10 +1,17 @@
-from datetime import date
+from datetime import datetime
 from typing import Any, Optional
+import pytz
 import sqlalchemy
 from aiogram.fsm.context import FSMContext
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
-from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM, DoctorPatientDBM, SurveyReminderDBM, SurveyResponseDBM
+from shared.sqlalchemy_db_.daily_stats import insert_survey_responses, update_reminders_status
+from shared.sqlalchemy_db_.keyset_pagination import KeysetCursor, KeysetPage, fetch_keyset_page
+from shared.sqlalchemy_db_.notify_channel import notify_scheduled_survey_changed
+from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM, DoctorPatientDBM, SurveyReminderDBM
 from tg_bot.handlers.common.message_service import MessageService
 from tg_bot.handlers.patient.patient_survey_models import PatientSurvey
 
@@ -12,22 +19,36 @@ from tg_bot.handlers.patient.patient_survey_models import PatientSurvey
 class PatientService:
     """Класс для обработки операций, связанных с пациентами"""
     @staticmethod
-    async def get_available_doctors() -> list[UserDBM]:
-        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
-            result = await async_session.execute(
-                sqlalchemy
-                .select(UserDBM)
-                .where(UserDBM.role == UserDBM.Roles.doctor)
-                .where(UserDBM.is_active).order_by(UserDBM.id)
-            )
-            doctors = result.scalars().unique() 
+    async def get_available_doctors(
+        search: Optional[str] = None,
+        cursor: Optional[KeysetCursor] = None,
+        per_page: int = 5,
+        session: Optional[AsyncSession] = None,
+    ) -> KeysetPage[UserDBM]:
+        """Страница активных докторов (ix_user_active_role_id)
 
-        return doctors.all()
+        Args:
+            search: Начало ФИО доктора (без учета регистра)
+            cursor: Курсор страницы из callback data; None - первая страница
+            per_page: Количество докторов на странице
+            session: Сессия апдейта; None - отдельная сессия
+        """
+        query = (
+            sqlalchemy
+            .select(UserDBM)
+            .where(UserDBM.role == UserDBM.Roles.doctor)
+            .where(UserDBM.is_active)
+        )
+        if search:
+            query = query.where(UserDBM.full_name.istartswith(search, autoescape=True))
+
+        async with get_cached_sqlalchemy_db().use_async_session(session) as async_session:
+            return await fetch_keyset_page(async_session, query, UserDBM.id, cursor, per_page)
 
 
     @staticmethod
-    async def get_patient_doctors(user_id: int) -> list[UserDBM]:
-        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+    async def get_patient_doctors(user_id: int, session: Optional[AsyncSession] = None) -> list[UserDBM]:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as async_session:
             result = await async_session.execute(
                 sqlalchemy
                 .select(UserDBM)
@@ -40,9 +61,9 @@ class PatientService:
 
     @staticmethod
     async def connect_patient_to_doctor(
-        user_id: int, doctor_id: int
+        user_id: int, doctor_id: int, session: Optional[AsyncSession] = None
     ) -> None:
-        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as async_session:
             doctor_dbm = (await async_session.execute(
                 sqlalchemy
                 .select(UserDBM)
@@ -64,18 +85,17 @@ class PatientService:
                 patient=patient_dbm
             )
             async_session.add(patient_doctor_relation_dbm)
-            await async_session.commit()
-            await async_session.refresh(patient_doctor_relation_dbm)
+            await async_session.flush()
 
 
     @staticmethod
-    async def is_patient_has_connected(user_id: int) -> bool:
-        return len(await PatientService.get_patient_doctors(user_id))
+    async def is_patient_has_connected(user_id: int, session: Optional[AsyncSession] = None) -> bool:
+        return len(await PatientService.get_patient_doctors(user_id, session))
 
 
     @staticmethod
-    async def get_selected_doctor(doctor_id: int) -> UserDBM:
-        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+    async def get_selected_doctor(doctor_id: int, session: Optional[AsyncSession] = None) -> UserDBM:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as async_session:
             doctor_dbm = (await async_session.execute(
                 sqlalchemy
                 .select(UserDBM)
@@ -87,21 +107,39 @@ class PatientService:
     
 
     @staticmethod
-    async def save_connect_to_doctor_current_page(
+    async def save_connect_to_doctor_cursor(
         state: FSMContext,
-        page: int
+        cursor: Optional[KeysetCursor],
     ):
         await MessageService.set_state_data(
             state=state,
-            key="connect_to_doctor_page",
-            value=page,
+            key="connect_to_doctor_cursor",
+            value=str(cursor) if cursor else None,
         )
 
         
     @staticmethod
-    async def get_connect_to_doctor_current_page(state: FSMContext):
+    async def get_connect_to_doctor_cursor(state: FSMContext) -> Optional[KeysetCursor]:
+        data = await state.get_data()
+        return KeysetCursor.parse(data.get("connect_to_doctor_cursor"))
+
+
+    @staticmethod
+    async def save_connect_to_doctor_search(
+        state: FSMContext,
+        search: Optional[str],
+    ):
+        await MessageService.set_state_data(
+            state=state,
+            key="connect_to_doctor_search",
+            value=search,
+        )
+
+
+    @staticmethod
+    async def get_connect_to_doctor_search(state: FSMContext) -> Optional[str]:
         data = await state.get_data()
-        return data.get("connect_to_doctor_page", 0)
+        return data.get("connect_to_doctor_search")
     
 
     @staticmethod
@@ -128,23 +166,24 @@ class PatientService:
         state: FSMContext,
         message_id: int,
         notification_id: Optional[int] = None,
+        session: Optional[AsyncSession] = None,
     ):
         if notification_id:
             patient_survey = PatientSurvey()
-            success = await patient_survey.load(notification_id)
+            success = await patient_survey.load(notification_id, session)
             if success:
                 await MessageService.set_state_data(
                     state=state,
                     key=f"patient_survey:{message_id}",
-                    value=patient_survey
+                    value=patient_survey.to_state()
                 )
                 return True
             return False
         else:
-            patient_survey = await MessageService.get_state_data(
+            patient_survey = PatientSurvey.from_state(await MessageService.get_state_data(
                 state=state,
                 key=f"patient_survey:{message_id}"
-            )
+            ))
 
             return bool(patient_survey)
         
@@ -153,7 +192,7 @@ class PatientService:
         state: FSMContext, 
         message_id: int, 
     ) -> PatientSurvey:
-        return (await MessageService.get_state_data(
+        return PatientSurvey.from_state(await MessageService.get_state_data(
             state=state,
             key=f"patient_survey:{message_id}"
         ))
@@ -167,7 +206,7 @@ class PatientService:
         await MessageService.set_state_data(
                 state=state,
                 key=f"patient_survey:{message_id}",
-                value=modificated_survey
+                value=modificated_survey.to_state()
         )
     
     @staticmethod
@@ -175,7 +214,8 @@ class PatientService:
         state: FSMContext,
         survey: PatientSurvey,
         message_id: int,
-        patient_id: int
+        patient_id: int,
+        session: Optional[AsyncSession] = None,
     ):
         await MessageService.set_state_data(
                 state=state,
@@ -183,64 +223,96 @@ class PatientService:
                 value=None
         )
         
-        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
-            # Получаем текущую попытку прохождения опроса
-            curr_attemp = (await async_session.execute(
-                sqlalchemy
-                .select(SurveyReminderDBM)
-                .where(SurveyReminderDBM.id == survey.notification_id)
-            )).scalars().unique().one()
-            
-            schedule_date = date(curr_attemp.creation_dt.year, curr_attemp.creation_dt.month, curr_attemp.creation_dt.day)
-            
-            # Проверяем, есть ли уже завершенные или проваленные попытки 
-            # для этого опроса и времени в тот же день
-            existing_attempts = await async_session.execute(
-                sqlalchemy
-                .select(SurveyReminderDBM)
-                .where(SurveyReminderDBM.scheduled_survey_id == survey.scheduled_survey_id)
-                .where(SurveyReminderDBM.scheduled_time == survey.scheduled_time)
-                .where(sqlalchemy.func.date(SurveyReminderDBM.creation_dt) == schedule_date)
-                .where(SurveyReminderDBM.status.in_([
-                    SurveyReminderDBM.ReminderStatus.COMPLETED,
-                    # SurveyReminderDBM.ReminderStatus.FAILED
-                ]))
-            )
+        async with get_cached_sqlalchemy_db().use_async_session(session) as async_session:
+            # Точка сохранения: отказ откатывает только эту попытку, а не весь апдейт
+            savepoint = await async_session.begin_nested()
+            try:
+                sibling = aliased(SurveyReminderDBM)
+                same_slot = sqlalchemy.and_(
+                    sibling.scheduled_survey_id == SurveyReminderDBM.scheduled_survey_id,
+                    sibling.scheduled_time == SurveyReminderDBM.scheduled_time,
+                    sqlalchemy.func.date(sqlalchemy.func.timezone("UTC", sibling.creation_dt))
+                    == sqlalchemy.func.date(sqlalchemy.func.timezone("UTC", SurveyReminderDBM.creation_dt)),
+                )
 
-            # Если такие попытки уже есть - просто выходим, ничего не меняя
-            if existing_attempts.scalars().first() is not None:
-                return False
-            
-            for number_question, answer in survey.answers.items():
-                curr_question = survey.questions[number_question]
-                survey_response = SurveyResponseDBM(
-                    scheduled_survey_id=curr_attemp.scheduled_survey_id,
-                    patient_id=patient_id,
-                    question_id=curr_question.question_id,
-                    answer=answer,
-                    scheduled_time=curr_attemp.scheduled_time,
+                # Сначала блокируем все попытки слота в порядке ID: параллельные
+                # завершения слота и отправка его напоминаний идут по очереди,
+                # а строки агрегатов блокируются только после строк напоминаний
+                await async_session.execute(
+                    sqlalchemy
+                    .select(SurveyReminderDBM.id)
+                    .join(sibling, same_slot)
+                    .where(sibling.id == survey.notification_id)
+                    .order_by(SurveyReminderDBM.id)
+                    .with_for_update(of=SurveyReminderDBM)
                 )
-                async_session.add(survey_response)
-                await async_session.flush()
-
-            # Помечаем текущую попытку как завершенную
-            curr_attemp.status = SurveyReminderDBM.ReminderStatus.COMPLETED
-            
-                
-            # Помечаем все другие ожидающие попытки для этого опроса 
-            # и времени в тот же день как проваленные
-            pending_attempts = await async_session.execute(
-                sqlalchemy
-                .select(SurveyReminderDBM)
-                .where(SurveyReminderDBM.scheduled_survey_id == survey.scheduled_survey_id)
-                .where(SurveyReminderDBM.scheduled_time == survey.scheduled_time)
-                .where(sqlalchemy.func.date(SurveyReminderDBM.creation_dt) == schedule_date)
-                .where(SurveyReminderDBM.id != survey.notification_id)
-            )
-            
-            for attempt in pending_attempts.scalars():
-                attempt.status = SurveyReminderDBM.ReminderStatus.FAILED
-            
-            await async_session.commit()
-            
+
+                # Завершаем текущую попытку, если в этом слоте (опрос, время, день)
+                # еще нет завершенной. Одновременное завершение соседней попытки
+                # отсекает уникальный индекс uq_survey_reminders_completed_slot
+                curr_attemp = (await async_session.execute(
+                    update_reminders_status(
+                        SurveyReminderDBM.ReminderStatus.COMPLETED.value,
+                        SurveyReminderDBM.id == survey.notification_id,
+                        ~sqlalchemy.exists().where(
+                            same_slot,
+                            sibling.status == SurveyReminderDBM.ReminderStatus.COMPLETED.value,
+                        ),
+                        returning=[
+                            SurveyReminderDBM.scheduled_survey_id,
+                            SurveyReminderDBM.scheduled_time,
+                            SurveyReminderDBM.creation_dt,
+                        ],
+                        completed_at=sqlalchemy.func.now(),
+                    )
+                )).one_or_none()
+
+                # Попытка уже завершена (например, повторное нажатие) - ничего не меняем
+                if curr_attemp is None:
+                    await savepoint.rollback()
+                    return False
+
+                # Все ответы одним INSERT вместе с агрегатами;
+                # повтор того же прохождения ничего не добавит
+                now = datetime.now(tz=pytz.UTC)
+                inserted = (await async_session.execute(
+                    insert_survey_responses([
+                        {
+                            "creation_dt": now,
+                            "survey_reminder_id": survey.notification_id,
+                            "scheduled_survey_id": curr_attemp.scheduled_survey_id,
+                            "patient_id": patient_id,
+                            "question_id": survey.questions[number_question].question_id,
+                            "answer": answer,
+                            "scheduled_time": curr_attemp.scheduled_time,
+                        }
+                        for number_question, answer in survey.answers.items()
+                    ])
+                )).all()
+
+                if not inserted:
+                    await savepoint.rollback()
+                    return False
+
+                # Помечаем все другие попытки для этого опроса
+                # и времени в тот же день как проваленные
+                await async_session.execute(
+                    update_reminders_status(
+                        SurveyReminderDBM.ReminderStatus.FAILED.value,
+                        SurveyReminderDBM.scheduled_survey_id == curr_attemp.scheduled_survey_id,
+                        SurveyReminderDBM.scheduled_time == curr_attemp.scheduled_time,
+                        SurveyReminderDBM.created_on(curr_attemp.creation_dt.astimezone(pytz.UTC).date()),
+                        SurveyReminderDBM.id != survey.notification_id,
+                    )
+                )
+
+                # Планировщик сразу снимет оставшиеся напоминания по этому слоту
+                await notify_scheduled_survey_changed(async_session, curr_attemp.scheduled_survey_id)
+
+                await savepoint.commit()
+            except IntegrityError:
+                # Соседняя попытка того же слота завершена параллельно
+                await savepoint.rollback()
+                return False
+
             return True
\ No newline at end of file
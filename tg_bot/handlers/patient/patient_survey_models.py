@@ -1,46 +1,58 @@
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, List
 from dataclasses import dataclass, field
-from uuid import uuid4
-from datetime import datetime
+from datetime import time
 
 import sqlalchemy
-from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
-from shared.sqlalchemy_db_.sqlalchemy_model import QuestionDBM, SurveyDBM, SurveyReminderDBM, ScheduledSurveyDBM, SurveyQuestionDBM
+from shared.sqlalchemy_db_.sqlalchemy_model import SurveyReminderDBM, ScheduledSurveyDBM
+from tg_bot.utils.survey_cache import SurveyQuestionSnapshot, get_cached_survey_cache
 
-@dataclass
+@dataclass(slots=True)
 class PatientSurvey:
     """Класс для управления процессом прохождения опроса пациентом"""
-    async def load(self, notification_id: int) -> bool:
+    _STATE_VERSION = 1
+
+    notification_id: Optional[int] = None
+    scheduled_survey_id: Optional[int] = None
+    scheduled_time: Optional[time] = None
+    title: Optional[str] = None
+    questions: List[SurveyQuestionSnapshot] = field(default_factory=list)
+    curr_question_index: int = 0
+    answers: Dict[int, str] = field(default_factory=dict)
+
+    async def load(self, notification_id: int, session: Optional[AsyncSession] = None) -> bool:
         """Загружает опрос по ID уведомления"""
         self.notification_id = notification_id
 
-        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+        async with get_cached_sqlalchemy_db().use_async_session(session) as async_session:
             try:
-                notification_dbm = (await async_session.execute(
-                    sqlalchemy.select(SurveyReminderDBM)
+                # Поиск напоминания по первичному ключу, описание опроса - из кэша
+                notification = (await async_session.execute(
+                    sqlalchemy.select(
+                        SurveyReminderDBM.scheduled_time,
+                        SurveyReminderDBM.scheduled_survey_id,
+                        ScheduledSurveyDBM.survey_id,
+                    )
+                    .join(ScheduledSurveyDBM, ScheduledSurveyDBM.id == SurveyReminderDBM.scheduled_survey_id)
                     .where(SurveyReminderDBM.id == notification_id)
                     # .where(SurveyReminderDBM.status == SurveyReminderDBM.ReminderStatus.SENT.value)
-                    .options(
-                        joinedload(SurveyReminderDBM.scheduled_survey)
-                        .joinedload(ScheduledSurveyDBM.survey)
-                        .joinedload(SurveyDBM.questions)
-                        .joinedload(SurveyQuestionDBM.question)
-                    )
-                )).scalars().unique().one()
+                )).one_or_none()
 
-                
-                if not notification_dbm.scheduled_survey or not notification_dbm.scheduled_survey.survey:
+                if notification is None:
                     return False
 
-                self.title = notification_dbm.scheduled_survey.survey.title
-                self.questions = notification_dbm.scheduled_survey.survey.questions
+                definition = await get_cached_survey_cache().get_or_load(async_session, notification.survey_id)
+                if definition is None:
+                    return False
+
+                self.title = definition.title
+                self.questions = list(definition.questions)
                 self.curr_question_index = 0
-                self.count_question = len(self.questions)
                 self.answers = {}
-                self.scheduled_time = notification_dbm.scheduled_time
-                self.scheduled_survey_id = notification_dbm.scheduled_survey_id
+                self.scheduled_time = notification.scheduled_time
+                self.scheduled_survey_id = notification.scheduled_survey_id
 
                 return True
                 
@@ -48,12 +60,45 @@ class PatientSurvey:
                 print(f"Error loading survey: {e}")
                 return False
 
+    @property
+    def count_question(self) -> int:
+        return len(self.questions)
+
     def set_answer(self, text: str):
         self.answers[self.curr_question_index] = text
         self.curr_question_index += 1
         
-    def get_current_question(self):
+    def get_current_question(self) -> SurveyQuestionSnapshot:
         return self.questions[self.curr_question_index]
 
     def set_prev_question(self):
         self.curr_question_index = max(0, self.curr_question_index - 1)
+
+    def to_state(self) -> Dict[str, Any]:
+        """Сериализация в данные FSM"""
+        return {
+            "v": self._STATE_VERSION,
+            "notification_id": self.notification_id,
+            "scheduled_survey_id": self.scheduled_survey_id,
+            "scheduled_time": self.scheduled_time.isoformat() if self.scheduled_time else None,
+            "title": self.title,
+            "questions": [question.to_state() for question in self.questions],
+            "curr_question_index": self.curr_question_index,
+            "answers": {str(index): answer for index, answer in self.answers.items()},
+        }
+
+    @classmethod
+    def from_state(cls, data: Any) -> Optional["PatientSurvey"]:
+        """Десериализация из данных FSM (None для данных другой версии)"""
+        if not isinstance(data, dict) or data.get("v") != cls._STATE_VERSION:
+            return None
+
+        return cls(
+            notification_id=data["notification_id"],
+            scheduled_survey_id=data["scheduled_survey_id"],
+            scheduled_time=time.fromisoformat(data["scheduled_time"]) if data["scheduled_time"] else None,
+            title=data["title"],
+            questions=[SurveyQuestionSnapshot.from_state(question) for question in data["questions"]],
+            curr_question_index=data["curr_question_index"],
+            answers={int(index): answer for index, answer in data["answers"].items()},
+        )
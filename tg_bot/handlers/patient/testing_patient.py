@@ -2,14 +2,15 @@ from aiogram import F, Router
 from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM
 from tg_bot.keyboards import PatientAction
 from tg_bot.handlers.common.message_service import MessageService
 from tg_bot.handlers.patient.patient_service import PatientService
 from tg_bot.keyboards import PatientKeyboard
 from tg_bot.blanks import PatientBlank
 from tg_bot.states.patient import ConnectToDoctorStates
+from tg_bot.utils.user_cache import UserSnapshot
 
 router = Router()
 
@@ -19,7 +20,7 @@ async def proccess_current_question(
     state: FSMContext,
     keyboard: type[PatientKeyboard],
     blank: type[PatientBlank],
-    user_dbm: type[UserDBM],
+    user_dbm: UserSnapshot,
     from_cq: bool = True,
 ):
     patient_survey = await PatientService.get_survey(
@@ -32,7 +33,7 @@ async def proccess_current_question(
     await message.bot.edit_message_text(
         text=blank.get_survey_question_blank(
             survey_title=patient_survey.title,
-            question_text=curr_question.question.question_text,
+            question_text=curr_question.question_text,
             question_number=curr_question.order_index,
             total_questions=patient_survey.count_question,
         ),
@@ -44,7 +45,7 @@ async def proccess_current_question(
         message_id=message.message_id,
         reply_markup=keyboard.get_survey_question_keyboard(
             question_id=curr_question.id,
-            options=curr_question.question.answer_options,
+            options=curr_question.answer_options,
             has_previous=bool(patient_survey.curr_question_index > 0)
         )
     )
@@ -63,14 +64,16 @@ async def handle_current_question(
     state: FSMContext,
     keyboard: type[PatientKeyboard],
     blank: type[PatientBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot,
+    session: AsyncSession
 ):
     notification_id = await MessageService.get_value_from_callback_data(callback_query.data)
 
     survey_can_be_passed = await PatientService.survey_can_be_passed(
         state=state,
         notification_id=notification_id,
-        message_id=callback_query.message.message_id
+        message_id=callback_query.message.message_id,
+        session=session
     )
     
     if survey_can_be_passed == False:
@@ -94,7 +97,8 @@ async def handle_answer_question(
     state: FSMContext,
     keyboard: type[PatientKeyboard],
     blank: type[PatientBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot,
+    session: AsyncSession
 ):
     answer_option_number = await MessageService.get_value_from_callback_data(
         callback_data=callback_query.data,
@@ -108,12 +112,12 @@ async def handle_answer_question(
     
     curr_question = patient_survey.get_current_question()
 
-    answer_option_text = (curr_question.question.answer_options)[answer_option_number]
+    answer_option_text = (curr_question.answer_options)[answer_option_number]
     
     
     patient_survey.set_answer(answer_option_text)
 
-    PatientService.save_modificate(
+    await PatientService.save_modificate(
         state=state, 
         message_id=callback_query.message.message_id,
         modificated_survey=patient_survey
@@ -128,6 +132,7 @@ async def handle_answer_question(
             survey=patient_survey,
             message_id=callback_query.message.message_id,
             patient_id=user_dbm.tg_id,
+            session=session,
         )
         if success:
             await callback_query.answer("Тест был пройден!")
@@ -148,7 +153,7 @@ async def set_prev_question(
     state: FSMContext,
     keyboard: type[PatientKeyboard],
     blank: type[PatientBlank],
-    user_dbm: type[UserDBM]
+    user_dbm: UserSnapshot
 ):
     patient_survey = await PatientService.get_survey(
         state=state,
@@ -157,7 +162,7 @@ async def set_prev_question(
 
     patient_survey.set_prev_question()
 
-    PatientService.save_modificate(
+    await PatientService.save_modificate(
         state=state, 
         message_id=callback_query.message.message_id,
         modificated_survey=patient_survey
@@ -2,6 +2,7 @@ from typing import Optional
 from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from shared.sqlalchemy_db_.keyset_pagination import KeysetPage
 from shared.sqlalchemy_db_.sqlalchemy_model.survey import SurveyDBM, UserDBM
 from tg_bot.handlers.doctor.survey_models import Question
 from tg_bot.keyboards.common.common import CommonKeyboard
@@ -371,40 +372,36 @@ class DoctorKeyboard(CommonKeyboard):
     
     @staticmethod
     def get_survey_selection_keyboard(
-        survey_dbms: list[SurveyDBM],
-        page: int = 0,
-        per_page: int = 5
+        survey_page: KeysetPage[SurveyDBM],
     ) -> InlineKeyboardMarkup:
         """Клавиатура выбора опроса с пагинацией
         
         Args:
-            surveys: Полный список опросов
-            page: Текущая страница (начиная с 0)
-            per_page: Количество опросов на странице
+            survey_page: Страница опросов; курсоры соседних страниц
+                передаются в callback data кнопок пагинации
         """
         keyboard = InlineKeyboardBuilder()
         
         # Добавляем кнопки опросов (каждая в отдельную строку)
-        for survey in survey_dbms[page * per_page : page * per_page + per_page]:
+        for survey in survey_page.items:
             keyboard.button(
                 text=f"📋 {survey.title} (ID: {survey.id})",
                 callback_data=f"{DoctorAction.SELECT_SURVEY.value}:{survey.id}"
             )
-            keyboard.adjust(1)  # Каждый опрос на новой строке
         
         # Кнопки пагинации в одной строке
         pagination_buttons = []
         
-        if (page * per_page - per_page) >= 0:
+        if survey_page.prev_cursor:
             pagination_buttons.append((
                 "⬅️ Назад",
-                f"{DoctorAction.CONFIRM_DATE_PERIOD.value}:{page - 1}"
+                f"{DoctorAction.CONFIRM_DATE_PERIOD.value}:{survey_page.prev_cursor}"
             ))
             
-        if (page * per_page + per_page) < len(survey_dbms):
+        if survey_page.next_cursor:
             pagination_buttons.append((
                 "Вперёд ➡️",
-                f"{DoctorAction.CONFIRM_DATE_PERIOD.value}:{page + 1}"
+                f"{DoctorAction.CONFIRM_DATE_PERIOD.value}:{survey_page.next_cursor}"
             ))
         
         # Добавляем кнопки пагинации
@@ -417,11 +414,11 @@ class DoctorKeyboard(CommonKeyboard):
             callback_data=DoctorAction.CANCEL_SCHEDULING
         )
         
-        # Настраиваем layout
-        if len(pagination_buttons) == 2:
-            keyboard.adjust(*[1]*per_page, 2, 1)  # Опросы по 1, пагинация 2 в ряд, назад внизу
-        else:
-            keyboard.adjust(*[1]*(per_page + len(pagination_buttons) + 1))  # Все по 1 в ряд
+        # Настраиваем layout: опросы по 1, пагинация в ряд, отмена внизу
+        rows = [1] * len(survey_page.items)
+        if pagination_buttons:
+            rows.append(len(pagination_buttons))
+        keyboard.adjust(*rows, 1)
         
         return keyboard.as_markup()
 
@@ -454,21 +451,18 @@ class DoctorKeyboard(CommonKeyboard):
 
     @staticmethod
     def get_patient_selection_keyboard(
-        patients_dbms: list[UserDBM],
-        page: int = 0,
-        per_page: int = 5
+        patient_page: KeysetPage[UserDBM],
     ) -> InlineKeyboardMarkup:
         """Клавиатура выбора пациента с пагинацией
         
         Args:
-            patients_dbms: Список пациентов
-            page: Текущая страница (начиная с 0)
-            per_page: Количество пациентов на странице
+            patient_page: Страница пациентов; курсоры соседних страниц
+                передаются в callback data кнопок пагинации
         """
         keyboard = InlineKeyboardBuilder()
         
         # Добавляем кнопки пациентов (каждая в отдельную строку)
-        for patient_dbm in patients_dbms[page * per_page : page * per_page + per_page]:
+        for patient_dbm in patient_page.items:
             keyboard.button(
                 text=f"👤 {patient_dbm.full_name}",
                 callback_data=f"{DoctorAction.SELECT_PATIENT.value}:{patient_dbm.tg_id}"
@@ -476,18 +470,22 @@ class DoctorKeyboard(CommonKeyboard):
         
         # Кнопки пагинации
         pagination_buttons = []
-        if (page * per_page - per_page) >= 0:
+        if patient_page.prev_cursor:
             pagination_buttons.append((
                 "⬅️ Назад",
-                f"{DoctorAction.CONFIRM_SURVEY_SELECTION.value}:{page - 1}"
+                f"{DoctorAction.CONFIRM_SURVEY_SELECTION.value}:{patient_page.prev_cursor}"
             ))
             
-        if (page * per_page + per_page) < len(patients_dbms):
+        if patient_page.next_cursor:
             pagination_buttons.append((
                 "Вперёд ➡️",
-                f"{DoctorAction.CONFIRM_SURVEY_SELECTION.value}:{page + 1}"
+                f"{DoctorAction.CONFIRM_SURVEY_SELECTION.value}:{patient_page.next_cursor}"
             ))
         
+        # Добавляем пагинацию
+        for text, callback_data in pagination_buttons:
+            keyboard.button(text=text, callback_data=callback_data)
+        
         # Управляющие кнопки
         keyboard.button(
             text="🔄 Выбрать другой опрос",
@@ -498,25 +496,11 @@ class DoctorKeyboard(CommonKeyboard):
             callback_data=DoctorAction.CANCEL_SCHEDULING
         )
         
-        # Оптимальное расположение кнопок:
-        # 1. Все пациенты по одному в строке (adjust(1) для каждого)
-        # 2. Пагинация в одну строку (если есть обе кнопки)
-        # 3. Управляющие кнопки в одну строку
-        
-        # Добавляем пагинацию
-        for text, callback_data in pagination_buttons:
-            keyboard.button(text=text, callback_data=callback_data)
-        
-        # Настройка расположения:
-        if len(pagination_buttons) == 2:
-            # Если есть обе кнопки пагинации
-            keyboard.adjust(*[1]*per_page, 2, 2)  # Пациенты по 1, пагинация 2 в ряд, управление 2 в ряд
-        elif len(pagination_buttons) == 1:
-            # Если только одна кнопка пагинации
-            keyboard.adjust(*[1]*per_page, 1, 2)  # Пациенты по 1, пагинация 1, управление 2 в ряд
-        else:
-            # Нет кнопок пагинации
-            keyboard.adjust(*[1]*per_page, 2)  # Пациенты по 1, управление 2 в ряд
+        # Настройка расположения: пациенты по 1, пагинация в ряд, управление 2 в ряд
+        rows = [1] * len(patient_page.items)
+        if pagination_buttons:
+            rows.append(len(pagination_buttons))
+        keyboard.adjust(*rows, 2)
         
         return keyboard.as_markup()
 
@@ -2,6 +2,7 @@ from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from typing import List
 
+from shared.sqlalchemy_db_.keyset_pagination import KeysetPage
 from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM
 from tg_bot.keyboards.common.common import CommonKeyboard
 from tg_bot.keyboards.patient.callback_data import PatientAction
@@ -29,33 +30,30 @@ class PatientKeyboard(CommonKeyboard):
     
     @staticmethod
     def get_doctor_selection_keyboard(
-        doctors: List[UserDBM],
-        page: int = 0,
-        per_page: int = 5
+        doctor_page: KeysetPage[UserDBM],
     ) -> InlineKeyboardMarkup:
         keyboard = InlineKeyboardBuilder()
         
         # Добавляем кнопки докторов (каждая в отдельную строку)
-        for doctor in doctors[page * per_page : page * per_page + per_page]:
+        for doctor in doctor_page.items:
             keyboard.button(
                 text=f"👨⚕️ {doctor.full_name}",
                 callback_data=f"{PatientAction.SELECT_DOCTOR.value}:{doctor.tg_id}"
             )
-            keyboard.adjust(1)  # Каждый доктор на новой строке
         
-        # Кнопки пагинации в одной строке
+        # Кнопки пагинации в одной строке; в callback data передается курсор соседней страницы
         pagination_buttons = []
         
-        if (page * per_page - per_page) >= 0:
+        if doctor_page.prev_cursor:
             pagination_buttons.append((
                 "⬅️ Назад",
-                f"{PatientAction.CONNECT_TO_DOCTOR.value}:{page - 1}"
+                f"{PatientAction.CONNECT_TO_DOCTOR.value}:{doctor_page.prev_cursor}"
             ))
             
-        if (page * per_page + per_page) < len(doctors):
+        if doctor_page.next_cursor:
             pagination_buttons.append((
                 "Вперёд ➡️",
-                f"{PatientAction.CONNECT_TO_DOCTOR.value}:{page + 1}"
+                f"{PatientAction.CONNECT_TO_DOCTOR.value}:{doctor_page.next_cursor}"
             ))
         
         # Добавляем кнопки пагинации
@@ -63,10 +61,7 @@ class PatientKeyboard(CommonKeyboard):
             keyboard.button(text=text, callback_data=callback_data)
         
         # Настраиваем layout: доктора по 1, пагинацию в 1 или 2 кнопки в строке
-        if len(pagination_buttons) == 2:
-            keyboard.adjust(*[1]*per_page, 2)  # Все доктора по 1, пагинация 2 в ряд
-        else:
-            keyboard.adjust(*[1]*(per_page + 1))  # Все элементы по 1 в ряд
+        keyboard.adjust(*[1]*len(doctor_page.items), len(pagination_buttons) or 1)
             
         return keyboard.as_markup()
     
@@ -1 +1,3 @@
+from tg_bot.middlewares.db_session import DbSessionMiddleware, get_update_session
+from tg_bot.middlewares.query_scope import QueryScopeMiddleware
 from tg_bot.middlewares.user_activity import UserActivityMiddleware
\ No newline at end of file
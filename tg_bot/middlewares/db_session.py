@@ -0,0 +1,45 @@
+from contextvars import ContextVar
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Callable, Dict, Any, Awaitable, Optional
+
+from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
+
+
+_update_session: ContextVar[Optional[AsyncSession]] = ContextVar("update_session", default=None)
+
+
+def get_update_session() -> Optional[AsyncSession]:
+    """Сессия обрабатываемого апдейта (для кода без доступа к data, например хранилища FSM)."""
+    return _update_session.get()
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    """
+    Middleware единицы работы: одна AsyncSession на апдейт.
+    - Сессия передается обработчикам и сервисам через data["session"],
+      а коду без доступа к data - через get_update_session()
+    - Соединение берется из пула при первом запросе, а не при открытии сессии
+    - Изменения фиксируются одним commit после обработчика,
+      при ошибке откатываются целиком
+    """
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        # Объекты остаются доступными после commit (снимки в FSM, ответы пользователю)
+        async with get_cached_sqlalchemy_db().new_async_session(expire_on_commit=False) as session:
+            data["session"] = session
+            token = _update_session.set(session)
+            try:
+                result = await handler(event, data)
+            except BaseException:
+                await session.rollback()
+                raise
+            finally:
+                _update_session.reset(token)
+            await session.commit()
+            return result
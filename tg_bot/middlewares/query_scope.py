@@ -0,0 +1,36 @@
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+from typing import Callable, Dict, Any, Awaitable
+
+from shared.sqlalchemy_db_.query_stats import query_scope
+
+
+class QueryScopeMiddleware(BaseMiddleware):
+    """
+    Middleware, относящее запросы к БД при обработке апдейта к одной области
+    статистики запросов (shared/sqlalchemy_db_/query_stats.py).
+    - callback:<действие> - нажатие inline-кнопки
+    - command:/<команда> - команда
+    - message:<состояние FSM> - остальные сообщения
+    """
+    @staticmethod
+    def get_scope_name(update: Update, data: Dict[str, Any]) -> str:
+        if update.callback_query is not None:
+            return f"callback:{(update.callback_query.data or '').split(':')[0]}"
+
+        if update.message is not None:
+            text = update.message.text or ""
+            if text.startswith("/"):
+                return f"command:{text.split()[0]}"
+            return f"message:{data.get('raw_state') or 'no_state'}"
+
+        return f"update:{update.event_type}"
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        with query_scope(f"bot:{self.get_scope_name(event, data)}"):
+            return await handler(event, data)
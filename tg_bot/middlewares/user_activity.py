@@ -3,46 +3,76 @@ from aiogram import BaseMiddleware
 from typing import Callable, Dict, Any, Awaitable
 from logging import Logger
 from aiogram.types import Message, CallbackQuery
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.sqlalchemy_db_.sqlalchemy_db import get_cached_sqlalchemy_db
 from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM
 from tg_bot.keyboards.common.factory import KeyboardFactory
 from tg_bot.blanks.factory import BlankFactory
+from tg_bot.utils.user_cache import UserCache, UserSnapshot, get_cached_user_cache
 
 class UserActivityMiddleware(BaseMiddleware):
     """
     Middleware для отслеживания активности пользователей.
-    - Проверяет наличие пользователя в БД
+    - Берёт пользователя из кэша, при промахе - из БД
     - Создаёт нового с ролью пациента, если не найден
     - Добавляет соответствующую клавиатуру в data
     """
-    def __init__(self, logger: Logger):
+    def __init__(self, logger: Logger, user_cache: UserCache | None = None):
         self.logger = logger
+        self.user_cache = user_cache or get_cached_user_cache()
 
-    async def __call__(
+    async def create_user(self, event: Message | CallbackQuery) -> UserDBM:
+        """Создание пациента при первом обращении.
+
+        Транзакция апдейта фиксируется только после обработчика
+        (DbSessionMiddleware), а снимок попадает в кэш сразу, поэтому
+        пользователь создается в отдельной короткой сессии и фиксируется
+        независимо от результата обработчика.
+        """
+        async with get_cached_sqlalchemy_db().use_async_session() as async_session:
+            user_dbm = UserDBM(
+                tg_id=event.from_user.id,
+                full_name=event.from_user.full_name,
+            )
+            async_session.add(user_dbm)
+            await async_session.flush()
+            await async_session.refresh(user_dbm)
+
+        self.logger.info(f"User was created: {event.from_user.id}")
+        return user_dbm
+
+    async def get_or_create_user(
         self,
-        handler: Callable[[Message | CallbackQuery, Dict[str, Any]], Awaitable[Any]],
         event: Message | CallbackQuery,
-        data: Dict[str, Any]
-    ) -> Any:
-        async with get_cached_sqlalchemy_db().new_async_session() as async_session:
+        session: AsyncSession | None = None,
+    ) -> UserSnapshot:
+        """Получение снимка пользователя по tg_id с созданием нового при отсутствии"""
+        user = self.user_cache.get(event.from_user.id)
+        if user is not None:
+            return user
+
+        async with get_cached_sqlalchemy_db().use_async_session(session) as async_session:
             query = await async_session.execute(
                 sqlalchemy.select(UserDBM).where(UserDBM.tg_id == event.from_user.id)
             )
 
             user_dbm = query.scalar_one_or_none()
 
-            if user_dbm is None:
-                self.logger.info(f"User was created: {event.from_user.id}")
-
-                user_dbm = UserDBM(
-                    tg_id=event.from_user.id,
-                    full_name=event.from_user.full_name,
-                )
-                
-                async_session.add(user_dbm)
-                await async_session.commit()
-                await async_session.refresh(user_dbm)
+        if user_dbm is None:
+            user_dbm = await self.create_user(event)
+
+        user = UserSnapshot.from_dbm(user_dbm)
+        self.user_cache.put(user)
+        return user
+
+    async def __call__(
+        self,
+        handler: Callable[[Message | CallbackQuery, Dict[str, Any]], Awaitable[Any]],
+        event: Message | CallbackQuery,
+        data: Dict[str, Any]
+    ) -> Any:
+        user_dbm = await self.get_or_create_user(event, data.get("session"))
         
         data["keyboard"] = KeyboardFactory.get(user_dbm.role)
         data["blank"] = BlankFactory.get(user_dbm.role)
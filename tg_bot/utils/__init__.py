@@ -1 +1,4 @@
-from tg_bot.utils.common import validate_and_normalize_full_name
\ No newline at end of file
+from tg_bot.utils.common import normalize_search_text, validate_and_normalize_full_name
+from tg_bot.utils.user_cache import UserCache, UserSnapshot, get_cached_user_cache
+from tg_bot.utils.survey_cache import SurveyDefinition, SurveyDefinitionCache, SurveyQuestionSnapshot, get_cached_survey_cache
+from tg_bot.utils.table_export import ExportColumn, ExportFile, TableExportWriter
\ No newline at end of file
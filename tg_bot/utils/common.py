@@ -55,4 +55,22 @@ def validate_and_normalize_full_name(raw_name: str) -> str:
         for part in name_parts
     )
     
-    return normalized
\ No newline at end of file
+    return normalized
+
+def normalize_search_text(raw_text: Optional[str], max_length: int = 64) -> Optional[str]:
+    """
+    Очищает введенный пользователем текст поиска по спискам.
+    
+    Параметры:
+        raw_text (Optional[str]): Текст сообщения
+        max_length (int): Максимальная длина поискового запроса
+        
+    Возвращает:
+        Optional[str]: Начало названия или ФИО для поиска; None - показать весь список
+    """
+    if not raw_text:
+        return None
+    
+    search = re.sub(r"\s+", " ", raw_text.strip())[:max_length]
+    
+    return search or None
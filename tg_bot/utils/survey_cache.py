@@ -0,0 +1,167 @@
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from shared.config import get_cached_settings
+from shared.sqlalchemy_db_.sqlalchemy_model import SurveyDBM, SurveyQuestionDBM
+
+
+@dataclass(frozen=True, slots=True)
+class SurveyQuestionSnapshot:
+    """Вопрос опроса с полями, нужными для показа пациенту."""
+    id: int
+    question_id: int
+    order_index: int
+    question_text: str
+    answer_options: Tuple[str, ...]
+
+    @classmethod
+    def from_dbm(cls, survey_question_dbm: SurveyQuestionDBM) -> "SurveyQuestionSnapshot":
+        return cls(
+            id=survey_question_dbm.id,
+            question_id=survey_question_dbm.question_id,
+            order_index=survey_question_dbm.order_index,
+            question_text=survey_question_dbm.question.question_text,
+            answer_options=tuple(survey_question_dbm.question.answer_options or ()),
+        )
+
+    def to_state(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["answer_options"] = list(self.answer_options)
+        return data
+
+    @classmethod
+    def from_state(cls, data: Dict[str, Any]) -> "SurveyQuestionSnapshot":
+        return cls(**{**data, "answer_options": tuple(data["answer_options"])})
+
+
+@dataclass(frozen=True, slots=True)
+class SurveyDefinition:
+    """Неизменяемое описание опроса: название и упорядоченные вопросы."""
+    survey_id: int
+    title: str
+    questions: Tuple[SurveyQuestionSnapshot, ...]
+
+    @classmethod
+    async def load(cls, session: AsyncSession, survey_id: int) -> Optional["SurveyDefinition"]:
+        """Загрузить описание опроса из БД.
+
+        Args:
+            session: Асинхронная сессия SQLAlchemy
+            survey_id: ID опроса
+
+        Returns:
+            Optional[SurveyDefinition]: Описание опроса или None, если опроса нет
+        """
+        survey_dbm = (await session.execute(
+            sqlalchemy.select(SurveyDBM)
+            .where(SurveyDBM.id == survey_id)
+            .options(selectinload(SurveyDBM.questions).joinedload(SurveyQuestionDBM.question))
+        )).scalar_one_or_none()
+
+        if survey_dbm is None:
+            return None
+
+        return cls(
+            survey_id=survey_dbm.id,
+            title=survey_dbm.title,
+            questions=tuple(
+                SurveyQuestionSnapshot.from_dbm(survey_question_dbm)
+                for survey_question_dbm in sorted(
+                    survey_dbm.questions,
+                    key=lambda survey_question_dbm: survey_question_dbm.order_index,
+                )
+            ),
+        )
+
+
+class SurveyDefinitionCache:
+    """LRU кэш описаний опросов по survey_id.
+
+    Вопросы опроса после создания практически не меняются, поэтому
+    записи не устаревают по времени: правки опросов и вопросов нужно
+    явно сбрасывать через invalidate().
+    """
+
+    def __init__(self, max_size: int = 1000):
+        """Инициализация кэша.
+
+        Args:
+            max_size: Максимальное количество опросов в кэше
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[int, SurveyDefinition] = OrderedDict()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """Номер поколения, увеличивается при каждом сбросе."""
+        return self._generation
+
+    def get(self, survey_id: int) -> Optional[SurveyDefinition]:
+        """Получить описание опроса или None, если его нет в кэше."""
+        definition = self._entries.get(survey_id)
+        if definition is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(survey_id)
+        self.hits += 1
+        return definition
+
+    def put(self, definition: SurveyDefinition, generation: int) -> None:
+        """Сохранить описание опроса.
+
+        Args:
+            definition: Описание опроса
+            generation: Поколение кэша на момент начала загрузки; если с тех пор
+                был сброс, загруженные данные могли устареть и не сохраняются
+        """
+        if generation != self._generation:
+            return
+
+        self._entries[definition.survey_id] = definition
+        self._entries.move_to_end(definition.survey_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, survey_id: Optional[int]) -> None:
+        """Сбросить опрос из кэша.
+
+        Args:
+            survey_id: ID опроса или None, чтобы сбросить весь кэш
+        """
+        self._generation += 1
+        if survey_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(survey_id, None)
+
+    async def get_or_load(self, session: AsyncSession, survey_id: int) -> Optional[SurveyDefinition]:
+        """Получить описание опроса из кэша, при промахе - из БД."""
+        definition = self.get(survey_id)
+        if definition is not None:
+            return definition
+
+        generation = self._generation
+        definition = await SurveyDefinition.load(session, survey_id)
+        if definition is not None:
+            self.put(definition, generation)
+        return definition
+
+    def stats(self) -> dict[str, int]:
+        """Счетчики попаданий и промахов кэша."""
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+@lru_cache()
+def get_cached_survey_cache() -> SurveyDefinitionCache:
+    return SurveyDefinitionCache(max_size=get_cached_settings().bot.BOT_SURVEY_CACHE_SIZE)
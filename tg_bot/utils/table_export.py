@@ -0,0 +1,223 @@
+import csv
+import io
+from dataclasses import dataclass
+from typing import Any, Literal, Optional, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+
+
+ExportFormat = Literal["xlsx", "csv"]
+
+
+@dataclass(frozen=True, slots=True)
+class ExportColumn:
+    """Столбец выгрузки."""
+    title: str
+    width: float = 15
+    centered: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class ExportFile:
+    """Готовый файл выгрузки."""
+    filename: str
+    content: bytes
+
+
+def _create_named_styles() -> list[NamedStyle]:
+    border_side = Side(style="thin")
+    border = Border(left=border_side, right=border_side, top=border_side, bottom=border_side)
+
+    return [
+        NamedStyle(
+            name=TableExportWriter.HEADER_STYLE,
+            font=Font(color="FFFFFF", bold=True),
+            fill=PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid"),
+            alignment=Alignment(wrap_text=True, horizontal="center", vertical="center"),
+            border=border,
+        ),
+        NamedStyle(
+            name=TableExportWriter.CELL_STYLE,
+            alignment=Alignment(wrap_text=True, horizontal="left", vertical="center"),
+            border=border,
+        ),
+        NamedStyle(
+            name=TableExportWriter.CENTERED_CELL_STYLE,
+            alignment=Alignment(horizontal="center", vertical="center"),
+            border=border,
+        ),
+    ]
+
+
+class TableExportWriter:
+    """Потоковая выгрузка таблиц в XLSX или CSV в памяти.
+
+    XLSX пишется в write-only режиме openpyxl: добавленные строки сразу
+    сериализуются и не накапливаются в памяти, все ячейки ссылаются на
+    общие именованные стили, а ширина столбцов и высота строк задаются
+    до записи строки.
+    В CSV каждый лист выгружается отдельным файлом.
+    """
+
+    HEADER_STYLE = "export_header"
+    CELL_STYLE = "export_cell"
+    CENTERED_CELL_STYLE = "export_centered_cell"
+
+    # Разделитель, который Excel с русской локалью открывает без мастера импорта
+    CSV_DELIMITER = ";"
+
+    def __init__(self, filename: str, export_format: ExportFormat = "xlsx"):
+        """Инициализация выгрузки.
+
+        Args:
+            filename: Имя файла без расширения
+            export_format: Формат выгрузки
+        """
+        self.filename = filename
+        self.export_format = export_format
+
+        self._workbook: Optional[Workbook] = None
+        self._worksheet: Optional[WriteOnlyWorksheet] = None
+        self._row_styles: list[str] = []
+        self._row_count = 0
+        self._line_height: Optional[float] = None
+        self._auto_filter_column: Optional[str] = None
+        self._csv_files: list[ExportFile] = []
+        self._csv_title: Optional[str] = None
+        self._csv_buffer: Optional[io.StringIO] = None
+        self._csv_writer: Any = None
+
+        if export_format == "xlsx":
+            self._workbook = Workbook(write_only=True)
+            for style in _create_named_styles():
+                self._workbook.add_named_style(style)
+
+    def add_sheet(
+        self,
+        title: str,
+        columns: Sequence[ExportColumn],
+        auto_filter: bool = False,
+        header_height: Optional[float] = None,
+        line_height: Optional[float] = None,
+    ) -> None:
+        """Начать новый лист и записать заголовки.
+
+        Args:
+            title: Название листа (в CSV - часть имени файла)
+            columns: Столбцы листа
+            auto_filter: Добавить фильтры по столбцам (только XLSX)
+            header_height: Высота строки заголовков (только XLSX)
+            line_height: Высота строки текста в строках данных: высота строки -
+                line_height на число строк самого длинного значения (только XLSX)
+        """
+        if self._workbook is not None:
+            self._finish_xlsx_sheet()
+            worksheet = self._workbook.create_sheet(title=title)
+            for col_idx, column in enumerate(columns, start=1):
+                worksheet.column_dimensions[get_column_letter(col_idx)].width = column.width
+            worksheet.freeze_panes = "A2"
+
+            self._worksheet = worksheet
+            # Диапазон фильтра задается в _finish_xlsx_sheet, когда известно число строк
+            self._auto_filter_column = get_column_letter(len(columns)) if auto_filter else None
+            self._row_count = 0
+            self._line_height = line_height
+            self._row_styles = [
+                self.CENTERED_CELL_STYLE if column.centered else self.CELL_STYLE
+                for column in columns
+            ]
+            if header_height is not None:
+                worksheet.row_dimensions[1].height = header_height
+            self._append_styled([column.title for column in columns], [self.HEADER_STYLE] * len(columns))
+        else:
+            self._finish_csv_sheet()
+            self._csv_title = title
+            self._csv_buffer = io.StringIO()
+            self._csv_writer = csv.writer(self._csv_buffer, delimiter=self.CSV_DELIMITER)
+            self._csv_writer.writerow([column.title for column in columns])
+
+    def append(self, row: Sequence[Any]) -> None:
+        """Добавить строку в текущий лист."""
+        if self._workbook is not None:
+            if self._line_height is not None:
+                # Высота строки write-only листа записывается вместе со строкой
+                lines = max((value.count("\n") + 1 for value in row if isinstance(value, str) and value), default=1)
+                self._worksheet.row_dimensions[self._row_count + 1].height = self._line_height * lines
+            self._append_styled(row, self._row_styles)
+        else:
+            self._csv_writer.writerow(row)
+
+    def _append_styled(self, row: Sequence[Any], styles: Sequence[str]) -> None:
+        cells = []
+        for value, style in zip(row, styles):
+            cell = WriteOnlyCell(self._worksheet)
+            # Стиль до значения: значение выставляет формат для дат и времени
+            cell.style = style
+            cell.value = value
+            cells.append(cell)
+        # Значения сверх описанных столбцов пишутся без стиля
+        cells.extend(row[len(styles):])
+        self._worksheet.append(cells)
+        self._row_count += 1
+
+    def _finish_xlsx_sheet(self) -> None:
+        if self._worksheet is None:
+            return
+
+        if self._auto_filter_column is not None:
+            self._worksheet.auto_filter.ref = f"A1:{self._auto_filter_column}{self._row_count}"
+        self._worksheet = None
+
+    def _finish_csv_sheet(self) -> None:
+        if self._csv_buffer is None:
+            return
+
+        # BOM нужен Excel, чтобы распознать UTF-8
+        self._csv_files.append(ExportFile(
+            filename=f"{self.filename}_{self._csv_title}.csv",
+            content=self._csv_buffer.getvalue().encode("utf-8-sig"),
+        ))
+        self._csv_buffer = None
+        self._csv_writer = None
+
+    def build(self) -> list[ExportFile]:
+        """Завершить выгрузку.
+
+        Returns:
+            list[ExportFile]: Один XLSX файл или по CSV файлу на лист
+        """
+        if self._workbook is not None:
+            self._finish_xlsx_sheet()
+            buffer = io.BytesIO()
+            self._workbook.save(buffer)
+            self._workbook = None
+            return [ExportFile(filename=f"{self.filename}.xlsx", content=buffer.getvalue())]
+
+        self._finish_csv_sheet()
+        return self._csv_files
+
+    def discard(self) -> None:
+        """Освободить ресурсы незавершенной выгрузки.
+
+        Write-only листы openpyxl копят строки во временных файлах, которые
+        удаляются только при сохранении книги или при выходе из процесса,
+        поэтому книга сохраняется в отбрасываемый буфер.
+        """
+        if self._workbook is not None:
+            self._worksheet = None
+            self._workbook.save(io.BytesIO())
+            self._workbook = None
+
+        self._csv_buffer = None
+        self._csv_files = []
+
+    def __enter__(self) -> "TableExportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            self.discard()
@@ -0,0 +1,101 @@
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+from shared.config import get_cached_settings
+from shared.sqlalchemy_db_.sqlalchemy_model import UserDBM
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """Неизменяемый снимок пользователя для обработчиков бота."""
+    id: int
+    tg_id: int
+    role: str
+    full_name: Optional[str]
+    is_active: bool
+
+    @classmethod
+    def from_dbm(cls, user_dbm: UserDBM) -> "UserSnapshot":
+        return cls(
+            id=user_dbm.id,
+            tg_id=user_dbm.tg_id,
+            role=user_dbm.role,
+            full_name=user_dbm.full_name,
+            is_active=user_dbm.is_active,
+        )
+
+    def to_state(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_state(cls, data: dict[str, Any]) -> "UserSnapshot":
+        return cls(**data)
+
+
+class UserCache:
+    """TTL + LRU кэш снимков пользователей по tg_id.
+
+    Записи живут не дольше ttl_seconds, при переполнении вытесняются
+    давно не использовавшиеся. Изменения пользователей нужно явно
+    сбрасывать через invalidate(), TTL лишь ограничивает устаревание.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300):
+        """Инициализация кэша.
+
+        Args:
+            max_size: Максимальное количество пользователей в кэше
+            ttl_seconds: Время жизни записи (в секундах)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[int, tuple[float, UserSnapshot]] = OrderedDict()
+
+    def get(self, tg_id: int) -> Optional[UserSnapshot]:
+        """Получить снимок пользователя или None, если его нет или он устарел."""
+        entry = self._entries.get(tg_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[tg_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(tg_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user: UserSnapshot) -> None:
+        """Сохранить снимок пользователя."""
+        self._entries[user.tg_id] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user.tg_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, tg_id: Optional[int]) -> None:
+        """Сбросить пользователя из кэша.
+
+        Args:
+            tg_id: ID пользователя в Telegram или None, чтобы сбросить весь кэш
+        """
+        if tg_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(tg_id, None)
+
+    def stats(self) -> dict[str, int]:
+        """Счетчики попаданий и промахов кэша."""
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+@lru_cache()
+def get_cached_user_cache() -> UserCache:
+    return UserCache(
+        max_size=get_cached_settings().bot.BOT_USER_CACHE_SIZE,
+        ttl_seconds=get_cached_settings().bot.BOT_USER_CACHE_TTL_SECONDS,
+    )